@@ -1,11 +1,69 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-import requests
-from bs4 import BeautifulSoup
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel
+import httpx
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import datetime
+import hashlib
+import hmac
+import importlib.util
+import json
+import multiprocessing
+import os
 import re
+import ssl
+import time
 import urllib.parse
 
-app = FastAPI(title="Transfermarkt Scraper API")
+from compression import CompressionMiddleware
+from crawl import RESUMABLE, CrawlQueue, Crawler, same_host, target_kind
+from conditional import NOT_MODIFIED, SECTION_SOURCES, ValidatorStore, content_etag, etag_matches, track_source
+from cache import PLAYER_RESOURCES, AccessTracker, SingleFlight, TieredCache, ttls_from_env
+from governor import RateGovernor, parse_retry_after
+from metrics import CURRENT_TRACE, Metrics, Trace
+from models import MarketValueHistory, compact, dumps
+from parsers import make_soup
+from schema import (COMPETITION_STATS, INJURIES, NATIONAL_TEAM, PROFILE, PROFILE_INFO, TEAM_STATS, WHITESPACE,
+                    YOUTH_HEADLINE, career_total, descendant, next_sibling)
+from search_index import SearchIndex, normalize_text, rank_results
+from shared_cache import SharedCache
+from store import PlayerStore
+from watchlist import WatchStore, Watcher, WebhookSender
+
+@asynccontextmanager
+async def lifespan(app):
+    # Paylaşılan HTTP bağlantı havuzu uygulama ile birlikte açılıp kapanır
+    UPSTREAM.start()
+    if PARSE_MODE == "process":
+        # İşçi süreçler ilk istekte değil açılışta başlasın
+        await asyncio.get_running_loop().run_in_executor(parse_pool(), int)
+    scheduler = asyncio.ensure_future(refresh_hot_players()) if HOT_PLAYERS_K > 0 else None
+    if CRAWL_AUTORESUME and os.path.exists(CRAWL_DB):
+        for job_id in crawl_queue().jobs(RESUMABLE):
+            start_crawl(job_id)
+    if WATCH_ENABLED and os.path.exists(WATCH_DB):
+        start_watcher()
+    try:
+        yield
+    finally:
+        if scheduler is not None:
+            scheduler.cancel()
+        await stop_crawls()
+        await stop_watcher()
+        await UPSTREAM.close()
+        shutdown_parse_pool()
+
+class FastJSONResponse(JSONResponse):
+    """models.dumps (orjson varsa) ile serileştirir. Endpoint'ler bunu doğrudan döndürünce
+    FastAPI'nin jsonable_encoder adımı da atlanır."""
+
+    def render(self, content):
+        return dumps(content)
+
+app = FastAPI(title="Transfermarkt Scraper API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,23 +71,690 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Tek parça cevaplar Accept-Encoding'e göre brotli/gzip ile sıkıştırılır (TM_COMPRESSION=0 kapatır)
+if os.environ.get("TM_COMPRESSION", "1") == "1":
+    app.add_middleware(CompressionMiddleware, minimum_size=int(os.environ.get("TM_COMPRESSION_MIN_SIZE", "1000")))
+
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Her isteğin aşama sürelerini topla; Server-Timing başlığına, /metrics'e ve trace loguna yaz"""
+    trace = Trace()
+    token = CURRENT_TRACE.set(trace)
+    try:
+        response = await call_next(request)
+    finally:
+        CURRENT_TRACE.reset(token)
+    elapsed = time.perf_counter() - trace.started
+    # Etiketler istemcinin gönderdiği yoldan değil eşleşen route şablonundan gelir; yoksa
+    # (404) tek bir sabit etikete düşer, böylece seri sayısı sınırlı kalır
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or "<unmatched>"
+    method = request.method if request.method in HTTP_METHODS else "OTHER"
+    METRICS.observe_request(method, path, response.status_code, elapsed)
+    response.headers["Server-Timing"] = trace.server_timing()
+    response.headers["Timing-Allow-Origin"] = "*"
+    if TRACE_LOG and trace.spans:
+        print(json.dumps(trace.to_log(method=request.method, path=request.url.path,
+                                      query=str(request.url.query), status=response.status_code),
+                         ensure_ascii=False))
+    return response
+
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7'
 }
 
-BASE_URL = "https://www.transfermarkt.com.tr"
+BASE_URL = os.environ.get("TM_BASE_URL", "https://www.transfermarkt.com.tr")
+
+# Bir profil oluşturulurken aynı anda açık olabilecek en fazla upstream istek sayısı
+MAX_CONCURRENCY = int(os.environ.get("TM_MAX_CONCURRENCY", "8"))
+
+# Paylaşılan bağlantı havuzu ayarları
+POOL_SIZE = int(os.environ.get("TM_POOL_SIZE", "32"))
+POOL_KEEPALIVE = int(os.environ.get("TM_POOL_KEEPALIVE", "16"))
+POOL_KEEPALIVE_EXPIRY = float(os.environ.get("TM_POOL_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.environ.get("TM_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+# Zaman aşımları (saniye)
+CONNECT_TIMEOUT = float(os.environ.get("TM_CONNECT_TIMEOUT", "5"))
+PAGE_TIMEOUT = float(os.environ.get("TM_PAGE_TIMEOUT", "10"))
+PROFILE_TIMEOUT = float(os.environ.get("TM_PROFILE_TIMEOUT", "15"))
+JSON_TIMEOUT = float(os.environ.get("TM_JSON_TIMEOUT", "5"))
+
+# Birden fazla uvicorn worker'ı için: TM_SHARED_CACHE=/yol/cache.db verilirse bölümler aynı
+# makinedeki tüm worker'ların okuyup yazdığı SQLite (WAL) katmanında da tutulur (en fazla
+# TM_SHARED_CACHE_MAX_BYTES) ve single-flight süreçler arası çalışır.
+SHARED_CACHE_PATH = os.environ.get("TM_SHARED_CACHE") or None
+SHARED_CACHE = SharedCache(
+    SHARED_CACHE_PATH,
+    max_bytes=int(os.environ.get("TM_SHARED_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+) if SHARED_CACHE_PATH else None
+
+# Bölüm önbelleği: bellek LRU + (varsa) ortak katman + (TM_CACHE_DIR verilirse) disk katmanı
+CACHE = TieredCache(
+    max_entries=int(os.environ.get("TM_CACHE_MAX_ENTRIES", "2000")),
+    ttls=ttls_from_env(),
+    disk_dir=os.environ.get("TM_CACHE_DIR") or None,
+    decode=compact,
+    shared=SHARED_CACHE,
+)
+
+# Stale-while-revalidate: süresi en fazla TM_STALE_WINDOW saniye önce dolan kayıt hemen
+# döndürülür ve arka planda yenilenir (0 ile kapatılır)
+STALE_WINDOW = float(os.environ.get("TM_STALE_WINDOW", "86400"))
+
+# En çok istenen TM_HOT_PLAYERS oyuncunun bölümleri, süreleri dolmadan
+# TM_HOT_REFRESH_LEAD saniye kala her TM_HOT_REFRESH_INTERVAL saniyede bir yenilenir
+HOT_PLAYERS_K = int(os.environ.get("TM_HOT_PLAYERS", "50"))
+HOT_REFRESH_INTERVAL = float(os.environ.get("TM_HOT_REFRESH_INTERVAL", "60"))
+HOT_REFRESH_LEAD = float(os.environ.get("TM_HOT_REFRESH_LEAD", "300"))
+# Her turda erişim sayaçları bu oranla sönümlenir, eski popülerlik zamanla unutulur
+HOT_DECAY = float(os.environ.get("TM_HOT_DECAY", "0.9"))
+HOT_PLAYERS = AccessTracker()
+REFRESH_STATS = {"stale_served": 0, "background_refreshes": 0, "hot_refreshes": 0}
+BACKGROUND_TASKS = set()
+
+# Tüm upstream istekleri için token bucket + 403/429/5xx geri çekilme + devre kesici.
+# TM_RATE=0 hız sınırını kapatır (geri çekilme ve devre kesici yine çalışır).
+GOVERNOR = RateGovernor(
+    rate=float(os.environ.get("TM_RATE", "10")),
+    burst=int(os.environ.get("TM_RATE_BURST", "20")),
+    min_rate=float(os.environ.get("TM_RATE_MIN", "0.5")),
+    max_wait=float(os.environ.get("TM_RATE_MAX_WAIT", "10")),
+    breaker_threshold=int(os.environ.get("TM_BREAKER_THRESHOLD", "5")),
+    cooldown=float(os.environ.get("TM_BREAKER_COOLDOWN", "30")),
+)
+
+# Oyuncu bölümlerinin kalıcı SQLite deposu (TM_STORE_PATH verilirse açılır). Yeniden
+# başlatmada önbellek buradan ısınır; ağır bölümler değişim sinyali aynı kaldıkça
+# indirildikten sonra en fazla TM_STORE_MAX_AGE saniye yeniden indirilmeden kullanılır.
+STORE_PATH = os.environ.get("TM_STORE_PATH") or None
+STORE_MAX_AGE = float(os.environ.get("TM_STORE_MAX_AGE", str(7 * 86400)))
+STORE = PlayerStore(STORE_PATH) if STORE_PATH else None
+
+# Aynı oyuncu/arama için eşzamanlı gelen istekler tek upstream işini paylaşır. Süreçler arası
+# kira iş sürdükçe uzatılır; TM_SHARED_LEASE_TTL sadece sahibi çöken kiranın ne kadar kalacağıdır.
+FLIGHTS = SingleFlight(shared=SHARED_CACHE, lease_ttl=float(os.environ.get("TM_SHARED_LEASE_TTL", "30")))
+
+# Upstream koşullu istekleri: ETag/Last-Modified ve gövde en fazla TM_CONDITIONAL_MAX_BYTES
+# bayt tutulur; 304 gelen sayfalar yeniden indirilmez, kaynakları değişmeyen bölümler
+# yeniden ayrıştırılmaz. TM_CONDITIONAL=0 ile kapatılır.
+CONDITIONAL_ENABLED = os.environ.get("TM_CONDITIONAL", "1") == "1"
+VALIDATORS = ValidatorStore(max_bytes=int(os.environ.get("TM_CONDITIONAL_MAX_BYTES", str(64 * 1024 * 1024))))
+
+# Görülen tüm arama sonuçları ve profillerden beslenen yerel isim indeksi. Skoru
+# TM_SEARCH_INDEX_MIN_SCORE üstündeki eşleşmeler upstream'e gitmeden cevaplanır. Upstream'den
+# cevaplanmış sorgular (en fazla TM_SEARCH_INDEX_MAX_QUERIES) arama TTL'i dolunca düşer.
+SEARCH_INDEX_ENABLED = os.environ.get("TM_SEARCH_INDEX", "1") == "1"
+SEARCH_INDEX_MIN_SCORE = float(os.environ.get("TM_SEARCH_INDEX_MIN_SCORE", "0.8"))
+SEARCH_INDEX = SearchIndex(max_entries=int(os.environ.get("TM_SEARCH_INDEX_MAX_ENTRIES", "50000")),
+                           max_queries=int(os.environ.get("TM_SEARCH_INDEX_MAX_QUERIES", "10000")),
+                           query_ttl=CACHE.ttls.get("search", 3600))
+
+# Çok kelimeli sorgularda tam sorgu ile birlikte en fazla TM_SEARCH_VARIANTS kelime varyantı
+# (ad, soyad) aynı anda aranır; sonuçlar birleştirilip sunucuda puanlanır. TM_SEARCH_MIN_RELEVANCE
+# altındaki sonuçlar (hepsi altında değilse) atılır, en fazla TM_SEARCH_LIMIT sonuç döner.
+SEARCH_VARIANTS = int(os.environ.get("TM_SEARCH_VARIANTS", "2"))
+SEARCH_MIN_RELEVANCE = float(os.environ.get("TM_SEARCH_MIN_RELEVANCE", "0.25"))
+SEARCH_LIMIT = int(os.environ.get("TM_SEARCH_LIMIT", "20"))
+
+# Toplu (/players) isteklerde tüm batch'ler genelinde aynı anda işlenen en fazla oyuncu
+BATCH_CONCURRENCY = int(os.environ.get("TM_BATCH_CONCURRENCY", "8"))
+BATCH_MAX_ITEMS = int(os.environ.get("TM_BATCH_MAX_ITEMS", "500"))
+BATCH_SEMAPHORE = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+# Yönetim uçları (/admin/*) TM_ADMIN_TOKEN ile korunur: "Authorization: Bearer <token>" veya
+# "X-Admin-Token: <token>" başlığı gerekir. Token verilmezse bu uçlar kapalıdır.
+ADMIN_TOKEN = os.environ.get("TM_ADMIN_TOKEN") or None
+
+# Toplu tarama (crawl.py): kuyruk TM_CRAWL_DB'de tutulur, her işte aynı anda en fazla
+# TM_CRAWL_CONCURRENCY öğe işlenir. Kapanışta yarıda kalan işler açılışta devam eder
+# (TM_CRAWL_AUTORESUME=0 ile kapatılır).
+CRAWL_DB = os.environ.get("TM_CRAWL_DB", "crawl.db")
+CRAWL_CONCURRENCY = int(os.environ.get("TM_CRAWL_CONCURRENCY", "4"))
+CRAWL_AUTORESUME = os.environ.get("TM_CRAWL_AUTORESUME", "1") == "1"
+CRAWL_QUEUE = None
+CRAWL_TASKS = {}
+
+# Piyasa değeri izleme listesi (watchlist.py): oyuncular TM_WATCH_DB'de tutulur ve her
+# TM_WATCH_INTERVAL saniyede (± TM_WATCH_JITTER oranında rastgele) sadece CEAPI grafiği
+# yoklanır; aynı anda en fazla TM_WATCH_CONCURRENCY istek. Değişiklik olayları uzun
+# yoklama/SSE ile okunur, TM_WATCH_WEBHOOK verilirse oraya da POST edilir. Ekleme ve
+# çıkarma yönetim token'ı (TM_ADMIN_TOKEN) ister.
+WATCH_ENABLED = os.environ.get("TM_WATCH", "1") == "1"
+WATCH_DB = os.environ.get("TM_WATCH_DB", "watchlist.db")
+WATCH_INTERVAL = float(os.environ.get("TM_WATCH_INTERVAL", "3600"))
+WATCH_JITTER = float(os.environ.get("TM_WATCH_JITTER", "0.1"))
+WATCH_CONCURRENCY = int(os.environ.get("TM_WATCH_CONCURRENCY", "16"))
+WATCH_WEBHOOK = os.environ.get("TM_WATCH_WEBHOOK") or None
+# Her izlenen oyuncu düzenli bir upstream isteği demek: toplam en fazla TM_WATCH_MAX oyuncu
+WATCH_MAX = int(os.environ.get("TM_WATCH_MAX", "5000"))
+WATCHER = None
+WATCH_TASKS = []
+WEBHOOK = None
+
+# BeautifulSoup ayrıştırması CPU işi: event loop'u bloklamaması için ayrı thread'lerde çalışır
+PARSE_WORKERS = int(os.environ.get("TM_PARSE_WORKERS", "4"))
+PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="tm-parse")
+
+# TM_PARSE_MODE=process: soup kurulumu ve extractor tek adımda (ham bayt -> düz veri) çekirdek
+# sayısı kadar süreçte çalışır, GIL tek çekirdeğe bağlamaz. Havuzda aynı anda en fazla
+# TM_PARSE_QUEUE iş bulunur; fazlası event loop'ta sırasını bekler (geri basınç).
+PARSE_MODE = os.environ.get("TM_PARSE_MODE", "thread")
+PARSE_PROCESSES = int(os.environ.get("TM_PARSE_PROCESSES", str(os.cpu_count() or 1)))
+PARSE_START_METHOD = os.environ.get("TM_PARSE_START_METHOD", "fork")
+PARSE_SLOTS = asyncio.Semaphore(int(os.environ.get("TM_PARSE_QUEUE", str(PARSE_PROCESSES * 2))))
+PARSE_PROCESS_POOL = None
+
+# Aşama süreleri; TM_TRACE_LOG=1 ile her istek için tek satırlık JSON trace logu da basılır
+METRICS = Metrics()
+TRACE_LOG = os.environ.get("TM_TRACE_LOG", "0") == "1"
+
+def record_stage(stage, seconds, detail=None):
+    METRICS.observe_stage(stage, seconds)
+    trace = CURRENT_TRACE.get()
+    if trace is not None:
+        trace.add(stage, seconds, detail)
+
+def page_kind(url):
+    """Upstream URL'sinin aşama adında kullanılan türü (profil, verletzungen, ceapi_mv ...)"""
+    path = urllib.parse.urlsplit(str(url)).path
+    if "/ceapi/marketValueDevelopment/" in path:
+        return "ceapi_mv"
+    if "/ceapi/transferHistory/" in path:
+        return "ceapi_transfers"
+    if "/schnellsuche/" in path:
+        return "search"
+    m = re.search(r'/([a-z]+)/spieler/', path)
+    return m.group(1) if m else "other"
+
+def _timed_call(fn, args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, started, time.perf_counter() - started
+
+async def run_parse(fn, *args):
+    """Senkron ayrıştırma fonksiyonunu parse executor'ında çalıştır"""
+    loop = asyncio.get_running_loop()
+    queued = time.perf_counter()
+    result, started, seconds = await loop.run_in_executor(PARSE_EXECUTOR, _timed_call, fn, args)
+    # make_soup için bölüm adı, diğerleri için extractor adı; kuyrukta bekleme ayrı ölçülür
+    stage = f"soup_{args[1] or 'full'}" if fn is make_soup and len(args) > 1 else fn.__name__
+    record_stage("parse_queue", started - queued)
+    record_stage(stage, seconds)
+    return result
+
+def extract_page(content, section, fn, args):
+    """Süreç havuzunda çalışır: ham bayttan soup kurup fn(soup, *args) sonucunu döndürür.
+    Soup süreçten çıkmaz; geriye düz veri ve iki adımın süresi gelir."""
+    started = time.perf_counter()
+    soup = make_soup(content, section)
+    built = time.perf_counter()
+    return fn(soup, *args), built - started, time.perf_counter() - built
+
+def parse_pool():
+    global PARSE_PROCESS_POOL
+    if PARSE_PROCESS_POOL is None:
+        PARSE_PROCESS_POOL = ProcessPoolExecutor(max_workers=PARSE_PROCESSES,
+                                                 mp_context=multiprocessing.get_context(PARSE_START_METHOD))
+    return PARSE_PROCESS_POOL
+
+def shutdown_parse_pool():
+    global PARSE_PROCESS_POOL
+    if PARSE_PROCESS_POOL is not None:
+        PARSE_PROCESS_POOL.shutdown(cancel_futures=True)
+        PARSE_PROCESS_POOL = None
+
+async def run_extract(content, section, fn, *args):
+    """extract_page'i süreç havuzunda çalıştır; havuz doluysa boş yer açılana kadar bekle"""
+    loop = asyncio.get_running_loop()
+    queued = time.perf_counter()
+    async with PARSE_SLOTS:
+        started = time.perf_counter()
+        result, soup_seconds, seconds = await loop.run_in_executor(
+            parse_pool(), extract_page, content, section, fn, args)
+    record_stage("parse_queue", started - queued)
+    record_stage(f"soup_{section or 'full'}", soup_seconds)
+    record_stage(fn.__name__, seconds)
+    return result
+
+async def parse_content(content, section, fn, *args):
+    """Ham sayfa baytlarından fn(soup, *args); TM_PARSE_MODE'a göre thread'de veya süreçte"""
+    if PARSE_MODE == "process":
+        return await run_extract(content, section, fn, *args)
+    soup = await run_parse(make_soup, content, section)
+    return await run_parse(fn, soup, *args)
+
+# Sertifika deposunu her istemcide yeniden yüklemek (~50ms) event loop'u bloklar; tek sefer oluştur
+SSL_CONTEXT = ssl.create_default_context()
+
+class UpstreamPool:
+    """Transfermarkt'a giden tüm isteklerin kullandığı tek, keep-alive'lı httpx istemcisi"""
+
+    def __init__(self):
+        self.client = None
+        self.requests_total = 0
+        self.errors_total = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                headers=HEADERS,
+                # requests varsayılan olarak yönlendirmeleri takip eder, httpx'te açıkça istemek gerekiyor
+                follow_redirects=True,
+                verify=SSL_CONTEXT,
+                http2=HTTP2_ENABLED,
+                limits=httpx.Limits(
+                    max_connections=POOL_SIZE,
+                    max_keepalive_connections=POOL_KEEPALIVE,
+                    keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(PAGE_TIMEOUT, connect=CONNECT_TIMEOUT),
+            )
+        return self.client
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def get(self, url, timeout=PAGE_TIMEOUT, **kwargs):
+        # Devre açıksa veya hız sınırı beklemesi çok uzunsa siteye hiç gidilmez
+        waited = time.perf_counter()
+        if not await GOVERNOR.acquire():
+            raise UpstreamError(url, 503)
+        started = time.perf_counter()
+        if started - waited > 0.001:
+            record_stage("rate_wait", started - waited)
+        # Lifespan çalışmadan kullanılırsa (script, test) havuzu ilk istekte aç
+        client = self.start()
+        key = str(httpx.URL(url, params=kwargs.get('params')))
+        conditional = VALIDATORS.request_headers(key) if CONDITIONAL_ENABLED else {}
+        if conditional:
+            kwargs = dict(kwargs, headers=dict(kwargs.get('headers') or {}, **conditional))
+        self.requests_total += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            response = await client.get(url, timeout=httpx.Timeout(timeout, connect=CONNECT_TIMEOUT), **kwargs)
+        except httpx.HTTPError:
+            self.errors_total += 1
+            GOVERNOR.record_error()
+            raise
+        except Exception:
+            self.errors_total += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            record_stage(f"fetch_{page_kind(url)}", time.perf_counter() - started, str(url))
+        METRICS.upstream_response(response.status_code, len(response.content))
+        GOVERNOR.record(response.status_code, parse_retry_after(response.headers.get("Retry-After")))
+        if response.status_code == 304 and conditional:
+            # Sayfa değişmedi: saklanan gövdeyi 200 olarak ver (NOT_MODIFIED ile işaretli)
+            return VALIDATORS.replay(key) or response
+        if response.status_code == 200 and CONDITIONAL_ENABLED:
+            VALIDATORS.remember(key, response)
+        return response
+
+    def stats(self):
+        connections = []
+        pool = getattr(getattr(self.client, '_transport', None), '_pool', None)
+        if pool is not None:
+            connections = list(getattr(pool, 'connections', []))
+        return {
+            "pool_size": POOL_SIZE,
+            "max_keepalive": POOL_KEEPALIVE,
+            "http2_enabled": HTTP2_ENABLED,
+            "connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+            "http2_connections": sum(1 for c in connections if 'HTTP/2' in c.info()),
+            "requests_total": self.requests_total,
+            "errors_total": self.errors_total,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+UPSTREAM = UpstreamPool()
+
+class UpstreamError(Exception):
+    def __init__(self, url, status_code):
+        super().__init__(f"{url} returned {status_code}")
+        self.url = url
+        self.status_code = status_code
+
+class Fetcher:
+    """Bir işin (ör. tek profil oluşturma) async sayfa indiricisi.
+
+    Alt istekler ortak bir semaphore ile sınırlanır. Aynı URL iş boyunca en fazla
+    bir kez indirilir ve ayrıştırılır: cevaplar ve soup'lar URL bazında saklanır.
+    """
+
+    def __init__(self, upstream=UPSTREAM, max_concurrency=MAX_CONCURRENCY, refresh=()):
+        self.upstream = upstream
+        # Bu kaynak türleri için önbellek okunmaz, yeniden üretilip yazılır (arka plan yenileme)
+        self.refresh = set(refresh)
+        # Stale olarak sunulan kaynak türleri; iş bitince arka planda yenilenir
+        self.stale = set()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.responses = {}
+        self.soups = {}
+        # Hatalı (4xx/5xx veya bağlantı hatası) dönen URL'ler; sadece bu kaynaklardan birini
+        # okuyan bölümler önbelleğe yazılmaz
+        self.failed = set()
+
+    def _memo(self, table, key, factory):
+        task = table.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            table[key] = task
+        # Bekleyenlerden biri iptal edilirse paylaşılan indirme diğerleri için iptal olmasın
+        return asyncio.shield(task)
+
+    def cancel_pending(self):
+        for table in (self.responses, self.soups):
+            for task in table.values():
+                if not task.done():
+                    task.cancel()
+
+    async def _get(self, key, url, timeout, kwargs):
+        async with self.semaphore:
+            try:
+                response = await self.upstream.get(url, timeout=timeout, **kwargs)
+            except Exception:
+                self.failed.add(key)
+                raise
+        if response.status_code >= 400:
+            self.failed.add(key)
+        return response
+
+    async def get(self, url, timeout=PAGE_TIMEOUT, **kwargs):
+        key = str(httpx.URL(url, params=kwargs.get('params')))
+        track_source(key)
+        return await self._memo(self.responses, key, lambda: self._get(key, url, timeout, kwargs))
+
+    async def _soup(self, url, section, timeout):
+        response = await self.get(url, timeout=timeout)
+        return await run_parse(make_soup, response.content, section)
+
+    async def get_soup(self, url, section=None, timeout=PAGE_TIMEOUT):
+        """Sayfanın soup'u; section verilirse sadece o sayfa türünün okunan bölümleri ayrıştırılır"""
+        track_source(str(httpx.URL(url)))
+        return await self._memo(self.soups, (url, section), lambda: self._soup(url, section, timeout))
+
+    async def extract(self, url, section, fn, *args, timeout=PAGE_TIMEOUT):
+        """Sayfayı indirip fn(soup, *args) sonucunu döndür. Thread modunda soup iş boyunca
+        paylaşılır; süreç modunda ham bayt işçi sürece gider, geriye sadece düz veri gelir."""
+        if PARSE_MODE != "process":
+            return await run_parse(fn, await self.get_soup(url, section, timeout), *args)
+        track_source(str(httpx.URL(url)))
+        response = await self.get(url, timeout=timeout)
+        return await run_extract(response.content, section, fn, *args)
+
+    async def get_json(self, url, timeout=JSON_TIMEOUT):
+        response = await self.get(url, timeout=timeout)
+        if response.status_code != 200:
+            return None
+        return response.json()
+
+def player_id_from_url(url):
+    m = re.search(r'/spieler/(\d+)', url)
+    return m.group(1) if m else None
+
+async def cached(fetcher, resource, key, producer, signal=None):
+    """producer() sonucunu önbellekten ver; yoksa üret ve bölümün kendi kaynak sayfalarından hiçbiri
+    hata vermediyse sakla. Devre açıksa ya da bölümün bir kaynağı hata verdiyse süresi dolmuş (stale)
+    kayıt tercih edilir.
+
+    Oyuncu bölümleri ayrıca kalıcı depoya yazılır. signal() verilirse depodaki süresi dolmuş
+    bölüm, indirildiği andaki sinyal hâlâ aynıysa yeniden indirilmeden kullanılır."""
+    if key is None:
+        return await producer()
+    persistent = STORE is not None and resource in PLAYER_RESOURCES
+    stored = None
+    if resource not in fetcher.refresh:
+        hit, value = CACHE.get(resource, key)
+        if hit:
+            return value
+        stored = load_stored(resource, key) if persistent else None
+        if stored is not None:
+            # Yeniden başlatma sonrası ısınma: depodaki kayıt son doğrulamadan bu yana hâlâ
+            # TTL içindeyse kalan süresiyle kullan
+            remaining = stored[3] + CACHE.ttls.get(resource, 3600) - time.time()
+            if remaining > 0:
+                CACHE.set(resource, key, stored[0], ttl=remaining)
+                return stored[0]
+        if STALE_WINDOW > 0:
+            stale, value = CACHE.get_stale(resource, key, max_age=STALE_WINDOW)
+            if stale:
+                fetcher.stale.add(resource)
+                REFRESH_STATS["stale_served"] += 1
+                return value
+    elif persistent:
+        stored = load_stored(resource, key)
+    if signal is not None and stored is not None and time.time() - stored[1] < STORE_MAX_AGE:
+        try:
+            current = await signal()
+        except UpstreamError:
+            current = None
+        if current is not None and current == stored[2]:
+            STORE.touch(key, resource)
+            CACHE.set(resource, key, stored[0])
+            return stored[0]
+    if GOVERNOR.is_open():
+        stale, value = CACHE.get_stale(resource, key)
+        if stale:
+            return value
+        if stored is not None:
+            return stored[0]
+    reused = await revalidate(fetcher, resource, key, stored)
+    if reused is not None:
+        return reused[0]
+    parent = SECTION_SOURCES.get()
+    sources = set()
+    token = SECTION_SOURCES.set(sources)
+    try:
+        value = await producer()
+    except UpstreamError:
+        stale, old = CACHE.get_stale(resource, key)
+        if stale:
+            return old
+        if stored is not None:
+            return stored[0]
+        raise
+    finally:
+        SECTION_SOURCES.reset(token)
+        # Dıştaki bölüm (ör. performans içinde profil başlığı) bu sayfalara da bağlı
+        if parent is not None:
+            parent.update(sources)
+    # Aynı işte paralel üretilen diğer bölümlerin hataları bu bölümü etkilemez
+    if not sources & fetcher.failed:
+        VALIDATORS.set_sources(resource, key, sources)
+        # Önbellekte slot'lu modeller olarak tutulur
+        value = compact(resource, value)
+        CACHE.set(resource, key, value)
+        if persistent:
+            STORE.put(key, resource, value, await current_signal(signal))
+        return value
+    stale, old = CACHE.get_stale(resource, key)
+    if stale:
+        return old
+    return stored[0] if stored is not None else value
+
+async def revalidate(fetcher, resource, key, stored):
+    """Bölümün kaynak sayfalarını koşullu iste; hepsi 304 dönerse eski değeri yeniden
+    ayrıştırmadan kullan: (değer,) ya da None. Değişen sayfalar fetcher'da kalır,
+    producer onları yeniden indirmez."""
+    sources = VALIDATORS.get_sources(resource, key) if CONDITIONAL_ENABLED else ()
+    if not sources:
+        return None
+    stale, value = CACHE.get_stale(resource, key)
+    if not stale:
+        if stored is None:
+            return None
+        value = stored[0]
+    try:
+        responses = await asyncio.gather(*(fetcher.get(url) for url in sources))
+    except (UpstreamError, httpx.HTTPError):
+        return None
+    if not all(r.extensions.get(NOT_MODIFIED) for r in responses):
+        return None
+    VALIDATORS.counters["sections_reused"] += 1
+    CACHE.set(resource, key, value)
+    if STORE is not None and resource in PLAYER_RESOURCES:
+        STORE.touch(key, resource)
+    return (value,)
+
+def load_stored(resource, key):
+    """Depodaki (veri, fetched_at, signal, checked_at) kaydı, veri slot'lu modellere çevrilmiş olarak"""
+    stored = STORE.get(key, resource)
+    if stored is None:
+        return None
+    return (compact(resource, stored[0]),) + tuple(stored[1:])
 
-def search_players(player_name):
+async def current_signal(signal):
+    if signal is None:
+        return None
+    try:
+        return await signal()
+    except UpstreamError:
+        return None
+
+async def change_signal(fetcher, url):
+    """Ağır bölümlerin (performans, sakatlık, transfer) değişip değişmediğine dair ucuz sinyal:
+    başlıktaki piyasa değeri ve güncelleme tarihi + CEAPI piyasa değeri grafiğinin özeti"""
+    player_id = player_id_from_url(url)
+    header, history = await asyncio.gather(get_profile_header(fetcher, url, player_id),
+                                           get_mv_history_from_page(fetcher, url))
+    raw = dumps([header.get("market_value_last_update"), header.get("market_value"), history], sort_keys=True)
+    return hashlib.sha1(raw).hexdigest()
+
+def normalize_query(player_name):
+    return ' '.join(player_name.split()).casefold()
+
+def parse_search_page(soup, final_url):
+    """Arama sonucunu ayrıştır. Sonuç tablosu hiç yoksa None döner."""
+    results = []
+    seen_urls = set()
+
+    # 1. Kontrol: Eğer direkt profile yönlendiyse (Tek sonuç durumu)
+    if "/profil/spieler/" in final_url:
+        name = "-"
+        # Name extraction on profile page
+        header = soup.find('header', class_='data-header')
+        if header:
+            h1 = header.find('h1')
+            if h1: name = h1.get_text(separator=' ', strip=True)
+        
+        # Use real profile URL (response.url might contain fragments)
+        profile_url = final_url.split('?')[0]
+        return [{'name': name, 'url': profile_url, 'image_url': '', 'club': 'Direkt Sonuç'}]
+
+    # 2. Arama kutularını bul
+    player_table = None
+    boxes = soup.find_all('div', class_='box')
+    for box in boxes:
+        header = box.find('h2', class_='content-box-headline')
+        if header and ('Futbolcu' in header.get_text() or 'Player' in header.get_text()):
+            player_table = box.find('table', class_='items')
+            break
+    
+    if not player_table:
+        player_table = soup.find('table', class_='items')
+        
+    if not player_table:
+        return None
+
+    tbody = player_table.find('tbody')
+    if not tbody: return results
+
+    for row in tbody.find_all('tr', recursive=False):
+        link = row.find('a', href=re.compile(r'/profil/spieler/'))
+        if link:
+            href = link['href']
+            full_url = BASE_URL + href if not href.startswith('http') else href
+            if full_url in seen_urls: continue
+            seen_urls.add(full_url)
+            
+            # İsim: genelde title'da daha temizdir
+            name = link.get('title') or link.get_text(strip=True)
+            
+            img = row.find('img')
+            img_url = img.get('src') if img else ''
+            
+            club = "-"
+            club_img = row.find('img', class_='tiny_wappen')
+            if club_img: 
+                club = club_img.get('title') or club_img.get('alt') or '-'
+            
+            results.append({
+                'name': name, 
+                'url': full_url, 
+                'image_url': img_url, 
+                'club': club
+            })
+    return results
+
+async def refresh_search(player_name):
+    fetcher = Fetcher(refresh={"search"})
+    query = normalize_query(player_name)
+    return await cached(fetcher, "search", query, lambda: search_upstream(fetcher, player_name))
+
+def search_local(player_name):
+    """Yerel indeksten yeterince güçlü eşleşmeler varsa onları döner, yoksa None"""
+    if not SEARCH_INDEX_ENABLED:
+        return None
+    hits = [r for score, r in SEARCH_INDEX.lookup(player_name) if score >= SEARCH_INDEX_MIN_SCORE]
+    return hits or None
+
+def search_variants(player_name):
+    """Tam sorgu + ilk ve son kelime gibi tek kelimelik varyantlar (tekrarsız, en az 3 harf)"""
+    words = [w for w in player_name.split() if len(normalize_text(w)) >= 3]
+    variants = [player_name]
+    if len(words) > 1:
+        for word in (words[0], words[-1], *words[1:-1])[:SEARCH_VARIANTS]:
+            if normalize_query(word) not in map(normalize_query, variants):
+                variants.append(word)
+    return variants
+
+async def search_players(fetcher, player_name, limit=SEARCH_LIMIT):
+    """Tam sorgu ve kelime varyantları paralel aranır, URL'ye göre birleştirilip puanlanır"""
+    local = search_local(player_name)
+    if local is None:
+        # Her varyantın kendi fetcher'ı var ki birinin stale sunulması diğerlerini yenilemesin
+        batches = await asyncio.gather(*(search_query(Fetcher(refresh=fetcher.refresh), v)
+                                         for v in search_variants(player_name)))
+        # Tam sorgunun sonuçları önce: eşit skorlarda Transfermarkt'ın sırası korunur
+        results = [r for batch in batches for r in batch]
+    else:
+        results = local
+    if not results and GOVERNOR.is_open():
+        # Upstream engelliyken yerel indeksteki zayıf eşleşmeler boş sonuçtan iyidir
+        results = [r for _, r in SEARCH_INDEX.lookup(player_name)]
+    return rank_results(player_name, results, limit, SEARCH_MIN_RELEVANCE)
+
+async def search_query(fetcher, player_name):
+    """Tek bir sorgunun (önbellekli, single-flight) upstream sonuçları"""
+    query = normalize_query(player_name)
+    results = await FLIGHTS.do(("search", query), lambda: cached(
+        fetcher, "search", query, lambda: search_upstream(fetcher, player_name)))
+    if "search" in fetcher.stale and "search" not in fetcher.refresh:
+        run_in_background(("refresh", "search", query), lambda: refresh_search(player_name))
+    return results
+
+async def search_upstream(fetcher, player_name):
     # Use params for safer URL encoding (handles spaces etc. correctly)
     search_url = f"{BASE_URL}/schnellsuche/ergebnis/schnellsuche"
     params = {'query': player_name}
     results = []
-    seen_urls = set()
     try:
-        response = requests.get(search_url, headers=HEADERS, params=params, timeout=10)
+        response = await fetcher.get(search_url, params=params)
         
         if response.status_code == 403:
             print(f"Transfermarkt access forbidden (403) for: {player_name}")
@@ -37,167 +762,38 @@ def search_players(player_name):
         if response.status_code != 200:
             print(f"Transfermarkt returned {response.status_code} for: {player_name}")
             return results
-        
-        # 1. Kontrol: Eğer direkt profile yönlendiyse (Tek sonuç durumu)
-        if "/profil/spieler/" in response.url:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            name = "-"
-            # Name extraction on profile page
-            header = soup.find('header', class_='data-header')
-            if header:
-                h1 = header.find('h1')
-                if h1: name = h1.get_text(separator=' ', strip=True)
-            
-            # Use real profile URL (response.url might contain fragments)
-            profile_url = response.url.split('?')[0]
-            return [{'name': name, 'url': profile_url, 'image_url': '', 'club': 'Direkt Sonuç'}]
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # 2. Arama kutularını bul
-        player_table = None
-        boxes = soup.find_all('div', class_='box')
-        for box in boxes:
-            header = box.find('h2', class_='content-box-headline')
-            if header and ('Futbolcu' in header.get_text() or 'Player' in header.get_text()):
-                player_table = box.find('table', class_='items')
-                break
-        
-        if not player_table:
-            player_table = soup.find('table', class_='items')
-            
-        if not player_table:
-            # Fallback: Eğer hiç sonuç yoksa ve isim çok kelimeliyse, ilk kelimeyle tekrar ara
-            parts = player_name.strip().split()
-            if len(parts) > 1 and not player_name.endswith(" "): # Avoid infinite loop
-                return search_players(parts[0])
-            return results
 
-        tbody = player_table.find('tbody')
-        if not tbody: return results
-
-        for row in tbody.find_all('tr', recursive=False):
-            link = row.find('a', href=re.compile(r'/profil/spieler/'))
-            if link:
-                href = link['href']
-                full_url = BASE_URL + href if not href.startswith('http') else href
-                if full_url in seen_urls: continue
-                seen_urls.add(full_url)
-                
-                # İsim: genelde title'da daha temizdir
-                name = link.get('title') or link.get_text(strip=True)
-                
-                img = row.find('img')
-                img_url = img.get('src') if img else ''
-                
-                club = "-"
-                club_img = row.find('img', class_='tiny_wappen')
-                if club_img: 
-                    club = club_img.get('title') or club_img.get('alt') or '-'
-                
-                results.append({
-                    'name': name, 
-                    'url': full_url, 
-                    'image_url': img_url, 
-                    'club': club
-                })
+        # Kelime varyantları search_players'da tam sorguyla aynı anda aranıyor
+        results = await parse_content(response.content, "search", parse_search_page, str(response.url)) or []
+        SEARCH_INDEX.add_results(player_name, results)
     except Exception as e:
         print(f"Search error for '{player_name}': {e}")
     return results
 
-def get_team_based_stats(profile_url):
+def parse_stats_table(soup_obj):
+    """Takım bazlı istatistik tablosunu ayrıştır (ilk dolu 'items' tablosu)"""
+    return TEAM_STATS.extract(soup_obj)
+
+async def get_team_based_stats(fetcher, profile_url):
     """Takım bazlı istatistikleri çek (Hem detay hem verien sayfasını dener)"""
     teams = []
-    
-    def parse_stats_table(soup_obj):
-        # 1. Klasik 'items' tablosunu ara
-        extracted = []
-        tables = soup_obj.find_all('table', class_='items')
-        for table in tables:
-            # Doğru tablo mu? Başlığında 'Kulüp' veya 'Club' geçiyor mu bakalım
-            # Veya direkt içeriğe bakalım.
-            tbody = table.find('tbody')
-            if not tbody: continue
-            
-            for row in tbody.find_all('tr'):
-                cells = row.find_all('td')
-                if len(cells) >= 5: # En az Logo, İsim, Maç, Gol, Asist
-                    team_name = ""
-                    team_logo = ""
-                    
-                    # Logo & İsim Çıkarma
-                    img = cells[0].find('img')
-                    if img: team_logo = img.get('src', '').replace('tiny', 'header')
-                    
-                    # İsim genelde 2. hücrededir (index 1) ama bazen resimle aynı hücrede olabilir.
-                    # Transfermarkt'ta genelde: td.zentriert(resim) | td.hauptlink(takım)
-                    if len(cells) > 1:
-                        txt = cells[1].get_text(strip=True)
-                        if txt: team_name = txt
-                        # Link varsa oradan al (daha temiz)
-                        a_tag = cells[1].find('a')
-                        if a_tag: team_name = a_tag.get_text(strip=True)
-                    
-                    if not team_name and img: # İsim yoksa resim alt textine bak
-                        team_name = img.get('alt', '')
-                    
-                    if not team_name: continue
-
-                    # İstatistikleri bulma (Maç, Gol, Asist)
-                    # "zentriert" class'ı olan hücreler sayısaldır.
-                    stats_cells = row.find_all('td', class_='zentriert')
-                    numeric_vals = []
-                    
-                    # İlk hücre (logo) genelde zentriert'tir, onu atlayalım.
-                    # Takım ismi (hauptlink) zentriert değildir.
-                    # Maç, Gol, Asist zentriert'tir.
-                    
-                    for sc in stats_cells:
-                        val = sc.get_text(strip=True)
-                        # Logo hücresi (boş veya img) olabilir, sayı değilse atla
-                        if not val and sc.find('img'): continue 
-                        
-                        # Sayı mı? (veya -)
-                        if val == '-' or val.isdigit() or re.match(r'^\d+$', val):
-                            numeric_vals.append(val.replace('-', '0'))
-                    
-                    # Beklenen sıra: [Maç, Gol, Asist, (Kartlar)...]
-                    # Ancak bazen "Kadroda olma" gibi sütunlar başa gelebilir.
-                    # Genelde en garantisi: items tablosunda sütun başlıklarına bakmaktır ama th'lere erişmek zor.
-                    # Varsayım: İlk 3 sayısal değer Maç, Gol, Asist'tir.
-                    
-                    if len(numeric_vals) >= 3:
-                        extracted.append({
-                            "team": team_name,
-                            "team_logo": team_logo,
-                            "appearances": numeric_vals[0],
-                            "goals": numeric_vals[1],
-                            "assists": numeric_vals[2]
-                        })
-            if extracted: break # İlk dolu tabloyu al
-        return extracted
 
     try:
         # A. Kullanıcının istediği 'leistungsdatendetails' sayfası
         target_url = profile_url.replace('/profil/', '/leistungsdatendetails/')
-        resp = requests.get(target_url, headers=HEADERS, timeout=10)
-        soup = BeautifulSoup(resp.content, 'html.parser')
-        
         # Kullanıcının bahsettiği component 'tm-performance-per-entity-table'
         # Ama BS4 bunu sadece tag olarak görür. İçinde standart table varsa 'items' ile yakalarız.
         # Genelde bu sayfada "Sezon" tablosu ve "Kulüp" tablosu olur.
         # Kulüp tablosunu bulmak için başlığa bakabiliriz.
         
         # Önce bu sayfasaki tüm tabloları dene
-        stats = parse_stats_table(soup)
+        stats = await fetcher.extract(target_url, "items", parse_stats_table)
         
         # Eğer boş geldiyse veya çok azsa, eski yönteme (leistungsdatenverein) dön
         if not stats:
             # B. Dedicated Sayfa
             v_url = profile_url.replace('/profil/', '/leistungsdatenverein/')
-            v_resp = requests.get(v_url, headers=HEADERS, timeout=10)
-            v_soup = BeautifulSoup(v_resp.content, 'html.parser')
-            stats = parse_stats_table(v_soup)
+            stats = await fetcher.extract(v_url, "items", parse_stats_table)
             
         teams = stats
 
@@ -206,148 +802,115 @@ def get_team_based_stats(profile_url):
         
     return teams
 
-def get_all_performance_data(profile_url, soup_obj=None):
+def parse_rows(tbody_obj):
+    """Turnuva bazlı performans satırlarını ayrıştır (toplam satırı hariç)"""
+    if not tbody_obj: return []
+    return COMPETITION_STATS.extract_rows(tbody_obj)
+
+def parse_profile_current_season(soup_obj):
+    """Ana profildeki 'Bu sezonki performansı' tablosunu ayrıştır"""
+    # Transfermarkt ana profilde "Bu sezonki performansı" tablosunu arıyoruz.
+    headers = soup_obj.find_all(['div', 'h2'], string=re.compile(r'Bu sezonki performansı|Stats current season|Leistungsdaten der aktuellen Saison', re.IGNORECASE))
+    for h in headers:
+        # Genellikle başlığın hemen sonrasındaki tablo veya parent'ın içindeki tablo
+        parent = h.find_parent('div', class_='box')
+        if parent:
+            tbl = parent.find('table')
+        else:
+            tbl = h.find_next('table')
+        
+        if tbl and tbl.find('tbody'):
+            data = parse_rows(tbl.find('tbody'))
+            if data:
+                return data
+    return []
+
+def parse_season_page(soup_obj):
+    """leistungsdaten sezon sayfasındaki turnuva tablosunu ayrıştır"""
+    tbl = soup_obj.find('table', class_='items')
+    if tbl and tbl.find('tbody'):
+        return parse_rows(tbl.find('tbody'))
+    return []
+
+def parse_career_total(soup_obj):
+    """leistungsdatendetails sayfasının tfoot satırından kariyer toplamını çıkar"""
+    return career_total(soup_obj)
+
+def current_season_url(profile_url):
+    now = datetime.datetime.now()
+    current_season_year = now.year if now.month >= 7 else now.year - 1
+    
+    base_perf_url = profile_url.replace('/profil/', '/leistungsdaten/').split('?')[0]
+    if '/plus/' not in base_perf_url:
+        base_perf_url = base_perf_url.rstrip('/') + "/plus/1"
+    
+    return f"{base_perf_url}?saison_id={current_season_year}"
+
+async def get_current_season(fetcher, profile_url, soup_obj=None):
+    """Güncel sezon performansı (önce profil tablosu, yoksa sezon detay sayfası)"""
+    try:
+        # ÖNCELİK: Ana Profil Tablosu (profil oluşturulurken zaten indirilen soup paylaşılır)
+        if soup_obj is None:
+            data = await fetcher.extract(profile_url, "profile", parse_profile_current_season, timeout=PROFILE_TIMEOUT)
+        else:
+            data = await run_parse(parse_profile_current_season, soup_obj)
+        if data:
+            return data
+
+        # Eğer profilde bulamadıysak detay sayfasına git
+        return await fetcher.extract(current_season_url(profile_url), "items", parse_season_page)
+    except Exception as e:
+        print(f"Perf error: {e}")
+    return []
+
+async def get_career_total(fetcher, profile_url):
+    try:
+        career_url = profile_url.replace('/profil/', '/leistungsdatendetails/')
+        return await fetcher.extract(career_url, "items", parse_career_total)
+    except Exception as e:
+        print(f"Perf error: {e}")
+    return None
+
+async def get_all_performance_data(fetcher, profile_url, soup_obj=None):
     """Tüm performans verilerini çek (Turnuva bazlı detaylı)"""
+    return await cached(fetcher, "performance", player_id_from_url(profile_url),
+                        lambda: load_performance_data(fetcher, profile_url, soup_obj),
+                        signal=lambda: change_signal(fetcher, profile_url))
+
+async def load_performance_data(fetcher, profile_url, soup_obj=None):
     result = {
         "current_season": [], 
         "career_total": {"appearances": "0", "goals": "0", "assists": "0"},
         "by_team": []
     }
-    
-    def parse_rows(tbody_obj):
-        rows_data = []
-        if not tbody_obj: return rows_data
-        for row in tbody_obj.find_all('tr'):
-            cells = row.find_all('td')
-            if len(cells) > 5:
-                # 0:Logo, 1:Ad, 2:Maç, 3:Gol, 4:Asist ... Son: Dakika
-                comp = cells[1].get_text(strip=True)
-                # Bazen resim var text yok, düzeltelim:
-                if not comp:
-                     a_tag = cells[1].find('a')
-                     if a_tag: comp = a_tag.get_text(strip=True)
-                
-                if not comp: continue
-
-                apps = cells[2].get_text(strip=True)
-                goals = cells[3].get_text(strip=True)
-                assists = cells[4].get_text(strip=True)
-                minutes = cells[-1].get_text(strip=True).replace("'", "")
-                
-                # Toplam satırını elemek için:
-                if comp.lower() == 'toplam' or comp.lower() == 'total': continue
-
-                if apps != "-" and apps != "":
-                    rows_data.append({
-                        "competition": comp,
-                        "appearances": apps,
-                        "goals": goals,
-                        "assists": assists,
-                        "minutes": minutes
-                    })
-        return rows_data
-
-    try:
-        # 1. Takım Bazlı (Mevcut fonksiyon)
-        result["by_team"] = get_team_based_stats(profile_url)
-        
-        # 2. Güncel Sezon (ÖNCELİK: Ana Profil Tablosu)
-        found = False
-        if soup_obj:
-            # Transfermarkt ana profilde "Bu sezonki performansı" tablosunu arıyoruz.
-            headers = soup_obj.find_all(['div', 'h2'], string=re.compile(r'Bu sezonki performansı|Stats current season|Leistungsdaten der aktuellen Saison', re.IGNORECASE))
-            for h in headers:
-                # Genellikle başlığın hemen sonrasındaki tablo veya parent'ın içindeki tablo
-                parent = h.find_parent('div', class_='box')
-                if parent:
-                    tbl = parent.find('table')
-                else:
-                    tbl = h.find_next('table')
-                
-                if tbl and tbl.find('tbody'):
-                    data = parse_rows(tbl.find('tbody'))
-                    if data:
-                        result["current_season"] = data
-                        found = True
-                        break
-        
-        # 3. Eğer profilde bulamadıysak detay sayfasına git
-        if not found:
-             import datetime
-             now = datetime.datetime.now()
-             current_season_year = now.year if now.month >= 7 else now.year - 1
-             
-             base_perf_url = profile_url.replace('/profil/', '/leistungsdaten/').split('?')[0]
-             if '/plus/' not in base_perf_url:
-                 base_perf_url = base_perf_url.rstrip('/') + "/plus/1"
-             
-             season_url = f"{base_perf_url}?saison_id={current_season_year}"
-             
-             season_resp = requests.get(season_url, headers=HEADERS, timeout=10)
-             season_soup = BeautifulSoup(season_resp.content, 'html.parser')
-             
-             tbl = season_soup.find('table', class_='items')
-             if tbl and tbl.find('tbody'):
-                 result["current_season"] = parse_rows(tbl.find('tbody'))
-
-        # 4. Kariyer Toplamı
-        career_url = profile_url.replace('/profil/', '/leistungsdatendetails/')
-        c_resp = requests.get(career_url, headers=HEADERS, timeout=10)
-        c_soup = BeautifulSoup(c_resp.content, 'html.parser')
-        c_table = c_soup.find('table', class_='items')
-        if c_table and c_table.find('tfoot'):
-            cells = c_table.find('tfoot').find_all('td')
-            if len(cells) >= 7:
-                 result["career_total"] = {
-                     "appearances": re.sub(r'[^\d]', '', cells[4].get_text(strip=True)),
-                     "goals": re.sub(r'[^\d]', '', cells[5].get_text(strip=True)),
-                     "assists": re.sub(r'[^\d]', '', cells[6].get_text(strip=True))
-                 }
 
-    except Exception as e:
-        print(f"Perf error: {e}")
-        
+    # Takım bazlı, güncel sezon ve kariyer toplamı birbirinden bağımsız: aynı anda çek
+    by_team, current_season, career_total = await asyncio.gather(
+        get_team_based_stats(fetcher, profile_url),
+        get_current_season(fetcher, profile_url, soup_obj),
+        get_career_total(fetcher, profile_url),
+    )
+    result["by_team"] = by_team
+    result["current_season"] = current_season
+    if career_total:
+        result["career_total"] = career_total
     return result
 
-def get_injury_history(profile_url):
+def parse_injury_table(soup):
+    """verletzungen sayfasındaki sakatlık tablosunu ayrıştır"""
+    return INJURIES.extract(soup)
+
+async def get_injury_history(fetcher, profile_url):
     """Sakatlık geçmişini çek"""
+    return await cached(fetcher, "injuries", player_id_from_url(profile_url),
+                        lambda: load_injury_history(fetcher, profile_url),
+                        signal=lambda: change_signal(fetcher, profile_url))
+
+async def load_injury_history(fetcher, profile_url):
     injuries = []
     try:
         injury_url = profile_url.replace('/profil/', '/verletzungen/')
-        response = requests.get(injury_url, headers=HEADERS, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        table = soup.find('table', class_='items')
-        if table:
-            tbody = table.find('tbody')
-            if tbody:
-                for row in tbody.find_all('tr'):
-                    cells = row.find_all('td')
-                    if len(cells) >= 4:
-                        injury_name = ""
-                        season = ""
-                        days = ""
-                        matches_missed = ""
-                        for td in cells:
-                            text = td.get_text(strip=True)
-                            if re.match(r'\d{2}/\d{2}', text):
-                                season = text
-                            elif 'gün' in text.lower():
-                                days = text
-                            elif len(text) > 5 and not re.search(r'\d{4}', text):
-                                if not injury_name:
-                                    injury_name = text
-                        for td in reversed(cells):
-                            text = td.get_text(strip=True)
-                            if text.isdigit():
-                                matches_missed = text
-                                break
-                        if injury_name:
-                            injuries.append({
-                                "season": season or "-",
-                                "injury": injury_name,
-                                "days": days or "-",
-                                "matches_missed": matches_missed or "-"
-                            })
+        injuries = await fetcher.extract(injury_url, "items", parse_injury_table)
     except Exception as e:
         print(f"Injury data error: {e}")
     return injuries
@@ -362,53 +925,140 @@ def get_market_value_history(soup):
                 # Extract the series data using regex
                 match = re.search(r'\'data\':\s*(\[.*?\])\s*\}', script.string, re.DOTALL)
                 if match:
-                    import json
                     # Pre-process the JS-like data to be valid JSON (handles some single quotes and keys)
                     data_str = match.group(1).replace("'", '"')
                     # This is a bit risky but we'll try to refine it if it fails
                     try:
                         data_json = json.loads(data_str)
                         for entry in data_json:
-                            history.append({
-                                'date': entry.get('datum_mw', '-'),
-                                'value': entry.get('mw', '-'),
-                                'club': entry.get('verein', '-')
-                            })
+                            history.append(mv_point(entry.get('datum_mw', '-'), entry.get('mw', '-'),
+                                                    entry.get('verein', '-')))
                     except:
                         # Fallback simple regex if json.loads fails
                         points = re.findall(r'datum_mw":"(.*?)"(?:.*?)"mw":"(.*?)"(?:.*?)"verein":"(.*?)"', script.string)
                         for d, v, c in points:
-                            history.append({'date': d, 'value': v, 'club': c})
+                            history.append(mv_point(d, v, c))
                 break
     except Exception as e:
         print(f"Market value history error: {e}")
     return history
 
-def get_mv_history_from_page(player_url):
+# Türkçe, İngilizce ve Almanca ay kısaltmaları
+MONTHS = {
+    'oca': 1, 'şub': 2, 'mar': 3, 'nis': 4, 'may': 5, 'haz': 6,
+    'tem': 7, 'ağu': 8, 'eyl': 9, 'eki': 10, 'kas': 11, 'ara': 12,
+    'jan': 1, 'feb': 2, 'apr': 4, 'jun': 6, 'jul': 7, 'aug': 8,
+    'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+    'mär': 3, 'mai': 5, 'okt': 10, 'dez': 12,
+}
+
+MV_MULTIPLIERS = (
+    (re.compile(r'^(mlr|mrd|bn)'), 1_000_000_000),
+    (re.compile(r'^(mil|mio|m\b)'), 1_000_000),
+    (re.compile(r'^(bin|tsd|k\b)'), 1_000),
+)
+
+def parse_market_value(text):
+    """'35,00 mil. €', '500 bin €', '€1.20bn' gibi metni tam sayı euroya çevirir; olmazsa None"""
+    match = re.search(r'(\d+(?:[.,]\d+)?)\s*(\S*)', (text or '').lower().replace('€', ' '))
+    if not match:
+        return None
+    number = float(match.group(1).replace(',', '.'))
+    for pattern, multiplier in MV_MULTIPLIERS:
+        if pattern.match(match.group(2)):
+            return round(number * multiplier)
+    return round(number)
+
+def parse_mv_date(text):
+    """'Oca 1, 2024', 'Jan 1, 2024', '01.01.2024' veya '2024-01-01' -> '2024-01-01'; olmazsa None"""
+    text = (text or '').strip().lower()
+    try:
+        match = re.match(r'(\w{3})\w*\.?\s+(\d{1,2}),?\s+(\d{4})$', text)
+        if match and match.group(1) in MONTHS:
+            return datetime.date(int(match.group(3)), MONTHS[match.group(1)], int(match.group(2))).isoformat()
+        match = re.match(r'(\d{1,2})\.(\d{1,2})\.(\d{4})$', text)
+        if match:
+            return datetime.date(int(match.group(3)), int(match.group(2)), int(match.group(1))).isoformat()
+        return datetime.date.fromisoformat(text).isoformat()
+    except ValueError:
+        return None
+
+def mv_point(date, value, club, euros=None, timestamp=None):
+    """Geçmiş noktası; metinlerin yanında bir kez normalize edilmiş ISO tarih ve euro değeri"""
+    date_iso = None
+    if isinstance(timestamp, (int, float)):
+        date_iso = datetime.datetime.fromtimestamp(timestamp / 1000, datetime.timezone.utc).date().isoformat()
+    return {
+        'date': date,
+        'value': value,
+        'club': club,
+        'date_iso': date_iso or parse_mv_date(date),
+        'value_eur': int(euros) if isinstance(euros, (int, float)) else parse_market_value(value),
+    }
+
+def parse_mv_graph(data):
+    """CEAPI marketValueDevelopment/graph cevabını geçmiş listesine çevir"""
+    history = []
+    # CEAPI returns a structure: {'list': [{'y': 35000000, 'datum_mw': 'Run 23, 2025', ...}, ...]}
+    # The keys might vary, let's inspect usually 'list' or straight array
+    items = data.get('list', []) if isinstance(data, dict) else []
+    if not items and isinstance(data, list): items = data
+    
+    for item in items:
+        # 'y' is usually raw value (e.g. 35000000), 'mw' is formatted (e.g. "35.00 mil. €"), 'x' ms timestamp
+        history.append(mv_point(item.get('datum_mw', '-'), item.get('mw', '-'), item.get('verein', '-'),
+                                item.get('y'), item.get('x')))
+    return history
+
+def parse_mv_page(soup):
+    """marktwertverlauf sayfasındaki Highcharts script'inden geçmişi çıkar"""
+    history = []
+    scripts = soup.find_all('script')
+    for script in scripts:
+        if script.string and ('Highcharts.Chart' in script.string or 'marktwertverlauf' in script.string):
+            # Try to find 'data': [...]
+            # We look for the array of objects inside 'data'
+            # Regex to capture content inside data: [ ... ]
+            match = re.search(r'[\"\']data[\"\']\s*:\s*(\[\{.*?\}\])', script.string, re.DOTALL)
+            if match:
+                # The data is usually JS object literals, not strict JSON. 
+                # We need to parse strict JSON or regex extract fields.
+                # Given python's limitation with JS objects, regex extraction per item is safer.
+                blob = match.group(1)
+                # Find all objects {...}
+                # This regex finds balanced braces roughly or just items with date/value
+                entries = re.findall(r'\{[^{}]*?datum_mw[^{}]*?\}', blob, re.DOTALL)
+                for entry in entries:
+                     datum = re.search(r'[\"\']datum_mw[\"\']\s*:\s*[\"\'](.*?)[\"\']', entry)
+                     mw = re.search(r'[\"\']mw[\"\']\s*:\s*[\"\'](.*?)[\"\']', entry)
+                     verein = re.search(r'[\"\']verein[\"\']\s*:\s*[\"\'](.*?)[\"\']', entry)
+                     
+                     if datum and mw:
+                         # Decode unicode escapes if any
+                         d_val = datum.group(1).encode().decode('unicode-escape')
+                         m_val = mw.group(1).encode().decode('unicode-escape')
+                         c_val = verein.group(1).encode().decode('unicode-escape') if verein else '-'
+                         
+                         history.append(mv_point(d_val, m_val, c_val))
+                if history: return history
+    return history
+
+async def get_mv_history_from_page(fetcher, player_url):
     """Fetch market value history using CEAPI (primary) or scraping (fallback)"""
+    return await cached(fetcher, "market_value", player_id_from_url(player_url),
+                        lambda: load_mv_history(fetcher, player_url))
+
+async def load_mv_history(fetcher, player_url):
     history = []
     
     # 1. Try CEAPI (Most reliable)
     try:
-        player_id = re.search(r'/spieler/(\d+)', player_url)
-        if player_id:
-            pid = player_id.group(1)
+        pid = player_id_from_url(player_url)
+        if pid:
             api_url = f"{BASE_URL}/ceapi/marketValueDevelopment/graph/{pid}"
-            resp = requests.get(api_url, headers=HEADERS, timeout=5)
-            if resp.status_code == 200:
-                data = resp.json()
-                # CEAPI returns a structure: {'list': [{'y': 35000000, 'datum_mw': 'Run 23, 2025', ...}, ...]}
-                # The keys might vary, let's inspect usually 'list' or straight array
-                items = data.get('list', [])
-                if not items and isinstance(data, list): items = data
-                
-                for item in items:
-                    # 'y' is usually raw value (e.g. 35000000), 'mw' is formatted (e.g. "35.00 mil. €")
-                    history.append({
-                        'date': item.get('datum_mw', '-'),
-                        'value': item.get('mw', '-'),
-                        'club': item.get('verein', '-')
-                    })
+            data = await fetcher.get_json(api_url)
+            if data is not None:
+                history = parse_mv_graph(data)
                 if history: return history
     except Exception as e:
         print(f"CEAPI MV error: {e}")
@@ -416,291 +1066,857 @@ def get_mv_history_from_page(player_url):
     # 2. Fallback: Scraping from the dedicated MV page
     try:
         mv_url = player_url.replace('/profil/', '/marktwertverlauf/')
-        response = requests.get(mv_url, headers=HEADERS, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        scripts = soup.find_all('script')
-        for script in scripts:
-            if script.string and ('Highcharts.Chart' in script.string or 'marktwertverlauf' in script.string):
-                # Try to find 'data': [...]
-                # We look for the array of objects inside 'data'
-                # Regex to capture content inside data: [ ... ]
-                match = re.search(r'[\"\']data[\"\']\s*:\s*(\[\{.*?\}\])', script.string, re.DOTALL)
-                if match:
-                    import json
-                    # The data is usually JS object literals, not strict JSON. 
-                    # We need to parse strict JSON or regex extract fields.
-                    # Given python's limitation with JS objects, regex extraction per item is safer.
-                    blob = match.group(1)
-                    # Find all objects {...}
-                    # This regex finds balanced braces roughly or just items with date/value
-                    entries = re.findall(r'\{[^{}]*?datum_mw[^{}]*?\}', blob, re.DOTALL)
-                    for entry in entries:
-                         datum = re.search(r'[\"\']datum_mw[\"\']\s*:\s*[\"\'](.*?)[\"\']', entry)
-                         mw = re.search(r'[\"\']mw[\"\']\s*:\s*[\"\'](.*?)[\"\']', entry)
-                         verein = re.search(r'[\"\']verein[\"\']\s*:\s*[\"\'](.*?)[\"\']', entry)
-                         
-                         if datum and mw:
-                             # Decode unicode escapes if any
-                             d_val = datum.group(1).encode().decode('unicode-escape')
-                             m_val = mw.group(1).encode().decode('unicode-escape')
-                             c_val = verein.group(1).encode().decode('unicode-escape') if verein else '-'
-                             
-                             history.append({
-                                 'date': d_val,
-                                 'value': m_val,
-                                 'club': c_val
-                             })
-                    if history: return history
+        history = await fetcher.extract(mv_url, "scripts", parse_mv_page)
     except Exception as e:
         print(f"MV Scrape fallback error: {e}")
         
     return history
 
-def scrape_player_profile(url):
+def parse_transfer_history(data):
+    """CEAPI transferHistory cevabını transfer listesine çevir"""
+    transfers = []
+    for t in data.get('transfers', []):
+        transfers.append({
+            'season': t.get('season', '-'),
+            'date': t.get('date', '-'),
+            'from_club': t.get('from', {}).get('clubName', '-'),
+            'to_club': t.get('to', {}).get('clubName', '-'),
+            'market_value': t.get('marketValue', '-'),
+            'fee': t.get('fee', '-')
+        })
+    return transfers
+
+async def get_transfer_history(fetcher, player_id, profile_url=None):
+    """Transfer geçmişini CEAPI üzerinden çek"""
+    if not player_id:
+        return []
+    # Sinyal için profil sayfası, iş içinde zaten indirilen URL ile aynı olmalı
+    profile_url = profile_url or profile_url_for(player_id)
+    return await cached(fetcher, "transfers", player_id,
+                        lambda: load_transfer_history(fetcher, player_id),
+                        signal=lambda: change_signal(fetcher, profile_url))
+
+async def load_transfer_history(fetcher, player_id):
+    try:
+        data = await fetcher.get_json(f"{BASE_URL}/ceapi/transferHistory/list/{player_id}", timeout=PAGE_TIMEOUT)
+        if data is not None:
+            return parse_transfer_history(data)
+    except: pass
+    return []
+
+def parse_profile_page(soup, url, player_id):
+    """Profil sayfasındaki başlık, bilgi tablosu ve diğer kutuları ayrıştır"""
+    data = {
+        "url": url,
+        "player_id": player_id,
+        "name": "-",
+        "full_name": "-",
+        "jersey_number": "-",
+        "image_url": "",
+        "market_value": "-",
+        "highest_market_value": "-",
+        "market_value_last_update": "-",
+        "market_value_history": [],
+        "club": "-",
+        "club_image_url": "",
+        "contract_expires": "-",
+        "position": "-",
+        "secondary_positions": [],
+        "age": "-",
+        "birth_date": "-",
+        "birth_place": "-",
+        "nationality": "-",
+        "height": "-",
+        "foot": "-",
+        "agent": "-",
+        "outfitter": "-",
+        "social_media": [],
+        "league_name": "-",
+        "league_image_url": "-",
+        "youth_clubs": [],
+        "success_badges": [],
+        "national_team": {"name": "-", "matches": "-", "goals": "-", "debut": "-"},
+        "transfer_history": [],
+        "performance": {
+            "current_season": {"appearances": "0", "goals": "0", "assists": "0"},
+            "career_total": {"appearances": "0", "goals": "0", "assists": "0"},
+            "by_team": []
+        },
+        "injuries": []
+    }
+
+    # Seçiciler (schema.PROFILE) tek geçişte dizinlenir; aramalar ağacı yeniden taramaz
+    page = PROFILE.index(soup)
+
+    # 1. Header Info
+    header = page.first('header')
+    if header:
+        h1 = page.first('headline', within=header)
+        if h1:
+            num = page.first('shirt_number', within=h1)
+            data['jersey_number'] = num.get_text(strip=True).replace('#', '') if num else "-"
+            # Name often follows the number, strip extra whitespace
+            data['name'] = h1.get_text(separator=' ', strip=True).replace(f'#{data["jersey_number"]}', '').strip()
+
+        img = page.first('image', within=header)
+        if img: data['image_url'] = img.get('src', '')
+
+        # Market Value from header
+        mv_box = page.first('market_value_box', within=header)
+        if mv_box:
+            mv_tag = descendant(mv_box, 'a')
+            if mv_tag:
+                # 'separator=" "' ensures "12.00" and "mil. €" are joined with space if they are in different tags
+                raw_mv = mv_tag.get_text(separator=' ', strip=True)
+                # Bazen pipe veya "Son güncelleme" gibi metinler karışabilir, temizleyelim
+                raw_mv = raw_mv.split('|')[0].split('Son')[0].strip()
+                # Fazla boşlukları tek boşluğa indir
+                data['market_value'] = WHITESPACE.sub(' ', raw_mv)
+                update = descendant(mv_tag, 'p', 'data-header__last-update')
+                if update:
+                     data['market_value_last_update'] = update.get_text(strip=True).replace('Son güncelleme:', '').strip()
+
+        # Club info in header
+        club_box = page.first('club_box', within=header)
+        if club_box:
+            c_img = descendant(club_box, 'img')
+            if c_img: data['club_image_url'] = c_img.get('src', '')
+
+        club_name = page.first('club', within=header)
+        if club_name: data['club'] = club_name.get_text(strip=True)
+
+        # League info in header
+        league_span = page.first('league', within=header)
+        if league_span:
+            l_link = descendant(league_span, 'a')
+            if l_link:
+                data['league_name'] = l_link.get_text(strip=True)
+                l_img = descendant(l_link, 'img')
+                if l_img: data['league_image_url'] = l_img.get('src', '')
+
+        # Success badges in header
+        for b in page.all('badges', within=header):
+            b_img = descendant(b, 'img')
+            if b_img:
+                data['success_badges'].append({
+                    "name": b_img.get('alt', ''),
+                    "count": b.get_text(strip=True),
+                    "image_url": b_img.get('src', '')
+                })
+
+    # 2. Detailed Info Table (etiket -> alan eşlemesi schema.PROFILE_INFO'da)
+    info_table = page.first('info_table')
+    if info_table:
+        for reg in page.all('info_labels', within=info_table):
+            rule = PROFILE_INFO.match(reg.get_text(strip=True).replace(':', '').lower())
+            if rule is None: continue
+            bold = next_sibling(reg, 'span', 'info-table__content--bold')
+            if bold: PROFILE_INFO.apply(data, rule, bold.get_text(strip=True), bold)
+
+    # 3. National Team
+    if header:
+        for li in page.all('header_labels', within=header):
+            rule = NATIONAL_TEAM.match(li.get_text().lower())
+            if rule: NATIONAL_TEAM.apply(data['national_team'], rule, None, li)
+
+    # 4. Secondary Positions
+    pos_box = page.first('positions_box')
+    if pos_box:
+        for p in page.all('positions', within=pos_box):
+            txt = p.get_text(strip=True)
+            if txt and txt != data.get('position'):
+                if txt not in data['secondary_positions']:
+                    data['secondary_positions'].append(txt)
+
+    # 5. Youth Clubs
+    youth_h2 = next((h for h in page.all('headlines') if h.string is not None and YOUTH_HEADLINE.search(h.string)), None)
+    if youth_h2:
+        y_box = youth_h2.find_next('div', class_='content')
+        if y_box:
+            data['youth_clubs'] = [c.strip() for c in y_box.get_text(strip=True).split(',') if c.strip()]
+
+    # 6. Highest MV and Update
+    hv_tag = page.first('max_value')
+    if hv_tag:
+        data['highest_market_value'] = hv_tag.get_text(strip=True)
+
+    return data
+
+# Profil başlığına ek olarak istenebilen alt bölümler (anahtar = profil sözlüğündeki alan)
+SECTION_LOADERS = {
+    "performance": lambda fetcher, url, player_id: get_all_performance_data(fetcher, url),
+    "injuries": lambda fetcher, url, player_id: get_injury_history(fetcher, url),
+    "market_value_history": lambda fetcher, url, player_id: get_mv_history_from_page(fetcher, url),
+    "transfer_history": lambda fetcher, url, player_id: get_transfer_history(fetcher, player_id, url),
+}
+ALL_SECTIONS = tuple(SECTION_LOADERS)
+
+SECTION_ALIASES = {
+    "market_value": "market_value_history",
+    "market-value": "market_value_history",
+    "transfers": "transfer_history",
+}
+
+def parse_include(include):
+    """'performance,injuries' / 'all' gibi bir include değerini bölüm adlarına çevir"""
+    names = set()
+    for part in (include or "").split(','):
+        part = part.strip().lower()
+        if not part or part == "profile":
+            continue
+        if part == "all":
+            return ALL_SECTIONS
+        name = SECTION_ALIASES.get(part, part)
+        if name not in SECTION_LOADERS:
+            raise ValueError(part)
+        names.add(name)
+    return tuple(n for n in ALL_SECTIONS if n in names)
+
+def profile_url_for(player_id):
+    # Transfermarkt slug'a bakmıyor; sadece ID ile profil URL'si kurulabilir
+    return f"{BASE_URL}/-/profil/spieler/{player_id}"
+
+def player_flight_key(url, include=ALL_SECTIONS):
+    """Aynı oyuncunun farklı slug/parametreli URL'leri tek anahtara düşer"""
+    player_id = player_id_from_url(url)
+    if player_id:
+        return ("player", player_id, include)
+    return ("player", url.split('#')[0].split('?')[0].rstrip('/').lower(), include)
+
+# Bölüm adı -> önbellekteki kaynak türü
+SECTION_RESOURCES = {
+    "performance": "performance",
+    "injuries": "injuries",
+    "market_value_history": "market_value",
+    "transfer_history": "transfers",
+}
+
+def run_in_background(key, job):
+    """job()'u arka planda çalıştır; aynı anahtarla çalışan bir iş varsa yenisini başlatma"""
+    if key in FLIGHTS.calls or FLIGHTS.busy_elsewhere(key):
+        return
+    task = asyncio.ensure_future(FLIGHTS.do(key, job))
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(BACKGROUND_TASKS.discard)
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+async def refresh_player(url, resources):
+    """Verilen kaynak türlerini önbelleği atlayarak yeniden kazı ve önbelleğe yaz"""
+    REFRESH_STATS["background_refreshes"] += 1
+    include = tuple(name for name in ALL_SECTIONS if SECTION_RESOURCES[name] in resources)
+    fetcher = Fetcher(refresh=resources)
+    try:
+        await build_player_profile(fetcher, url, include)
+    finally:
+        fetcher.cancel_pending()
+
+def revalidate_stale(fetcher, url):
+    """İş sırasında stale sunulan bölümleri arka planda yenile"""
+    if fetcher.stale and not fetcher.refresh:
+        resources = frozenset(fetcher.stale)
+        run_in_background(("refresh", player_flight_key(url)[1]), lambda: refresh_player(url, resources))
+
+async def refresh_hot_players():
+    while True:
+        await asyncio.sleep(HOT_REFRESH_INTERVAL)
+        try:
+            refresh_hot_players_once()
+        except Exception as e:
+            print(f"Hot player refresh error: {e}")
+
+def refresh_hot_players_once():
+    """En çok istenen oyuncuların süresi dolmak üzere olan bölümlerini yenilemeye başla"""
+    HOT_PLAYERS.decay(HOT_DECAY)
+    if GOVERNOR.is_open():
+        return 0
+    started = 0
+    for player_id, _ in HOT_PLAYERS.top(HOT_PLAYERS_K):
+        resources = set()
+        for resource in PLAYER_RESOURCES:
+            left = CACHE.expires_in(resource, player_id)
+            if left is not None and left < HOT_REFRESH_LEAD:
+                resources.add(resource)
+        if resources:
+            url = profile_url_for(player_id)
+            run_in_background(("refresh", player_id), lambda url=url, r=frozenset(resources): refresh_player(url, r))
+            REFRESH_STATS["hot_refreshes"] += 1
+            started += 1
+    return started
+
+def trace_player(player_id):
+    """Trace loglarının oyuncu ID'si ile etiketlenmesi için"""
+    trace = CURRENT_TRACE.get()
+    if trace is not None and trace.player_id is None:
+        trace.player_id = player_id
+
+async def scrape_player_profile(url, include=ALL_SECTIONS):
+    player_id = player_id_from_url(url)
+    if player_id:
+        HOT_PLAYERS.touch(player_id)
+        trace_player(player_id)
+    return await FLIGHTS.do(player_flight_key(url, include), lambda: scrape_player_profile_once(url, include))
+
+async def scrape_player_profile_once(url, include=ALL_SECTIONS):
+    fetcher = Fetcher()
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
+        return await build_player_profile(fetcher, url, include)
+    finally:
+        fetcher.cancel_pending()
+        revalidate_stale(fetcher, url)
+
+async def get_player_section(name, player_id):
+    """Tek bir alt bölümü (ör. sakatlıklar) profil sayfasına gitmeden getir"""
+    HOT_PLAYERS.touch(player_id)
+    trace_player(player_id)
+
+    async def load():
+        fetcher = Fetcher()
+        url = profile_url_for(player_id)
+        try:
+            return await SECTION_LOADERS[name](fetcher, url, player_id)
+        finally:
+            fetcher.cancel_pending()
+            revalidate_stale(fetcher, url)
+    return await FLIGHTS.do((name, player_id), load)
+
+async def get_profile_header(fetcher, url, player_id):
+    """Profil sayfasının kendisinden çıkan bölüm (başlık, bilgi tablosu, altyapı vb.)"""
+    async def load():
+        response = await fetcher.get(url, timeout=PROFILE_TIMEOUT)
         if response.status_code != 200:
-            return {"error": f"Transfermarkt error: {response.status_code}"}
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        player_id = None
-        m = re.search(r'/spieler/(\d+)', url)
-        if m: player_id = m.group(1)
-        
-        data = {
-            "url": url,
-            "player_id": player_id,
-            "name": "-",
-            "full_name": "-",
-            "jersey_number": "-",
-            "image_url": "",
-            "market_value": "-",
-            "highest_market_value": "-",
-            "market_value_last_update": "-",
-            "market_value_history": [],
-            "club": "-",
-            "club_image_url": "",
-            "contract_expires": "-",
-            "position": "-",
-            "secondary_positions": [],
-            "age": "-",
-            "birth_date": "-",
-            "birth_place": "-",
-            "nationality": "-",
-            "height": "-",
-            "foot": "-",
-            "agent": "-",
-            "outfitter": "-",
-            "social_media": [],
-            "league_name": "-",
-            "league_image_url": "-",
-            "youth_clubs": [],
-            "success_badges": [],
-            "national_team": {"name": "-", "matches": "-", "goals": "-", "debut": "-"},
-            "transfer_history": [],
-            "performance": {
-                "current_season": {"appearances": "0", "goals": "0", "assists": "0"},
-                "career_total": {"appearances": "0", "goals": "0", "assists": "0"},
-                "by_team": []
-            },
-            "injuries": []
-        }
+            raise UpstreamError(url, response.status_code)
+        data = await fetcher.extract(url, "profile", parse_profile_page, url, player_id, timeout=PROFILE_TIMEOUT)
+        SEARCH_INDEX.add({k: data[k] for k in ("name", "url", "image_url", "club")}, player_id)
+        return data
+    return await cached(fetcher, "profile", player_id, load)
 
-        # 1. Header Info
-        header = soup.find('header', class_='data-header')
-        if header:
-            h1 = header.find('h1', class_='data-header__headline-wrapper')
-            if h1:
-                num = h1.find('span', class_='data-header__shirt-number')
-                data['jersey_number'] = num.get_text(strip=True).replace('#', '') if num else "-"
-                # Name often follows the number, strip extra whitespace
-                data['name'] = h1.get_text(separator=' ', strip=True).replace(f'#{data["jersey_number"]}', '').strip()
-
-            img = header.find('img', class_='data-header__profile-image')
-            if img: data['image_url'] = img.get('src', '')
-
-            # Market Value from header
-            mv_box = header.find('div', class_='data-header__box--small')
-            if mv_box:
-                mv_tag = mv_box.find('a')
-                if mv_tag:
-                    # 'separator=" "' ensures "12.00" and "mil. €" are joined with space if they are in different tags
-                    raw_mv = mv_tag.get_text(separator=' ', strip=True)
-                    # Bazen pipe veya "Son güncelleme" gibi metinler karışabilir, temizleyelim
-                    raw_mv = raw_mv.split('|')[0].split('Son')[0].strip()
-                    # Fazla boşlukları tek boşluğa indir
-                    data['market_value'] = re.sub(r'\s+', ' ', raw_mv)
-                    update = mv_tag.find('p', class_='data-header__last-update')
-                    if update:
-                         data['market_value_last_update'] = update.get_text(strip=True).replace('Son güncelleme:', '').strip()
-
-            # Club info in header
-            club_box = header.find('div', class_='data-header__box--big')
-            if club_box:
-                c_img = club_box.find('img')
-                if c_img: data['club_image_url'] = c_img.get('src', '')
-            
-            club_name = header.find('span', class_='data-header__club')
-            if club_name: data['club'] = club_name.get_text(strip=True)
-
-            # League info in header
-            league_span = header.find('span', class_='data-header__league')
-            if league_span:
-                l_link = league_span.find('a')
-                if l_link:
-                    data['league_name'] = l_link.get_text(strip=True)
-                    l_img = l_link.find('img')
-                    if l_img: data['league_image_url'] = l_img.get('src', '')
-
-            # Success badges in header
-            badges = header.find_all('a', class_='data-header__success-data')
-            for b in badges:
-                b_img = b.find('img')
-                if b_img:
-                    data['success_badges'].append({
-                        "name": b_img.get('alt', ''),
-                        "count": b.get_text(strip=True),
-                        "image_url": b_img.get('src', '')
-                    })
-
-        # 2. Detailed Info Table
-        info_table = soup.find('div', class_='info-table')
-        if info_table:
-            regs = info_table.find_all('span', class_='info-table__content--regular')
-            for reg in regs:
-                label = reg.get_text(strip=True).replace(':', '').lower()
-                bold = reg.find_next_sibling('span', class_='info-table__content--bold')
-                if not bold: continue
-                val = bold.get_text(strip=True)
-                
-                if 'tam adı' in label or 'doğum adı' in label or 'anavatandaki isim' in label or 'full name' in label or 'name in home country' in label:
-                     data['full_name'] = val
-                elif 'doğum tarihi' in label or 'date of birth' in label:
-                    age_m = re.search(r'\((\d+)\)', val)
-                    if age_m: data['age'] = age_m.group(1)
-                    data['birth_date'] = re.sub(r'\s*\(\d+\)\s*', '', val).strip()
-                elif 'doğum yeri' in label or 'place of birth' in label:
-                    data['birth_place'] = val
-                elif 'boy' in label:
-                    data['height'] = val.replace('\u00a0', ' ').strip()
-                elif 'mevki' in label:
-                    data['position'] = val
-                elif 'ayak' in label:
-                    data['foot'] = val
-                elif 'uyruk' in label:
-                    data['nationality'] = val
-                elif 'temsilci' in label or 'agent' in label:
-                    data['agent'] = val
-                elif 'donatıcı' in label or 'outfitter' in label:
-                    data['outfitter'] = val
-                elif 'sözleşme sonu' in label or 'contract expires' in label:
-                    data['contract_expires'] = val
-                elif 'sosyal medya' in label:
-                    for link in bold.find_all('a'):
-                        data['social_media'].append({
-                            'platform': link.get('title', '-'),
-                            'url': link.get('href', '-')
-                        })
-
-        # 3. National Team
-        if header:
-            nt_li = header.find_all('li', class_='data-header__label')
-            for li in nt_li:
-                txt = li.get_text().lower()
-                if 'milli oyuncu' in txt or 'national team' in txt:
-                    nt_a = li.find('a')
-                    if nt_a: data['national_team']['name'] = nt_a.get_text(strip=True)
-                elif 'milli maç/gol' in txt or 'caps/goals' in txt:
-                    stats_links = li.find_all('a')
-                    if len(stats_links) >= 2:
-                        data['national_team']['matches'] = stats_links[0].get_text(strip=True)
-                        data['national_team']['goals'] = stats_links[1].get_text(strip=True)
-
-        # 4. Secondary Positions
-        pos_box = soup.find('div', class_='detail-position')
-        if pos_box:
-            side_pos = pos_box.find_all('dd', class_='detail-position__position')
-            for p in side_pos:
-                txt = p.get_text(strip=True)
-                if txt and txt != data.get('position'):
-                    if txt not in data['secondary_positions']:
-                        data['secondary_positions'].append(txt)
-
-        # 5. Youth Clubs
-        youth_h2 = soup.find('h2', string=re.compile(r'Altyapı kariyeri|Youth clubs', re.IGNORECASE))
-        if youth_h2:
-            y_box = youth_h2.find_next('div', class_='content')
-            if y_box:
-                data['youth_clubs'] = [c.strip() for c in y_box.get_text(strip=True).split(',') if c.strip()]
-
-        # 6. Highest MV and Update
-        hv_tag = soup.find('div', class_='tm-market-value-development__max-value')
-        if hv_tag:
-            data['highest_market_value'] = hv_tag.get_text(strip=True)
-
-        # 7. Performance & Injuries & Market History
-        data['performance'] = get_all_performance_data(url)
-        data['injuries'] = get_injury_history(url)
-        data['market_value_history'] = get_mv_history_from_page(url)
-
-        # 8. Transfer History (CEAPI)
-        if player_id:
-            try:
-                t_resp = requests.get(f"{BASE_URL}/ceapi/transferHistory/list/{player_id}", headers=HEADERS, timeout=10)
-                if t_resp.status_code == 200:
-                    for t in t_resp.json().get('transfers', []):
-                        data['transfer_history'].append({
-                            'season': t.get('season', '-'),
-                            'date': t.get('date', '-'),
-                            'from_club': t.get('from', {}).get('clubName', '-'),
-                            'to_club': t.get('to', {}).get('clubName', '-'),
-                            'market_value': t.get('marketValue', '-'),
-                            'fee': t.get('fee', '-')
-                        })
-            except: pass
+def highest_market_value(history):
+    """Geçmişteki en yüksek değerin metnini döner (ör. '35,00 mil. €'); bulunamazsa None"""
+    if not isinstance(history, MarketValueHistory):
+        history = MarketValueHistory.from_points(history)
+    # Maksimum önbelleğe yazılırken bir kez hesaplandı
+    point = history.max_point()
+    if point is None and history:
+        # Normalize alanları olmayan eski kayıtlar
+        point = max(history, key=lambda p: parse_market_value(p.get('value')) or 0)
+        return point['value'] if parse_market_value(point.get('value')) else None
+    return point['value'] if point and point['value_eur'] > 0 else None
+
+async def build_player_profile(fetcher, url, include=ALL_SECTIONS):
+    player_id = player_id_from_url(url)
+
+    # Alt sayfaların hepsi profil URL'sinden/ID'den türetiliyor: profil sayfasını beklemeden başlat
+    sub_tasks = asyncio.gather(*(SECTION_LOADERS[name](fetcher, url, player_id) for name in include))
+    try:
+        # Önbellekteki başlık sonraki adımlarda değiştirilmesin diye kopyası üzerinde çalış
+        data = dict(await get_profile_header(fetcher, url, player_id))
+
+        # 7. İstenen alt bölümler: Performance / Injuries / Market History / Transfer History (CEAPI)
+        for name, value in zip(include, await sub_tasks):
+            data[name] = value
 
         # 8. Highest Market Value Calculation (from history)
         if data['market_value_history']:
-            max_val = 0.0
-            max_str = "-"
-            for item in data['market_value_history']:
-                val_str = item.get('value', '')
-                try:
-                    # Clean the string to get numeric part
-                    clean_val = val_str.replace('€', '').replace('mil.', '').replace('bin', '').replace(',', '.').strip()
-                    # Determine multiplier
-                    multiplier = 1
-                    if 'mil' in val_str: multiplier = 1000000
-                    elif 'bin' in val_str: multiplier = 1000
-                    
-                    real_val = float(clean_val) * multiplier
-                    
-                    if real_val > max_val:
-                        max_val = real_val
-                        max_str = val_str
-                except:
-                    continue
-            
-            if max_val > 0:
-                data['highest_market_value'] = max_str
+            highest = highest_market_value(data['market_value_history'])
+            if highest:
+                data['highest_market_value'] = highest
 
         return data
+    except UpstreamError as e:
+        return {"error": f"Transfermarkt error: {e.status_code}"}
     except Exception as e:
         return {"error": str(e)}
+    finally:
+        # Profil hatalıysa yarıda kalan alt istekleri boşuna bekletme
+        if not sub_tasks.done():
+            sub_tasks.cancel()
+            try:
+                await sub_tasks
+            except BaseException:
+                pass
+
+async def stream_player_profile(url, include=ALL_SECTIONS):
+    """Profil bölümlerini hazır oldukça (bölüm adı, veri) çiftleri olarak üret.
+
+    Önce profil başlığı gelir, sonra alt bölümler tamamlanma sırasıyla gelir.
+    Profil sayfası alınamazsa tek bir ("error", mesaj) üretilir.
+    """
+    fetcher = Fetcher()
+    player_id = player_id_from_url(url)
+    tasks = {asyncio.ensure_future(SECTION_LOADERS[name](fetcher, url, player_id)): name for name in include}
+    try:
+        try:
+            yield "profile", await get_profile_header(fetcher, url, player_id)
+        except UpstreamError as e:
+            yield "error", f"Transfermarkt error: {e.status_code}"
+            return
+        except Exception as e:
+            yield "error", str(e)
+            return
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                yield name, task.result()
+                if name == "market_value_history" and task.result():
+                    highest = highest_market_value(task.result())
+                    if highest:
+                        yield "highest_market_value", highest
+    finally:
+        # İstemci bağlantıyı erken kapatırsa kalan alt istekleri iptal et
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        fetcher.cancel_pending()
+        revalidate_stale(fetcher, url)
+
+async def resolve_batch_item(item, include):
+    """Batch girdisini (profil URL'si, oyuncu ID'si veya isim) profile çevir; hata varsa kayda yaz"""
+    item = item.strip()
+    async with BATCH_SEMAPHORE:
+        try:
+            if item.isdigit():
+                url = profile_url_for(item)
+            elif item.startswith(("http://", "https://")):
+                if not same_host(item, BASE_URL):
+                    return {"input": item, "error": f"Sadece {BASE_URL} adresleri kabul edilir"}
+                url = item
+            else:
+                res = await search_players(Fetcher(), item)
+                if not res:
+                    return {"input": item, "error": "Oyuncu bulunamadı"}
+                url = res[0]['url']
+            data = await scrape_player_profile(url, include)
+        except Exception as e:
+            return {"input": item, "error": str(e)}
+    if "error" in data:
+        return {"input": item, "error": data["error"]}
+    return {"input": item, "player": data}
+
+async def run_batch(items, include):
+    """Girdileri sınırlı sayıda worker ile çöz; (sıra, sonuç) çiftlerini tamamlanma sırasıyla üret"""
+    results = asyncio.Queue()
+    positions = iter(range(len(items)))
+
+    async def worker():
+        for index in positions:
+            await results.put((index, await resolve_batch_item(items[index], include)))
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(min(BATCH_CONCURRENCY, len(items)))]
+    try:
+        for _ in range(len(items)):
+            yield await results.get()
+    finally:
+        for w in workers:
+            if not w.done():
+                w.cancel()
+
+async def resolve_player_url(url, name):
+    if url and not same_host(url, BASE_URL):
+        # İstemcinin verdiği URL upstream'e gider: sadece Transfermarkt host'una izin ver
+        raise HTTPException(status_code=400, detail=f"Sadece {BASE_URL} adresleri kabul edilir")
+    if not url and name:
+        res = await search_players(Fetcher(), name)
+        if res: url = res[0]['url']
+    if not url: raise HTTPException(status_code=404, detail="Oyuncu bulunamadı")
+    return url
+
+def require_admin(request: Request):
+    """Yönetim uçları için token kontrolü (CORS * olduğundan her origin bu uçlara istek atabilir)"""
+    if ADMIN_TOKEN is None:
+        raise HTTPException(status_code=403, detail="Yönetim uçları kapalı (TM_ADMIN_TOKEN verilmedi)")
+    auth = request.headers.get("authorization", "")
+    token = auth[7:] if auth[:7].lower() == "bearer " else request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Geçersiz yönetim token'ı", headers={"WWW-Authenticate": "Bearer"})
+
+def crawl_queue():
+    global CRAWL_QUEUE
+    if CRAWL_QUEUE is None:
+        CRAWL_QUEUE = CrawlQueue(CRAWL_DB)
+    return CRAWL_QUEUE
+
+async def crawl_links(url, parser):
+    """Lig/kadro sayfasını indirip parser ile kulüp veya oyuncu URL'lerini çıkar"""
+    response = await Fetcher().get(url)
+    if response.status_code != 200:
+        raise UpstreamError(url, response.status_code)
+    return await parse_content(response.content, "items", parser, BASE_URL)
+
+async def crawl_player(url, include):
+    """Tarayıcının oyuncu kazıması. scrape_player_profile'dan geçmez: taranan oyuncular
+    sıcak oyuncu sayaçlarına (HOT_PLAYERS) yazılmaz, tarama top-K'yı doldurmasın."""
+    fetcher = Fetcher()
+    try:
+        return await build_player_profile(fetcher, url, include)
+    finally:
+        fetcher.cancel_pending()
+        revalidate_stale(fetcher, url)
+
+def make_crawler(concurrency=None):
+    return Crawler(crawl_queue(), crawl_links, crawl_player, is_paused=GOVERNOR.is_open,
+                   concurrency=concurrency or CRAWL_CONCURRENCY, base_url=BASE_URL)
+
+def start_crawl(job_id):
+    task = CRAWL_TASKS.get(job_id)
+    if task is not None and not task.done():
+        return
+    task = asyncio.ensure_future(make_crawler().run(job_id))
+    CRAWL_TASKS[job_id] = task
+    task.add_done_callback(lambda t: CRAWL_TASKS.pop(job_id, None) if CRAWL_TASKS.get(job_id) is t else None)
+    task.add_done_callback(lambda t: t.cancelled() or t.exception() and print(f"Crawl {job_id} error: {t.exception()}"))
+
+async def stop_crawls():
+    """Kapanışta çalışan taramaları durdur; açılışta devam etmeleri için interrupted işaretle"""
+    tasks = dict(CRAWL_TASKS)
+    for task in tasks.values():
+        task.cancel()
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    for job_id in tasks:
+        await crawl_queue().set_status(job_id, "interrupted")
+
+def watcher():
+    global WATCHER
+    if WATCHER is None:
+        WATCHER = Watcher(WatchStore(WATCH_DB), fetch_watch_series, on_change=watch_changed,
+                          is_paused=GOVERNOR.is_open, concurrency=WATCH_CONCURRENCY, jitter=WATCH_JITTER)
+    return WATCHER
+
+async def fetch_watch_series(player_id):
+    """İzleme yoklaması: önbelleği atlayıp sadece CEAPI grafiğini (koşullu) iste. 304'te
+    saklanan gövde yine ayrıştırılır; değişiklik kararını Watcher seri özetiyle verir, çünkü
+    doğrulayıcılar /player ile ortaktır ve grafik arada orada yeniden indirilmiş olabilir."""
+    url = f"{BASE_URL}/ceapi/marketValueDevelopment/graph/{player_id}"
+    response = await UPSTREAM.get(url, timeout=JSON_TIMEOUT)
+    if response.status_code != 200:
+        raise UpstreamError(url, response.status_code)
+    return parse_mv_graph(response.json())
+
+def watch_changed(player_id, points):
+    # Yoklanan grafik /player/{id}/market-value için de en güncel değer
+    CACHE.set("market_value", player_id, compact("market_value", points))
+
+def start_watcher():
+    global WEBHOOK
+    if WATCH_TASKS:
+        return
+    WATCH_TASKS.append(asyncio.ensure_future(watcher().run()))
+    if WATCH_WEBHOOK:
+        WEBHOOK = WebhookSender(watcher(), WATCH_WEBHOOK)
+        WATCH_TASKS.append(asyncio.ensure_future(WEBHOOK.run()))
+    for task in WATCH_TASKS:
+        task.add_done_callback(lambda t: t.cancelled() or t.exception() and print(f"Watchlist error: {t.exception()}"))
+
+async def stop_watcher():
+    tasks = list(WATCH_TASKS)
+    WATCH_TASKS.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+class WatchRequest(BaseModel):
+    players: list[str]
+    interval: float = None
+
+class CrawlRequest(BaseModel):
+    targets: list[str]
+    include: str = "all"
+
+class BatchRequest(BaseModel):
+    players: list[str]
+    include: str = "all"
+    stream: bool = False
+
+@app.post("/players")
+async def players(batch: BatchRequest):
+    """Birden fazla oyuncuyu tek çağrıda çöz. Sonuçlar girdi sırasıyla döner; her kayıtta
+    ya "player" ya da "error" bulunur. stream=true ile NDJSON olarak, tamamlanan her oyuncu
+    {"index": i, ...} satırı şeklinde hemen gönderilir."""
+    if len(batch.players) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"En fazla {BATCH_MAX_ITEMS} oyuncu gönderilebilir")
+    try:
+        sections = parse_include(batch.include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen bölüm: {e}")
+
+    if batch.stream:
+        async def body():
+            async for index, result in run_batch(batch.players, sections):
+                yield dumps(dict(result, index=index)) + b"\n"
+        return StreamingResponse(body(), media_type="application/x-ndjson",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    ordered = [None] * len(batch.players)
+    async for index, result in run_batch(batch.players, sections):
+        ordered[index] = result
+    return FastJSONResponse({"results": ordered})
+
+def conditional_json(request, content):
+    """İçerik özetinden ETag üretir; istemcideki kopya aynıysa gövdesiz 304 döner"""
+    body = dumps(content)
+    etag = content_etag(body)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
 
 @app.get("/search")
-async def search(name: str):
-    return {"results": search_players(name)}
+async def search(request: Request, name: str, limit: int = Query(SEARCH_LIMIT, ge=1, le=100)):
+    """Sorgu ve kelime varyantları paralel aranır; sonuçlar score'a göre sıralı döner"""
+    return conditional_json(request, {"results": await search_players(Fetcher(), name, limit)})
+
+@app.get("/search/local")
+async def search_local_index(name: str, limit: int = 20):
+    """Sadece yerel indeksten, skorlarıyla birlikte arama (upstream'e gidilmez)"""
+    return FastJSONResponse({"results": [dict(r, score=score) for score, r in SEARCH_INDEX.lookup(name, limit)]})
 
 @app.get("/player")
-async def player(url: str = None, name: str = None):
-    p_url = url
-    if not p_url and name:
-        res = search_players(name)
-        if res: p_url = res[0]['url']
-    if not p_url: raise HTTPException(status_code=404, detail="Oyuncu bulunamadı")
-    return scrape_player_profile(p_url)
+async def player(request: Request, url: str = None, name: str = None, include: str = None, fields: str = None):
+    """Varsayılan olarak sadece profil sayfası (tek upstream istek) döner.
+    include=performance,injuries,market_value,transfers veya include=all ile alt bölümler eklenir.
+    fields, include'un eski adıdır; ikisi birlikte verilirse bölümler birleştirilir."""
+    try:
+        sections = parse_include(",".join(v for v in (include, fields) if v))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen bölüm: {e}")
+    p_url = await resolve_player_url(url, name)
+    return conditional_json(request, await scrape_player_profile(p_url, sections))
+
+@app.get("/player/stream")
+async def player_stream(request: Request, url: str = None, name: str = None, include: str = "all", format: str = None):
+    """/player'ın akış sürümü: her bölüm hazır olunca ayrı bir parça olarak gönderilir.
+    Varsayılan NDJSON ({"section": ..., "data": ...} satırları); format=sse veya
+    Accept: text/event-stream ile Server-Sent Events."""
+    try:
+        sections = parse_include(include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen bölüm: {e}")
+    p_url = await resolve_player_url(url, name)
+    sse = format == "sse" or "text/event-stream" in request.headers.get("accept", "")
+
+    async def body():
+        async for section, data in stream_player_profile(p_url, sections):
+            payload = dumps({"section": section, "data": data}).decode()
+            yield f"event: {section}\ndata: {payload}\n\n" if sse else payload + "\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        # Ara proxy'ler (nginx vb.) parçaları biriktirmesin
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def player_section_response(request, player_id, name):
+    if not player_id.isdigit():
+        raise HTTPException(status_code=404, detail="Oyuncu bulunamadı")
+    return conditional_json(request, {"player_id": player_id, name: await get_player_section(name, player_id)})
+
+@app.get("/player/{player_id}/performance")
+async def player_performance(request: Request, player_id: str):
+    return await player_section_response(request, player_id, "performance")
+
+@app.get("/player/{player_id}/injuries")
+async def player_injuries(request: Request, player_id: str):
+    return await player_section_response(request, player_id, "injuries")
+
+@app.get("/player/{player_id}/market-value")
+async def player_market_value(request: Request, player_id: str, start: str = Query(None, alias="from"),
+                              end: str = Query(None, alias="to"), points: int = Query(None, ge=0)):
+    """Piyasa değeri zaman serisi. from/to (YYYY-MM-DD) ile tarih aralığı, points ile
+    zirve ve dipleri koruyan (LTTB) seyreltme. max/min/latest tüm geçmiş üzerinden hesaplanır."""
+    if not player_id.isdigit():
+        raise HTTPException(status_code=404, detail="Oyuncu bulunamadı")
+    try:
+        for value in (start, end):
+            if value:
+                datetime.date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="from/to YYYY-MM-DD biçiminde olmalı")
+    history = await get_player_section("market_value_history", player_id)
+    if not isinstance(history, MarketValueHistory):
+        history = MarketValueHistory.from_points(history or [])
+
+    # Veri ve parametreler değişmediyse gövdeyi hiç üretme
+    etag = f'"{history.digest}-{hashlib.sha1(f"{start}|{end}|{points}".encode()).hexdigest()[:8]}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    if start or end or points:
+        selected = history.downsample(history.select(start, end), points or 0)
+        series = [history.point(i) for i in selected]
+    else:
+        selected = range(len(history.euros))
+        series = list(history)
+    return FastJSONResponse({
+        "player_id": player_id,
+        "market_value_history": series,
+        "count": len(series),
+        "total": len(history),
+        "series": {
+            "dates": [history.point(i)['date_iso'] for i in selected],
+            "values_eur": [history.euros[i] for i in selected],
+        },
+        "latest": history.latest_point(),
+        "max": history.max_point(),
+        "min": history.min_point(),
+    }, headers={"ETag": etag})
+
+@app.get("/player/{player_id}/transfers")
+async def player_transfers(request: Request, player_id: str):
+    return await player_section_response(request, player_id, "transfer_history")
+
+@app.get("/stats/pool")
+async def pool_stats():
+    return UPSTREAM.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metin formatında aşama histogramları, upstream durum kodları ve anlık göstergeler"""
+    pool = UPSTREAM.stats()
+    cache = CACHE.stats()
+    governor = GOVERNOR.stats()
+    gauges = (
+        ("tm_upstream_in_flight", "Şu an süren upstream istekleri", pool["in_flight"]),
+        ("tm_upstream_connections", "Havuzdaki açık bağlantılar", pool["connections"]),
+        ("tm_cache_entries", "Bellek önbelleğindeki kayıtlar", cache["entries"]),
+        ("tm_cache_hit_ratio", "Önbellek isabet oranı", cache["hit_ratio"]),
+        ("tm_rate_limit_rate", "Token bucket'ın anlık hızı (istek/sn)", governor["rate"]),
+        ("tm_rate_limit_rejected", "Hız sınırı/devre kesici tarafından reddedilen istekler", governor["rejected"]),
+        ("tm_circuit_open", "Devre kesici açık mı (1/0)", int(governor["state"] == "open")),
+        ("tm_upstream_not_modified", "304 dönen koşullu upstream istekleri", VALIDATORS.counters["not_modified"]),
+        ("tm_upstream_bytes_saved", "304 sayesinde yeniden indirilmeyen gövde baytları", VALIDATORS.counters["bytes_saved"]),
+    )
+    return METRICS.render(gauges)
+
+@app.get("/stats/governor")
+async def governor_stats():
+    return GOVERNOR.stats()
+
+@app.get("/stats/cache")
+async def cache_stats():
+    return dict(CACHE.stats(), single_flight=FLIGHTS.stats(), search_index=SEARCH_INDEX.stats(),
+                revalidation=dict(REFRESH_STATS, stale_window=STALE_WINDOW, in_background=len(BACKGROUND_TASKS)),
+                hot_players=[{"player_id": pid, "score": round(score, 2)} for pid, score in HOT_PLAYERS.top(10)],
+                store=STORE.stats() if STORE is not None else None,
+                conditional=dict(VALIDATORS.stats(), enabled=CONDITIONAL_ENABLED))
+
+@app.post("/admin/crawl", dependencies=[Depends(require_admin)])
+async def create_crawl(job: CrawlRequest):
+    """Lig (wettbewerb), kulüp (verein) veya oyuncu URL'lerini önbelleğe ısıtan tarama işi başlat"""
+    unknown = [url for url in job.targets if target_kind(url, BASE_URL) is None]
+    if not job.targets or unknown:
+        raise HTTPException(status_code=400,
+                            detail=f"{BASE_URL} üzerinde lig, kulüp veya oyuncu URL'si bekleniyordu: {unknown}")
+    try:
+        sections = parse_include(job.include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen bölüm: {e}")
+    job_id = await crawl_queue().create_job(job.targets, ",".join(sections))
+    start_crawl(job_id)
+    return crawl_queue().progress(job_id)
+
+@app.get("/admin/crawl", dependencies=[Depends(require_admin)])
+async def list_crawls():
+    return {"jobs": [crawl_queue().progress(job_id) for job_id in crawl_queue().jobs()]}
+
+def crawl_progress(job_id):
+    progress = crawl_queue().progress(job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Tarama işi bulunamadı")
+    return progress
+
+@app.get("/admin/crawl/{job_id}", dependencies=[Depends(require_admin)])
+async def crawl_status(job_id: int):
+    return crawl_progress(job_id)
+
+@app.post("/admin/crawl/{job_id}/resume", dependencies=[Depends(require_admin)])
+async def resume_crawl(job_id: int):
+    crawl_progress(job_id)
+    start_crawl(job_id)
+    return crawl_progress(job_id)
+
+@app.delete("/admin/crawl/{job_id}", dependencies=[Depends(require_admin)])
+async def pause_crawl(job_id: int):
+    """Taramayı durdur (paused); /resume ile kaldığı yerden devam eder"""
+    task = CRAWL_TASKS.get(job_id)
+    if task is not None:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    return crawl_progress(job_id)
+
+@app.post("/watchlist", dependencies=[Depends(require_admin)])
+async def add_watches(watch: WatchRequest):
+    """Oyuncu ID'lerini veya profil URL'lerini piyasa değeri izleme listesine ekle"""
+    ids = [p if p.isdigit() else player_id_from_url(p) for p in watch.players]
+    unknown = [p for p, pid in zip(watch.players, ids) if pid is None]
+    if not watch.players or unknown:
+        raise HTTPException(status_code=400, detail=f"Oyuncu ID'si veya profil URL'si bekleniyordu: {unknown}")
+    interval = watch.interval or WATCH_INTERVAL
+    if interval < 60:
+        raise HTTPException(status_code=400, detail="interval en az 60 saniye olmalı")
+    if not WATCH_ENABLED:
+        raise HTTPException(status_code=503, detail="İzleme listesi kapalı (TM_WATCH=0)")
+    try:
+        added = await watcher().store.add(ids, interval, max_total=WATCH_MAX)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    start_watcher()
+    watcher().wakeup.set()
+    return {"added": added, "players": len(set(ids)), "interval": interval}
+
+@app.get("/watchlist")
+async def list_watches(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    return {"stats": dict(watcher().stats(), webhook=WEBHOOK.stats() if WEBHOOK is not None else None),
+            "players": watcher().store.watches(limit, offset)}
+
+@app.delete("/watchlist/{player_id}", dependencies=[Depends(require_admin)])
+async def remove_watch(player_id: str):
+    if not await watcher().store.remove(player_id):
+        raise HTTPException(status_code=404, detail="Oyuncu izleme listesinde değil")
+    return {"player_id": player_id, "removed": True}
+
+@app.get("/watchlist/events")
+async def watch_events(since: int = None, timeout: float = Query(25, ge=0, le=60),
+                       limit: int = Query(100, ge=1, le=1000), player_id: str = None):
+    """Uzun yoklama: since'ten sonraki değişiklik olayları; yoksa en fazla timeout saniye beklenir.
+    since verilmezse sadece bundan sonraki olaylar beklenir. Sonraki istekte last_seq gönderilir."""
+    if since is None:
+        since = watcher().store.last_seq()
+    events = await watcher().wait_events(since, timeout, limit, player_id)
+    return {"events": events, "last_seq": events[-1]["seq"] if events else since}
+
+@app.get("/watchlist/events/stream")
+async def watch_event_stream(request: Request, since: int = None, player_id: str = None):
+    """Değişiklik olaylarının SSE akışı; yeniden bağlanınca Last-Event-ID'den devam edilir"""
+    last_id = request.headers.get("last-event-id")
+    cursor = int(last_id) if last_id and last_id.isdigit() else since
+    if cursor is None:
+        cursor = watcher().store.last_seq()
+
+    async def body():
+        seq = cursor
+        while not await request.is_disconnected():
+            events = await watcher().wait_events(seq, 15, 100, player_id)
+            if not events:
+                # Bağlantıyı canlı tut (proxy zaman aşımları)
+                yield ": ping\n\n"
+                continue
+            for event in events:
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {dumps(event).decode()}\n\n"
+            seq = events[-1]["seq"]
+
+    return StreamingResponse(body(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.delete("/cache/player/{player_id}", dependencies=[Depends(require_admin)])
+async def invalidate_player_cache(player_id: str):
+    removed = CACHE.invalidate_player(player_id)
+    for resource in PLAYER_RESOURCES:
+        VALIDATORS.invalidate(resource, player_id)
+    if STORE is not None:
+        removed += await STORE.delete_player(player_id)
+    return {"player_id": player_id, "removed": removed}
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,251 @@
+"""replay.py ile kaydedilmiş cevaplar üzerinde çevrimdışı benchmark.
+
+parse: her fixture için soup kurulumunu ve her extractor'ı ayrı ayrı ölçer.
+scale: profil sayfalarının ayrıştırmasını (ham bayt -> düz veri, api.extract_page) farklı
+       sayıda işçi süreçli havuzlarda çalıştırır ve saniyedeki profil sayısını, 1 işçiye
+       göre hızlanmayı ve verimliliği yazdırır (TM_PARSE_MODE=process ölçeklenmesi).
+extract: aynı soup üzerinde her HTML extractor'ını verilen git sürümündeki (--baseline)
+       api.py'nin aynı adlı fonksiyonuyla karşılaştırır: süre, hızlanma ve çıktı eşitliği.
+e2e:   kayıtları gecikmeli sunan replay sunucusunu başlatır, API'yi aynı süreçte
+       ASGI üzerinden çağırır ve her eşzamanlılık seviyesinde /player gecikmesini
+       (p50/p95/p99) ve saniyedeki istek sayısını yazdırır. Varsayılan olarak her
+       istek farklı bir oyuncu ID'si kullanır, yani önbellek hiç isabet etmez.
+
+    python bench.py parse fixtures/ --repeat 20
+    python bench.py scale fixtures/ --workers 1,2,4,8 --profiles 200
+    python bench.py extract fixtures/ --baseline <rev> --repeat 200
+    python bench.py e2e fixtures/ --levels 1,8,32 --requests 64 --latency 0.2
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import time
+import types
+import urllib.parse
+
+# Dosya adındaki anahtar kelime -> (soup bölümü, extractor adları); sıra önemli (leistungsdatendetails önce)
+EXTRACTORS = (
+    ("marketValueDevelopment", None, ("parse_mv_graph",)),
+    ("transferHistory", None, ("parse_transfer_history",)),
+    ("schnellsuche", "search", ("parse_search_page",)),
+    ("leistungsdatendetails", "items", ("parse_stats_table", "parse_career_total")),
+    ("leistungsdatenverein", "items", ("parse_stats_table",)),
+    ("leistungsdaten", "items", ("parse_season_page",)),
+    ("verletzungen", "items", ("parse_injury_table",)),
+    ("marktwertverlauf", "scripts", ("parse_mv_page",)),
+    ("profil", "profile", ("parse_profile_page", "parse_profile_current_season")),
+)
+
+def extractors_for(name):
+    for keyword, section, names in EXTRACTORS:
+        if keyword in name:
+            return section, names
+    return None, ()
+
+def extractor_args(name):
+    """Soup dışında verilen sabit argümanlar"""
+    if name == "parse_profile_page":
+        return ("-", None)
+    if name == "parse_search_page":
+        return ("-",)
+    return ()
+
+def call_extractor(api, name, arg):
+    return getattr(api, name)(arg, *extractor_args(name))
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def bench_parse(directory, repeat):
+    import api
+    from parsers import PARSER, make_soup
+
+    rows = {}
+    for name in sorted(os.listdir(directory)):
+        section, names = extractors_for(name)
+        if not names:
+            continue
+        with open(os.path.join(directory, name), 'rb') as f:
+            content = f.read()
+        if name.endswith(".json"):
+            arg = json.loads(content)
+            setup = "json.loads"
+            setup_ms = timed(lambda: json.loads(content), repeat)
+        else:
+            arg = make_soup(content, section)
+            setup = f"make_soup[{section}]"
+            setup_ms = timed(lambda: make_soup(content, section), repeat)
+        rows.setdefault(setup, []).append(setup_ms)
+        for extractor in names:
+            rows.setdefault(extractor, []).append(timed(lambda: call_extractor(api, extractor, arg), repeat))
+
+    print(f"parser backend: {PARSER}")
+    print(f"{'step':<34} {'files':>5} {'mean ms':>9} {'max ms':>9}")
+    for step, values in rows.items():
+        print(f"{step:<34} {len(values):>5} {statistics.mean(values):>9.3f} {max(values):>9.3f}")
+
+def load_baseline(rev):
+    """rev'deki api.py'yi ayrı bir modül olarak yükle (diğer modüller çalışma ağacından gelir)"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    source = subprocess.run(["git", "show", f"{rev}:api.py"], cwd=root, capture_output=True,
+                            text=True, check=True).stdout
+    module = types.ModuleType("api_baseline")
+    module.__file__ = os.path.join(root, "api.py")
+    exec(compile(source, f"{rev}:api.py", "exec"), module.__dict__)
+    return module
+
+def bench_extract(directory, baseline, repeat):
+    import api
+    from parsers import make_soup
+
+    old = load_baseline(baseline)
+    rows = {}
+    mismatches = 0
+    for name in sorted(os.listdir(directory)):
+        section, names = extractors_for(name)
+        if not names or name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name), 'rb') as f:
+            soup = make_soup(f.read(), section)
+        for extractor in names:
+            if call_extractor(old, extractor, soup) != call_extractor(api, extractor, soup):
+                mismatches += 1
+                print(f"MISMATCH {name}: {extractor}")
+            old_ms = timed(lambda: call_extractor(old, extractor, soup), repeat)
+            new_ms = timed(lambda: call_extractor(api, extractor, soup), repeat)
+            rows.setdefault(extractor, []).append((old_ms, new_ms))
+
+    print(f"baseline: {baseline}")
+    print(f"{'extractor':<30} {'files':>5} {'baseline ms':>12} {'current ms':>11} {'speedup':>8}")
+    for extractor, values in rows.items():
+        old_ms = sum(v[0] for v in values)
+        new_ms = sum(v[1] for v in values)
+        print(f"{extractor:<30} {len(values):>5} {old_ms:>12.3f} {new_ms:>11.3f} {old_ms / new_ms if new_ms else 0:>7.2f}x")
+    return mismatches
+
+def profile_jobs(api, directory):
+    """Oyuncu HTML sayfaları için extract_page argümanları; hepsinin bir turu = bir profil"""
+    jobs = []
+    for name in sorted(os.listdir(directory)):
+        section, names = extractors_for(name)
+        if not names or name.endswith(".json") or section == "search":
+            continue
+        with open(os.path.join(directory, name), 'rb') as f:
+            content = f.read()
+        jobs.extend((content, section, getattr(api, extractor), extractor_args(extractor)) for extractor in names)
+    return jobs
+
+def bench_scale(directory, workers, profiles):
+    from concurrent.futures import ProcessPoolExecutor
+    import api
+
+    jobs = profile_jobs(api, directory)
+    print(f"{len(jobs)} ayrıştırma işi/profil, {os.cpu_count()} çekirdek, start method {api.PARSE_START_METHOD}")
+    print(f"{'workers':>7} {'profiles/s':>11} {'speedup':>8} {'efficiency':>10}")
+    baseline = None
+    for count in workers:
+        context = multiprocessing.get_context(api.PARSE_START_METHOD)
+        with ProcessPoolExecutor(max_workers=count, mp_context=context) as pool:
+            # Süreç açılışı ölçüme girmesin
+            list(pool.map(int, range(count)))
+            start = time.perf_counter()
+            futures = [pool.submit(api.extract_page, *job) for _ in range(profiles) for job in jobs]
+            for future in futures:
+                future.result()
+            rate = profiles / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"{count:>7} {rate:>11.1f} {rate / baseline:>8.2f} {rate / baseline / count:>10.2f}")
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def run_level(client, paths, concurrency, total):
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while len(latencies) + errors < total:
+            path = next(paths)
+            start = time.perf_counter()
+            resp = await client.get(path)
+            if resp.status_code != 200 or "error" in resp.json():
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return (len(latencies) + errors) / (time.perf_counter() - start), latencies, errors
+
+async def bench_e2e(args):
+    from replay import start_replay_server
+
+    server = start_replay_server(args.directory, args.latency)
+    os.environ["TM_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("TM_MAX_CONCURRENCY", str(max(args.levels) * 8))
+    # Ölçümü bozmasınlar: hız sınırı, arka plan yenileme ve stale sunum kapalı
+    os.environ.setdefault("TM_RATE", "0")
+    os.environ.setdefault("TM_HOT_PLAYERS", "0")
+    os.environ.setdefault("TM_STALE_WINDOW", "0")
+
+    import httpx
+    import api
+
+    ids = itertools.repeat(1) if args.warm else itertools.count(1)
+    paths = (f"/player?url={urllib.parse.quote(api.profile_url_for(i), safe='')}&include={args.include}" for i in ids)
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with api.app.router.lifespan_context(api.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=120) as client:
+            print(f"{'concurrency':>11} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+            for level in args.levels:
+                rps, latencies, errors = await run_level(client, paths, level, max(args.requests, level))
+                if not latencies:
+                    print(f"{level:>11} {rps:>9.1f} {'-':>9} {'-':>9} {'-':>9} {errors:>7}")
+                    continue
+                p50, p95, p99 = (percentile(latencies, p) * 1000 for p in (50, 95, 99))
+                print(f"{level:>11} {rps:>9.1f} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} {errors:>7}")
+            print("upstream pool:", (await client.get("/stats/pool")).json())
+    server.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    p = commands.add_parser("parse", help="Extractor başına ayrıştırma süresi")
+    p.add_argument("directory")
+    p.add_argument("--repeat", default=20, type=int)
+    s = commands.add_parser("scale", help="Süreç havuzunda işçi sayısına göre profil ayrıştırma hızı")
+    s.add_argument("directory")
+    s.add_argument("--workers", default="1,2,4,8", type=lambda v: [int(x) for x in v.split(",")])
+    s.add_argument("--profiles", default=100, type=int, help="Her işçi sayısında ayrıştırılan profil sayısı")
+    x = commands.add_parser("extract", help="Extractor'ları eski bir sürümle karşılaştır (süre ve çıktı)")
+    x.add_argument("directory")
+    x.add_argument("--baseline", required=True, help="Karşılaştırılacak git sürümü (ör. commit)")
+    x.add_argument("--repeat", default=200, type=int)
+    e = commands.add_parser("e2e", help="Uçtan uca /player gecikmesi ve throughput")
+    e.add_argument("directory")
+    e.add_argument("--levels", default="1,4,16,32", type=lambda v: [int(x) for x in v.split(",")])
+    e.add_argument("--requests", default=64, type=int, help="Her seviyedeki toplam istek sayısı")
+    e.add_argument("--latency", default=0.1, type=float, help="Replay sunucusu gecikmesi (saniye)")
+    e.add_argument("--include", default="all", help="/player include parametresi")
+    e.add_argument("--warm", action="store_true", help="Hep aynı oyuncuyu iste (önbellek isabetli ölçüm)")
+    args = parser.parse_args()
+
+    if args.command == "parse":
+        bench_parse(args.directory, args.repeat)
+    elif args.command == "scale":
+        bench_scale(args.directory, args.workers, args.profiles)
+    elif args.command == "extract":
+        raise SystemExit(1 if bench_extract(args.directory, args.baseline, args.repeat) else 0)
+    else:
+        asyncio.run(bench_e2e(args))
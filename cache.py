@@ -0,0 +1,296 @@
+"""Scraper sonuçları için iki katmanlı (bellek LRU + isteğe bağlı disk) önbellek.
+
+Her kayıt bir kaynak türüne (search, profile, market_value, transfers,
+injuries, performance) aittir ve süresi o türün TTL'i ile belirlenir.
+Oyuncuya ait bölümler player_id ile anahtarlanır, böylece bir oyuncunun
+bütün bölümleri tek çağrıyla geçersiz kılınabilir.
+
+shared verilirse (shared_cache.SharedCache) bellek ile disk arasında aynı makinedeki
+tüm worker süreçlerinin ortak okuduğu bir katman daha kullanılır.
+
+Süresi dolan kayıtlar hemen silinmez: upstream engellendiğinde veya hata
+verdiğinde get_stale ile eski (stale) değer sunulabilir. LRU taşması yine siler.
+
+SingleFlight ise aynı anahtar için eşzamanlı gelen istekleri tek bir
+upstream işine bağlar: ilk gelen işi başlatır, diğerleri onun sonucunu bekler.
+Ortak katman varsa aynı anahtar diğer süreçlerde de kiralanır; kirayı alamayan
+süreç bekler, sonra işi çalıştırır ve sonucu ortak önbellekten bulur.
+"""
+import asyncio
+import hashlib
+import heapq
+import json
+import os
+import time
+from collections import OrderedDict
+
+from models import dumps
+
+# Kaynak türü başına varsayılan TTL (saniye); TM_TTL_<TÜR> ile değiştirilebilir
+DEFAULT_TTLS = {
+    "search": 3600,
+    "profile": 3600,
+    "market_value": 12 * 3600,
+    "transfers": 24 * 3600,
+    "injuries": 12 * 3600,
+    "performance": 6 * 3600,
+}
+
+# search dışındaki tüm türler player_id ile anahtarlanır
+PLAYER_RESOURCES = tuple(r for r in DEFAULT_TTLS if r != "search")
+
+def ttls_from_env():
+    return {
+        resource: float(os.environ.get(f"TM_TTL_{resource.upper()}", ttl))
+        for resource, ttl in DEFAULT_TTLS.items()
+    }
+
+class TieredCache:
+    def __init__(self, max_entries=2000, ttls=None, disk_dir=None, decode=None, shared=None, sync_interval=1.0):
+        self.max_entries = max_entries
+        self.shared = shared
+        # Diğer worker'larda silinen oyuncular en fazla bu kadar saniyede bir kontrol edilir
+        self.sync_interval = sync_interval
+        self.synced_at = time.time()
+        self.seen_invalidation = shared.last_invalidation() if shared is not None else 0
+        # Diskten okunan JSON değerini bellekteki biçime çeviren fonksiyon: decode(resource, value)
+        self.decode = decode
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.disk_dir = disk_dir
+        # (resource, key) -> (expires_at, value)
+        self.entries = OrderedDict()
+        self.counters = {"hits": 0, "shared_hits": 0, "disk_hits": 0, "misses": 0, "stale_hits": 0,
+                         "evictions": 0, "invalidations": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, resource, key):
+        """(bulundu_mu, değer) döner. Bellekte yoksa ortak ve disk katmanlarına bakar."""
+        self._sync()
+        entry = self.entries.get((resource, key))
+        now = time.time()
+        if entry is not None and entry[0] > now:
+            self.entries.move_to_end((resource, key))
+            self.counters["hits"] += 1
+            return True, entry[1]
+
+        if self.shared is not None:
+            shared = self._shared_read(resource, key)
+            if shared is not None and shared[0] > now:
+                self._remember(resource, key, shared)
+                self.counters["shared_hits"] += 1
+                return True, shared[1]
+
+        if self.disk_dir and entry is None:
+            entry = self._disk_read(resource, key)
+            if entry is not None and entry[0] > now:
+                self._remember(resource, key, entry)
+                self.counters["disk_hits"] += 1
+                return True, entry[1]
+
+        self.counters["misses"] += 1
+        return False, None
+
+    def get_stale(self, resource, key, max_age=None):
+        """Süresi dolmuş olsa bile son bilinen değer: (bulundu_mu, değer).
+        max_age verilirse süresi o kadar saniyeden uzun zaman önce dolan kayıt sayılmaz."""
+        self._sync()
+        entry = self.entries.get((resource, key))
+        if self.shared is not None:
+            # Başka bir worker daha yeni bir kopya yazmış olabilir
+            shared = self._shared_read(resource, key)
+            if shared is not None and (entry is None or shared[0] > entry[0]):
+                entry = shared
+                self._remember(resource, key, entry)
+        if entry is None and self.disk_dir:
+            entry = self._disk_read(resource, key)
+            if entry is not None:
+                self._remember(resource, key, entry)
+        if entry is None or (max_age is not None and time.time() - entry[0] > max_age):
+            return False, None
+        self.counters["stale_hits"] += 1
+        return True, entry[1]
+
+    def expires_in(self, resource, key):
+        """Bellekteki kaydın süresinin dolmasına kalan saniye (dolmuşsa negatif); kayıt yoksa None"""
+        entry = self.entries.get((resource, key))
+        return None if entry is None else entry[0] - time.time()
+
+    def set(self, resource, key, value, ttl=None):
+        entry = (time.time() + (self.ttls.get(resource, 3600) if ttl is None else ttl), value)
+        self._remember(resource, key, entry)
+        if self.shared is not None:
+            self.shared.set(resource, key, entry[0], value)
+        if self.disk_dir:
+            self._disk_write(resource, key, entry)
+
+    def invalidate_player(self, player_id):
+        """Oyuncuya ait tüm bölümleri her iki katmandan da sil; silinen kayıt sayısını döner."""
+        key = str(player_id)
+        count = 0
+        for resource in PLAYER_RESOURCES:
+            if self.entries.pop((resource, key), None) is not None:
+                count += 1
+            if self.disk_dir:
+                path = self._disk_path(resource, key)
+                if os.path.exists(path):
+                    self._unlink(path)
+                    count += 1
+        if self.shared is not None:
+            count += self.shared.delete_player(key, PLAYER_RESOURCES)
+        self.counters["invalidations"] += count
+        return count
+
+    def clear(self):
+        self.entries.clear()
+        if self.shared is not None:
+            self.shared.clear()
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                self._unlink(os.path.join(self.disk_dir, name))
+
+    def stats(self):
+        lookups = self.counters["hits"] + self.counters["shared_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+        per_resource = {}
+        for resource, _ in self.entries:
+            per_resource[resource] = per_resource.get(resource, 0) + 1
+        return dict(
+            self.counters,
+            entries=len(self.entries),
+            max_entries=self.max_entries,
+            hit_ratio=round((lookups - self.counters["misses"]) / lookups, 4) if lookups else 0.0,
+            entries_by_resource=per_resource,
+            ttls=self.ttls,
+            disk_enabled=bool(self.disk_dir),
+            shared=self.shared.stats() if self.shared is not None else None,
+        )
+
+    def _remember(self, resource, key, entry):
+        self.entries[(resource, key)] = entry
+        self.entries.move_to_end((resource, key))
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _shared_read(self, resource, key):
+        row = self.shared.get(resource, key)
+        if row is None:
+            return None
+        return row[0], self.decode(resource, row[1]) if self.decode else row[1]
+
+    def _sync(self):
+        """Diğer worker'larda silinen oyuncuların bölümlerini bellekten de düşür"""
+        if self.shared is None or time.time() - self.synced_at < self.sync_interval:
+            return
+        self.synced_at = time.time()
+        for seq, player_id in self.shared.invalidations_since(self.seen_invalidation):
+            self.seen_invalidation = seq
+            for resource in PLAYER_RESOURCES:
+                self.entries.pop((resource, player_id), None)
+
+    # Disk katmanı: kayıt başına bir JSON dosyası, yazma işlemi atomik (tmp + rename)
+    def _disk_path(self, resource, key):
+        digest = hashlib.sha1(f"{resource}:{key}".encode()).hexdigest()
+        return os.path.join(self.disk_dir, f"{resource}-{digest}.json")
+
+    def _disk_read(self, resource, key):
+        path = self._disk_path(resource, key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return None
+        value = self.decode(resource, raw["value"]) if self.decode else raw["value"]
+        return raw["expires_at"], value
+
+    def _disk_write(self, resource, key, entry):
+        path = self._disk_path(resource, key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(dumps({"expires_at": entry[0], "value": entry[1]}))
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Cache disk write error: {e}")
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+class AccessTracker:
+    """Anahtar başına zamanla sönümlenen erişim sayacı (en çok istenen oyuncuları bulmak için)"""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self.counts = {}
+
+    def touch(self, key):
+        if key not in self.counts and len(self.counts) >= self.max_keys:
+            # Yer açmak için en soğuk anahtarı at
+            del self.counts[min(self.counts, key=self.counts.get)]
+        self.counts[key] = self.counts.get(key, 0.0) + 1.0
+
+    def decay(self, factor):
+        self.counts = {k: v * factor for k, v in self.counts.items() if v * factor >= 0.01}
+
+    def top(self, k):
+        return heapq.nlargest(k, self.counts.items(), key=lambda kv: kv[1])
+
+class SingleFlight:
+    def __init__(self, shared=None, lease_ttl=30.0, poll_interval=0.05):
+        self.calls = {}
+        self.counters = {"leaders": 0, "shared": 0, "waited_other_process": 0}
+        # Süreçler arası kira: sahibi çökerse lease_ttl sonunda başkası alır
+        self.shared = shared
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+
+    async def do(self, key, producer):
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, producer))
+            self.calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.counters["leaders"] += 1
+        else:
+            self.counters["shared"] += 1
+        # Bekleyenlerden biri bağlantıyı kapatırsa ortak iş diğerleri için iptal olmasın
+        return await asyncio.shield(task)
+
+    async def _run(self, key, producer):
+        if self.shared is None:
+            return await producer()
+        name = repr(key)
+        if not await self.shared.run(self.shared.acquire, name, self.lease_ttl):
+            # Başka bir worker aynı işi yapıyor: bitirmesini bekle, sonuç ortak önbellekte olur
+            self.counters["waited_other_process"] += 1
+            while not await self.shared.run(self.shared.acquire, name, self.lease_ttl):
+                await asyncio.sleep(self.poll_interval)
+        # İş lease_ttl'den uzun sürebilir (zaman aşımları, hız sınırı beklemeleri): kira iş
+        # bitene kadar düzenli uzatılır, süresi sadece sahibi çökerse dolar
+        renewal = asyncio.ensure_future(self._renew(name))
+        try:
+            return await producer()
+        finally:
+            renewal.cancel()
+            self.shared.submit(self.shared.release, name)
+
+    async def _renew(self, name):
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            if not await self.shared.run(self.shared.renew, name, self.lease_ttl):
+                return
+
+    def busy_elsewhere(self, key):
+        """Aynı anahtarlı iş şu an başka bir süreçte mi çalışıyor"""
+        return self.shared is not None and self.shared.held_elsewhere(repr(key))
+
+    def _forget(self, key, task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+
+    def stats(self):
+        return dict(self.counters, in_flight=len(self.calls))
@@ -61,19 +61,16 @@ chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
         handleSearch(request.query, null, sendResponse, request.isUrl); // TabId null, çünkü popup
         return true;
     }
+    if (request.type === "SECTION") {
+        // Content script sekme açıldığında tek bir bölümü istiyor (performance, injuries, market-value, transfers)
+        fetch(`${API_BASE}/player/${encodeURIComponent(request.playerId)}/${request.section}`)
+            .then(res => res.json())
+            .then(data => sendResponse({ type: "SECTION", data: data }))
+            .catch(error => sendResponse({ type: "ERROR", message: "Hata: " + error.message }));
+        return true;
+    }
 });
 
-// Yardımcı: Metni normalize et (aksanları kaldır, küçük harfe çevir, noktalamaları sil)
-function normalizeText(text) {
-    if (!text) return "";
-    return text
-        .normalize("NFD")
-        .replace(/[\u0300-\u036f]/g, "") // Aksanları kaldır
-        .replace(/[^\w\s]/gi, '')       // Noktalamaları kaldır (N'Golo -> ngolo)
-        .toLocaleLowerCase('tr')
-        .trim();
-}
-
 async function handleSearch(query, tabId = null, sendResponse = null, isUrl = false) {
     try {
         // TabId varsa (Context Menu), loading mesajını güvenli gönder
@@ -92,33 +89,8 @@ async function handleSearch(query, tabId = null, sendResponse = null, isUrl = fa
 
         const searchRes = await fetch(`${API_BASE}/search?name=${encodeURIComponent(query)}`);
         const searchData = await searchRes.json();
-        const originalResults = searchData.results || [];
-        let results = [...originalResults];
-
-        // FİLTRELEME
-        // Sadece tek kelimelik aramalarda filtre uygula (Arda/Sardar vb.)
-        if (results.length > 0) {
-            const qLower = query.toLocaleLowerCase('tr').trim();
-            const isMultiWord = qLower.includes(' ');
-
-            if (!isMultiWord) {
-                const qNormalized = normalizeText(query);
-                const filtered = results.filter(r => {
-                    // İsimdeki her kelimeyi veya ismin tamamını kontrol et
-                    const nameNormalized = normalizeText(r.name);
-                    if (nameNormalized.includes(qNormalized)) return true;
-
-                    const parts = r.name.split(/[\s-]+/);
-                    return parts.some(p => normalizeText(p).startsWith(qNormalized));
-                });
-
-                // Eğer filtreleme her şeyi sildiyse (hatalı bir eşleşme önleme olabilir), 
-                // orijinal sonuçlara geri dönelim ki "bulunamadı" demesin.
-                if (filtered.length > 0) {
-                    results = filtered;
-                }
-            }
-        }
+        // Sonuçlar sunucuda birleştirilip sıralanmış ve alakasızlar elenmiş olarak gelir
+        const results = searchData.results || [];
 
         if (results.length === 0) {
             const msg = { type: "ERROR", message: "Oyuncu bulunamadı." };
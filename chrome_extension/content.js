@@ -93,19 +93,9 @@ function showModal(message) {
   else if (message.type === "DETAILS") {
     const p = message.data;
 
-    // FORMATLAMA: "mil. €" -> "Milyon €"
-    const formatMV = (val) => {
-      if (!val || val === '-') return '-';
-      return val.replace('mil.', 'Milyon').replace('bin', 'Bin');
-    };
-
     const mvFormatted = formatMV(p.market_value);
     const highMvFormatted = formatMV(p.highest_market_value);
 
-    // Market value history sorter (Newest first)
-    // API returns chaotic or sorted, let's parse date to safely sort descending
-    const mvHistory = (p.market_value_history || []).sort((a, b) => 0).reverse();
-
     html += `
       <!-- TAB: PROFIL -->
       <div class="tm-tab-content" id="tab-profile">
@@ -164,8 +154,116 @@ function showModal(message) {
         </div>
       </div>
 
-      <!-- TAB: PERFORMANCE aka KARIYER -->
-      <div class="tm-tab-content tm-hidden" id="tab-performance">
+      <!-- Diğer sekmeler ilk tıklamada API'den ayrı ayrı yüklenir -->
+      <div class="tm-tab-content tm-hidden" id="tab-performance">${getTabLoadingHTML()}</div>
+      <div class="tm-tab-content tm-hidden" id="tab-market">${getTabLoadingHTML()}</div>
+      <div class="tm-tab-content tm-hidden" id="tab-injuries">${getTabLoadingHTML()}</div>
+    `;
+  }
+
+  html += `</div>`; // Close content
+  overlay.innerHTML = html;
+
+  // EVENTS
+  const closeBtn = tmShadowRoot.getElementById('tm-close-btn');
+  closeBtn.addEventListener('click', closeOverlay);
+
+  if (message.type === "DETAILS") {
+    // Tabs Logic
+    const p = message.data;
+    const loadedTabs = new Set();
+    const tabs = tmShadowRoot.querySelectorAll('.tm-tab');
+    tabs.forEach(tab => {
+      tab.addEventListener('click', () => {
+        tabs.forEach(t => t.classList.remove('active'));
+        tab.classList.add('active');
+
+        const target = tab.getAttribute('data-tab');
+        tmShadowRoot.querySelectorAll('.tm-tab-content').forEach(c => c.classList.add('tm-hidden'));
+        tmShadowRoot.getElementById(`tab-${target}`).classList.remove('tm-hidden');
+        loadTab(p, target, loadedTabs);
+      });
+    });
+  }
+
+  if (message.type === "LIST") {
+    const items = tmShadowRoot.querySelectorAll('.tm-list-item');
+    items.forEach(item => {
+      item.addEventListener('click', () => {
+        // Show loading inner
+        overlay.innerHTML = `
+          <div class="tm-header">
+            <div class="tm-logo">⚽ GM Transfermarkt</div>
+            <div class="tm-close" id="tm-close-btn-load">×</div>
+          </div>
+          <div class="tm-loading">
+            <div class="tm-spinner"></div>
+            <div style="margin-top:10px;">Veriler yükleniyor...</div>
+          </div>
+        `;
+        tmShadowRoot.getElementById('tm-close-btn-load').addEventListener('click', closeOverlay);
+
+        const url = item.getAttribute('data-url');
+        chrome.runtime.sendMessage({ type: "MANUAL_SEARCH", query: url, isUrl: true }, (response) => {
+          if (response) showModal(response);
+        });
+      });
+    });
+  }
+}
+
+// LAZY TABS
+// Sekme -> API bölüm endpoint'leri (/player/{id}/{section}) ve içerik render fonksiyonu
+const TAB_SECTIONS = {
+  performance: { sections: ['performance', 'transfers'], render: getPerformanceTabHTML },
+  market: { sections: ['market-value'], render: getMarketTabHTML },
+  injuries: { sections: ['injuries'], render: getInjuriesTabHTML },
+};
+
+function loadTab(p, target, loadedTabs) {
+  const conf = TAB_SECTIONS[target];
+  if (!conf || loadedTabs.has(target)) return;
+  loadedTabs.add(target);
+
+  const container = tmShadowRoot.getElementById(`tab-${target}`);
+  if (!p.player_id) {
+    container.innerHTML = conf.render(p);
+    return;
+  }
+
+  Promise.all(conf.sections.map(section => requestSection(p.player_id, section)))
+    .then(parts => {
+      parts.forEach(part => Object.assign(p, part));
+      container.innerHTML = conf.render(p);
+    })
+    .catch(error => {
+      // Tekrar tıklanınca yeniden denensin
+      loadedTabs.delete(target);
+      container.innerHTML = `<div class="tm-error">Hata: ${error.message}</div>`;
+    });
+}
+
+function requestSection(playerId, section) {
+  return new Promise((resolve, reject) => {
+    chrome.runtime.sendMessage({ type: "SECTION", playerId: playerId, section: section }, (response) => {
+      if (!response || response.type === "ERROR") reject(new Error(response ? response.message : 'Bağlantı hatası'));
+      else resolve(response.data);
+    });
+  });
+}
+
+function getTabLoadingHTML() {
+  return `
+    <div class="tm-loading">
+      <div class="tm-spinner"></div>
+      <div style="margin-top:10px;">Veriler yükleniyor...</div>
+    </div>
+  `;
+}
+
+function getPerformanceTabHTML(p) {
+  const performance = p.performance || {};
+  return `
          <!-- BU SEZON -->
          <div class="tm-table-box">
            <div class="tm-table-header">BU SEZON PERFORMANSI</div>
@@ -173,7 +271,7 @@ function showModal(message) {
              <thead>
                <tr><th class="tm-comp-col">Turnuva</th><th>Maç</th><th>Gol</th><th>Asist</th><th>Dk</th></tr>
              </thead>
-             <tbody>${getSeasonRows(p.performance.current_season)}</tbody>
+             <tbody>${getSeasonRows(performance.current_season)}</tbody>
            </table>
          </div>
 
@@ -184,7 +282,7 @@ function showModal(message) {
              <thead>
                <tr><th class="tm-comp-col">Kulüp</th><th>Maç</th><th>Gol</th><th>Asist</th></tr>
              </thead>
-             <tbody>${getTeamStatsRows(p.performance.by_team)}</tbody>
+             <tbody>${getTeamStatsRows(performance.by_team)}</tbody>
            </table>
          </div>
 
@@ -198,10 +296,17 @@ function showModal(message) {
              ${getTransferRows(p.transfer_history)}
            </div>
          </div>
-      </div>
+  `;
+}
+
+function getMarketTabHTML(p) {
+  const mvFormatted = formatMV(p.market_value);
+
+  // Market value history (Newest first)
+  // API returns points sorted by date_iso ascending, so reversing a copy is enough
+  const mvHistory = (p.market_value_history || []).slice().reverse();
 
-      <!-- TAB: MARKET VALUE -->
-      <div class="tm-tab-content tm-hidden" id="tab-market">
+  return `
          <div class="tm-profile-card" style="flex-direction:column; align-items:center; text-align:center;">
              <div style="font-size:12px; color:#666;">Güncel Değer</div>
              <div style="font-size:24px; font-weight:bold; color:#00193F;">${mvFormatted}</div>
@@ -213,10 +318,11 @@ function showModal(message) {
                ${getMarketValueRows(mvHistory)}
             </div>
          </div>
-      </div>
+  `;
+}
 
-      <!-- TAB: INJURIES -->
-      <div class="tm-tab-content tm-hidden" id="tab-injuries">
+function getInjuriesTabHTML(p) {
+  return `
           <div class="tm-table-box">
             <div class="tm-table-header">SAKATLIK GEÇMİŞİ</div>
             <table class="tm-perf-table">
@@ -233,59 +339,16 @@ function showModal(message) {
               </tbody>
             </table>
           </div>
-      </div>
-    `;
-  }
-
-  html += `</div>`; // Close content
-  overlay.innerHTML = html;
-
-  // EVENTS
-  const closeBtn = tmShadowRoot.getElementById('tm-close-btn');
-  closeBtn.addEventListener('click', closeOverlay);
-
-  if (message.type === "DETAILS") {
-    // Tabs Logic
-    const tabs = tmShadowRoot.querySelectorAll('.tm-tab');
-    tabs.forEach(tab => {
-      tab.addEventListener('click', () => {
-        tabs.forEach(t => t.classList.remove('active'));
-        tab.classList.add('active');
-
-        const target = tab.getAttribute('data-tab');
-        tmShadowRoot.querySelectorAll('.tm-tab-content').forEach(c => c.classList.add('tm-hidden'));
-        tmShadowRoot.getElementById(`tab-${target}`).classList.remove('tm-hidden');
-      });
-    });
-  }
-
-  if (message.type === "LIST") {
-    const items = tmShadowRoot.querySelectorAll('.tm-list-item');
-    items.forEach(item => {
-      item.addEventListener('click', () => {
-        // Show loading inner
-        overlay.innerHTML = `
-          <div class="tm-header">
-            <div class="tm-logo">⚽ GM Transfermarkt</div>
-            <div class="tm-close" id="tm-close-btn-load">×</div>
-          </div>
-          <div class="tm-loading">
-            <div class="tm-spinner"></div>
-            <div style="margin-top:10px;">Veriler yükleniyor...</div>
-          </div>
-        `;
-        tmShadowRoot.getElementById('tm-close-btn-load').addEventListener('click', closeOverlay);
-
-        const url = item.getAttribute('data-url');
-        chrome.runtime.sendMessage({ type: "MANUAL_SEARCH", query: url, isUrl: true }, (response) => {
-          if (response) showModal(response);
-        });
-      });
-    });
-  }
+  `;
 }
 
 // HELPERS
+// FORMATLAMA: "mil. €" -> "Milyon €"
+function formatMV(val) {
+  if (!val || val === '-') return '-';
+  return val.replace('mil.', 'Milyon').replace('bin', 'Bin');
+}
+
 function row(label, val) {
   return val && val !== '-' ? `
     <div class="tm-data-row">
@@ -0,0 +1,112 @@
+"""Upstream koşullu istekleri (ETag / Last-Modified) ve istemciye dönük ETag/304.
+
+ValidatorStore her başarılı upstream cevabının doğrulayıcılarını (ETag, Last-Modified)
+ve gövdesini URL bazında, toplam boyutu sınırlı bir LRU'da tutar. Aynı URL tekrar
+istendiğinde If-None-Match / If-Modified-Since gönderilir; site 304 dönerse saklanan
+gövde 200 cevabı olarak yeniden kurulur ve NOT_MODIFIED ile işaretlenir.
+
+Bir bölüm üretilirken okunan URL'ler SECTION_SOURCES ile toplanır. Bölüm yeniden
+gerektiğinde kaynak sayfalarının hepsi 304 dönerse eski (ayrıştırılmış) değer
+yeniden ayrıştırmadan kullanılır.
+"""
+import contextvars
+import hashlib
+from collections import OrderedDict
+
+import httpx
+
+# httpx.Response.extensions anahtarı: cevap 304'ten yeniden kuruldu
+NOT_MODIFIED = "tm_not_modified"
+
+# cached() içinde üretilen bölümün okuduğu upstream URL'leri (iç içe bölümler dışa da eklenir)
+SECTION_SOURCES = contextvars.ContextVar("tm_section_sources", default=None)
+
+def track_source(url):
+    sources = SECTION_SOURCES.get()
+    if sources is not None:
+        sources.add(url)
+
+class ValidatorStore:
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_sections=20000):
+        self.max_bytes = max_bytes
+        self.max_sections = max_sections
+        # url -> (etag, last_modified, final_url, content_type, content)
+        self.entries = OrderedDict()
+        # (resource, key) -> bölümün kaynak URL'leri
+        self.sources = OrderedDict()
+        self.bytes = 0
+        self.counters = {"conditional_requests": 0, "not_modified": 0, "bytes_saved": 0,
+                         "sections_reused": 0, "evictions": 0}
+
+    def request_headers(self, url):
+        entry = self.entries.get(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry[0]:
+            headers["If-None-Match"] = entry[0]
+        if entry[1]:
+            headers["If-Modified-Since"] = entry[1]
+        self.counters["conditional_requests"] += 1
+        return headers
+
+    def remember(self, url, response):
+        etag, last_modified = response.headers.get("etag"), response.headers.get("last-modified")
+        if not etag and not last_modified:
+            self._drop(url)
+            return
+        self._drop(url)
+        content = response.content
+        self.entries[url] = (etag, last_modified, str(response.url),
+                             response.headers.get("content-type", ""), content)
+        self.bytes += len(content)
+        while self.bytes > self.max_bytes and self.entries:
+            _, old = self.entries.popitem(last=False)
+            self.bytes -= len(old[4])
+            self.counters["evictions"] += 1
+
+    def replay(self, url):
+        """304 cevabı yerine saklanan gövdeyle 200 cevabı; kayıt yoksa None"""
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        self.entries.move_to_end(url)
+        self.counters["not_modified"] += 1
+        self.counters["bytes_saved"] += len(entry[4])
+        return httpx.Response(200, headers={"Content-Type": entry[3]}, content=entry[4],
+                              request=httpx.Request("GET", entry[2]), extensions={NOT_MODIFIED: True})
+
+    def set_sources(self, resource, key, urls):
+        self.sources[(resource, key)] = tuple(sorted(urls))
+        self.sources.move_to_end((resource, key))
+        while len(self.sources) > self.max_sections:
+            self.sources.popitem(last=False)
+
+    def get_sources(self, resource, key):
+        """Bölümün kaynak URL'leri; hepsinin doğrulayıcısı yoksa (yeniden doğrulanamaz) boş"""
+        urls = self.sources.get((resource, key), ())
+        return urls if urls and all(url in self.entries for url in urls) else ()
+
+    def invalidate(self, resource, key):
+        self.sources.pop((resource, key), None)
+
+    def _drop(self, url):
+        old = self.entries.pop(url, None)
+        if old is not None:
+            self.bytes -= len(old[4])
+
+    def stats(self):
+        return dict(self.counters, entries=len(self.entries), bytes=self.bytes,
+                    max_bytes=self.max_bytes, sections=len(self.sources))
+
+def content_etag(body):
+    """Serileştirilmiş gövdenin kararlı ETag'i"""
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match başlığı (liste, W/ öneki veya * olabilir) etag'i kapsıyor mu"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
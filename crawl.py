@@ -0,0 +1,345 @@
+"""Lig ve kulüpleri önceden ısıtmak için kaldığı yerden devam edebilen toplu tarayıcı.
+
+Bir iş; lig (wettbewerb), kulüp (verein, kader sayfası) veya oyuncu profili
+URL'lerinden oluşur (sadece TM_BASE_URL host'unda). Lig sayfası kulüplere, kulübün
+kadro sayfası oyunculara açılır ve her oyuncu /player'ın kullandığı build_player_profile
+ile kazınır; böylece sonuçlar önbelleğe ve kalıcı depoya aynı extractor'larla yazılır.
+
+Kuyruk SQLite'ta (WAL) tutulur: her öğenin durumu (pending/running/done/failed)
+işlendiği anda yazılır, yani süreç ölürse iş kaldığı yerden devam eder (running
+kalan öğeler yeniden pending olur). Kuyruğa yazan metotlar async'tir ve SQLiteWriter
+thread'inde çalışır, event loop'u bloklamaz. Aynı anda en fazla `concurrency` öğe
+işlenir; devre kesici açıkken tarama durur, upstream istekleri zaten RateGovernor'dan geçer.
+
+    python crawl.py run https://www.transfermarkt.com.tr/super-lig/startseite/wettbewerb/TR1 --concurrency 4
+    python crawl.py resume 3
+    python crawl.py status [3]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+
+from sqlite_writer import SQLiteWriter
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        targets TEXT NOT NULL,
+        include TEXT NOT NULL,
+        status TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        updated_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS items (
+        job_id INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (job_id, url)
+    )""",
+    "CREATE INDEX IF NOT EXISTS items_pending ON items (job_id, status)",
+)
+
+# Süreç kapanırken yarıda kesilen işler; açılışta running olanlarla birlikte devam ettirilir
+RESUMABLE = ("running", "interrupted")
+
+KINDS = ("league", "club", "player")
+
+CLUB_LINK = re.compile(r'/([^/?#]+)/(?:startseite|kader|spielplan)/verein/(\d+)(?:/saison_id/(\d+))?')
+PLAYER_LINK = re.compile(r'/([^/?#]+)/profil/spieler/(\d+)')
+
+def same_host(url, base_url):
+    """URL base_url ile aynı http(s) host'unda mı"""
+    parts, base = urllib.parse.urlsplit(url), urllib.parse.urlsplit(base_url)
+    return parts.scheme in ("http", "https") and parts.netloc.lower() == base.netloc.lower()
+
+def target_kind(url, base_url=None):
+    """URL'nin tarama türü: league, club, player ya da None.
+    base_url verilirse başka host'taki URL'ler de None döner."""
+    if base_url is not None and not same_host(url, base_url):
+        return None
+    if '/wettbewerb/' in url:
+        return "league"
+    if '/verein/' in url:
+        return "club"
+    if '/spieler/' in url:
+        return "player"
+    return None
+
+def squad_url(url):
+    """Kulübün herhangi bir sayfasından kadro (kader) sayfası"""
+    m = CLUB_LINK.search(url)
+    if not m:
+        return url
+    base = url[:url.index(m.group(0))]
+    return f"{base}/{m.group(1)}/kader/verein/{m.group(2)}" + (f"/saison_id/{m.group(3)}" if m.group(3) else "")
+
+def parse_club_links(soup, base_url):
+    """Lig sayfasındaki kulüplerin kadro URL'leri (sıra korunur, tekrarsız)"""
+    clubs = {}
+    for a in soup.find_all('a', href=True):
+        m = CLUB_LINK.search(a['href'])
+        if m and m.group(2) not in clubs:
+            clubs[m.group(2)] = squad_url(base_url + m.group(0))
+    return list(clubs.values())
+
+def parse_squad_players(soup, base_url):
+    """Kadro sayfasındaki oyuncuların profil URL'leri (sıra korunur, tekrarsız)"""
+    players = {}
+    for a in soup.find_all('a', href=True):
+        m = PLAYER_LINK.search(a['href'])
+        if m and m.group(2) not in players:
+            players[m.group(2)] = base_url + m.group(0)
+    return list(players.values())
+
+class CrawlQueue:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        self.lock = threading.Lock()
+        # Yazmalar ayrı bağlantıyla yazıcı thread'inde
+        self.writer = SQLiteWriter(path, "tm-crawl")
+
+    async def create_job(self, targets, include):
+        return await self.writer.run(self._create_job, targets, include)
+
+    def _create_job(self, targets, include):
+        now = time.time()
+        job_id = self.writer.conn.execute(
+            "INSERT INTO jobs (targets, include, status, created_at, updated_at) VALUES (?, ?, 'pending', ?, ?)",
+            (json.dumps(targets), include, now, now)).lastrowid
+        for url in targets:
+            self._enqueue(job_id, target_kind(url), [squad_url(url) if target_kind(url) == "club" else url])
+        return job_id
+
+    def job(self, job_id):
+        with self.lock:
+            row = self.conn.execute("SELECT id, targets, include, status, created_at, started_at, updated_at "
+                                    "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {"job_id": row[0], "targets": json.loads(row[1]), "include": row[2], "status": row[3],
+                "created_at": row[4], "started_at": row[5], "updated_at": row[6]}
+
+    def jobs(self, statuses=None):
+        query = "SELECT id FROM jobs"
+        if statuses:
+            query += f" WHERE status IN ({','.join('?' * len(statuses))})"
+        with self.lock:
+            rows = self.conn.execute(query + " ORDER BY id", tuple(statuses or ())).fetchall()
+        return [row[0] for row in rows]
+
+    async def set_status(self, job_id, status):
+        now = time.time()
+        await self.writer.run(
+            self.writer.conn.execute,
+            "UPDATE jobs SET status = ?, updated_at = ?, started_at = COALESCE(started_at, ?) WHERE id = ?",
+            (status, now, now if status == "running" else None, job_id))
+
+    async def enqueue(self, job_id, kind, urls):
+        """Yeni öğeleri ekle (işte zaten olan URL'ler atlanır); eklenen sayı"""
+        return await self.writer.run(self._enqueue, job_id, kind, urls)
+
+    def _enqueue(self, job_id, kind, urls):
+        now = time.time()
+        return self.writer.conn.executemany(
+            "INSERT OR IGNORE INTO items (job_id, url, kind, status, updated_at) VALUES (?, ?, ?, 'pending', ?)",
+            [(job_id, url, kind, now) for url in urls]).rowcount
+
+    async def claim(self, job_id):
+        """Sıradaki pending öğeyi running yap: (url, kind, attempts) ya da None.
+        Lig ve kulüpler önce açılır ki oyuncu kuyruğu erken dolsun."""
+        return await self.writer.run(self._claim, job_id)
+
+    def _claim(self, job_id):
+        # Tek UPDATE ... RETURNING: aynı kuyruğu okuyan başka süreçlerle de atomik
+        return self.writer.conn.execute(
+            "UPDATE items SET status = 'running', updated_at = ? WHERE rowid = ("
+            "SELECT rowid FROM items WHERE job_id = ? AND status = 'pending' "
+            "ORDER BY CASE kind WHEN 'league' THEN 0 WHEN 'club' THEN 1 ELSE 2 END, rowid LIMIT 1) "
+            "RETURNING url, kind, attempts", (time.time(), job_id)).fetchone()
+
+    async def finish(self, job_id, url, error=None, max_attempts=3):
+        """Öğeyi done yap; hata varsa deneme sayısı dolana kadar pending'e, sonra failed'a al"""
+        if error is None:
+            await self.writer.run(self.writer.conn.execute,
+                                  "UPDATE items SET status = 'done', error = NULL, updated_at = ? "
+                                  "WHERE job_id = ? AND url = ?", (time.time(), job_id, url))
+        else:
+            await self.writer.run(self.writer.conn.execute,
+                                  "UPDATE items SET attempts = attempts + 1, error = ?, updated_at = ?, "
+                                  "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END "
+                                  "WHERE job_id = ? AND url = ?",
+                                  (str(error)[:500], time.time(), max_attempts, job_id, url))
+
+    async def reset_running(self, job_id):
+        """Yarıda kalan (süreç ölmüş veya iptal edilmiş) öğeleri yeniden kuyruğa al"""
+        await self.writer.run(self.writer.conn.execute,
+                              "UPDATE items SET status = 'pending' WHERE job_id = ? AND status = 'running'", (job_id,))
+
+    def progress(self, job_id):
+        job = self.job(job_id)
+        if job is None:
+            return None
+        with self.lock:
+            rows = self.conn.execute("SELECT kind, status, COUNT(*) FROM items WHERE job_id = ? GROUP BY kind, status",
+                                     (job_id,)).fetchall()
+            errors = self.conn.execute("SELECT url, error FROM items WHERE job_id = ? AND status = 'failed' "
+                                       "ORDER BY updated_at DESC LIMIT 5", (job_id,)).fetchall()
+        counts = {kind: {"pending": 0, "running": 0, "done": 0, "failed": 0} for kind in KINDS}
+        for kind, status, count in rows:
+            counts.setdefault(kind, {})[status] = count
+        players = counts["player"]
+        elapsed = (job["updated_at"] if job["status"] != "running" else time.time()) - (job["started_at"] or job["created_at"])
+        total = sum(players.values())
+        return dict(
+            job,
+            items=counts,
+            players_total=total,
+            players_done=players["done"],
+            percent=round(100 * (players["done"] + players["failed"]) / total, 1) if total else 0.0,
+            players_per_minute=round(players["done"] / elapsed * 60, 1) if elapsed > 0 else 0.0,
+            recent_errors=[{"url": url, "error": error} for url, error in errors],
+        )
+
+    def close(self):
+        self.writer.close()
+        with self.lock:
+            self.conn.close()
+
+class Crawler:
+    """Kuyruktaki işleri çalıştırır. Sayfa indirme/ayrıştırma ve oyuncu kazıma API'den verilir:
+
+    fetch_links(url, parser) -> [url]   (parser: parse_club_links / parse_squad_players)
+    scrape(url, include) -> profil dict'i ({"error": ...} hata demek)
+    is_paused() -> True iken yeni öğe alınmaz (ör. devre kesici açık)
+    base_url verilirse başka host'taki öğeler indirilmeden başarısız sayılır.
+    """
+
+    def __init__(self, queue, fetch_links, scrape, is_paused=lambda: False, concurrency=4, max_attempts=3,
+                 base_url=None):
+        self.queue = queue
+        self.fetch_links = fetch_links
+        self.scrape = scrape
+        self.is_paused = is_paused
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_url = base_url
+
+    async def process(self, job_id, url, kind, include):
+        if self.base_url is not None and not same_host(url, self.base_url):
+            raise ValueError(f"{self.base_url} dışındaki URL taranmaz: {url}")
+        if kind == "league":
+            await self.queue.enqueue(job_id, "club", await self.fetch_links(url, parse_club_links))
+        elif kind == "club":
+            await self.queue.enqueue(job_id, "player", await self.fetch_links(url, parse_squad_players))
+        elif kind == "player":
+            data = await self.scrape(url, include)
+            if isinstance(data, dict) and "error" in data:
+                raise RuntimeError(data["error"])
+        else:
+            raise ValueError(f"Tanınmayan hedef: {url}")
+
+    async def run(self, job_id):
+        """İşi pending öğe kalmayana kadar çalıştır; iptal edilirse durum paused olur"""
+        job = self.queue.job(job_id)
+        include = tuple(x for x in job["include"].split(",") if x)
+        await self.queue.reset_running(job_id)
+        await self.queue.set_status(job_id, "running")
+        active = 0
+
+        async def worker():
+            nonlocal active
+            while True:
+                if self.is_paused():
+                    await asyncio.sleep(1)
+                    continue
+                item = await self.queue.claim(job_id)
+                if item is None:
+                    # Diğer worker'lar lig/kulüp açıp yeni öğe ekleyebilir
+                    if active == 0:
+                        return
+                    await asyncio.sleep(0.1)
+                    continue
+                url, kind, _ = item
+                active += 1
+                try:
+                    await self.process(job_id, url, kind, include)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    await self.queue.finish(job_id, url, str(e) or type(e).__name__, self.max_attempts)
+                else:
+                    await self.queue.finish(job_id, url)
+                finally:
+                    active -= 1
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        except asyncio.CancelledError:
+            await self.queue.reset_running(job_id)
+            await self.queue.set_status(job_id, "paused")
+            raise
+        await self.queue.set_status(job_id, "done")
+        return self.queue.progress(job_id)
+
+async def run_cli(args):
+    # Bu süreçte sadece istenen iş çalışsın
+    os.environ["TM_CRAWL_AUTORESUME"] = "0"
+    import api
+
+    queue = api.crawl_queue()
+    if args.command == "run":
+        unknown = [url for url in args.targets if target_kind(url, api.BASE_URL) is None]
+        if unknown:
+            raise SystemExit(f"{api.BASE_URL} üzerinde lig, kulüp veya oyuncu URL'si bekleniyordu: {unknown}")
+        job_id = await queue.create_job(args.targets, ",".join(api.parse_include(args.include)))
+    else:
+        job_id = args.job_id
+    crawler = api.make_crawler(concurrency=args.concurrency)
+    async with api.app.router.lifespan_context(api.app):
+        task = asyncio.ensure_future(crawler.run(job_id))
+        while not task.done():
+            await asyncio.wait([task], timeout=args.interval)
+            p = queue.progress(job_id)
+            print(f"[iş {job_id}] {p['status']} kulüp {p['items']['club']['done']}/{sum(p['items']['club'].values())} "
+                  f"oyuncu {p['players_done']}/{p['players_total']} ({p['percent']}%) "
+                  f"{p['players_per_minute']}/dk hata {p['items']['player']['failed']}")
+        task.result()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Yeni tarama işi başlat")
+    run.add_argument("targets", nargs="+", help="Lig, kulüp veya oyuncu URL'leri")
+    run.add_argument("--include", default="all", help="/player include parametresi")
+    resume = commands.add_parser("resume", help="Yarıda kalan işi devam ettir")
+    resume.add_argument("job_id", type=int)
+    for p in (run, resume):
+        p.add_argument("--concurrency", default=None, type=int)
+        p.add_argument("--interval", default=5.0, type=float, help="İlerleme yazdırma aralığı (saniye)")
+    status = commands.add_parser("status", help="İş(ler)in ilerlemesi")
+    status.add_argument("job_id", nargs="?", type=int)
+    args = parser.parse_args()
+
+    if args.command == "status":
+        import api
+        queue = api.crawl_queue()
+        for job_id in [args.job_id] if args.job_id else queue.jobs():
+            print(json.dumps(queue.progress(job_id), ensure_ascii=False))
+    else:
+        asyncio.run(run_cli(args))
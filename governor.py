@@ -0,0 +1,132 @@
+"""Transfermarkt'a giden tüm istekler için hız sınırlayıcı ve devre kesici.
+
+- Token bucket: saniyede `rate` istek, en fazla `burst` kadar ani yükselme.
+  Token beklemesi `max_wait` saniyeyi aşacaksa istek hiç gönderilmeden reddedilir.
+- Uyarlamalı geri çekilme: 403/429/5xx ve bağlantı hatalarında hız yarıya iner ve
+  istekler bir süre durdurulur (429'da Retry-After'a uyulur); her başarılı cevapta
+  hız yavaşça temel değerine geri çıkar.
+- Devre kesici: art arda `breaker_threshold` engelleme sonrası devre açılır ve
+  `cooldown` boyunca upstream'e hiç gidilmez. Süre dolunca tek bir deneme isteğine
+  izin verilir (half-open); başarılıysa devre kapanır, değilse süre ikiye katlanır.
+"""
+import asyncio
+import time
+
+class RateGovernor:
+    def __init__(self, rate=10.0, burst=20, min_rate=0.5, max_wait=10.0,
+                 breaker_threshold=5, cooldown=30.0, max_cooldown=600.0):
+        self.base_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate) if rate > 0 else 0.0
+        self.burst = burst
+        self.max_wait = max_wait
+        self.breaker_threshold = breaker_threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.next_probe_at = 0.0
+        self.consecutive_failures = 0
+        self.counters = {"acquired": 0, "throttled": 0, "rejected": 0, "backoffs": 0, "breaker_trips": 0}
+
+    def is_open(self):
+        """Devre açıksa (deneme zamanı gelmemişse) True"""
+        if self.state == "closed":
+            return False
+        return time.monotonic() < self.next_probe_at
+
+    async def acquire(self):
+        """İstek gönderilebilirse True, devre açık veya bekleme çok uzunsa False döner"""
+        now = time.monotonic()
+        if self.state != "closed":
+            if now < self.next_probe_at:
+                self.counters["rejected"] += 1
+                return False
+            # half-open: bir sonraki deneme aralığına kadar sadece bu istek geçer
+            self.state = "half_open"
+            self.next_probe_at = now + self.cooldown
+
+        wait = max(0.0, self.paused_until - now)
+        if self.rate > 0:
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Token'ı şimdiden ayır; eksiye düşerse borç kadar bekle
+            self.tokens -= 1
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+        if wait > self.max_wait:
+            if self.rate > 0:
+                self.tokens += 1
+            self.counters["rejected"] += 1
+            return False
+        if wait > 0:
+            self.counters["throttled"] += 1
+            await asyncio.sleep(wait)
+        self.counters["acquired"] += 1
+        return True
+
+    def record(self, status_code, retry_after=None):
+        if status_code in (403, 429) or status_code >= 500:
+            self._failure(retry_after)
+        else:
+            self._success()
+
+    def record_error(self):
+        """Bağlantı hatası / zaman aşımı"""
+        self._failure(None)
+
+    def _success(self):
+        self.consecutive_failures = 0
+        if self.state != "closed":
+            self.state = "closed"
+            self.cooldown = self.base_cooldown
+            self.paused_until = 0.0
+        if self.rate > 0:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+    def _failure(self, retry_after):
+        now = time.monotonic()
+        self.consecutive_failures += 1
+        self.counters["backoffs"] += 1
+        if self.rate > 0:
+            self.rate = max(self.min_rate, self.rate / 2)
+        pause = retry_after if retry_after is not None else min(60.0, 2.0 ** (self.consecutive_failures - 1))
+        self.paused_until = max(self.paused_until, now + pause)
+
+        if self.state == "half_open":
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self._open(now)
+        elif self.state == "closed" and self.consecutive_failures >= self.breaker_threshold:
+            self._open(now)
+
+    def _open(self, now):
+        self.state = "open"
+        self.opened_at = now
+        self.next_probe_at = now + self.cooldown
+        self.counters["breaker_trips"] += 1
+
+    def stats(self):
+        now = time.monotonic()
+        return dict(
+            self.counters,
+            state=self.state if self.state == "closed" else "open" if self.is_open() else "half_open",
+            rate=round(self.rate, 3),
+            base_rate=self.base_rate,
+            tokens=round(min(float(self.burst), self.tokens + (now - self.updated) * self.rate), 2),
+            paused_for=round(max(0.0, self.paused_until - now), 2),
+            consecutive_failures=self.consecutive_failures,
+            cooldown=self.cooldown,
+            reopens_in=round(max(0.0, self.next_probe_at - now), 2) if self.state != "closed" else 0.0,
+        )
+
+def parse_retry_after(value):
+    """Retry-After başlığındaki saniye değeri; tarih biçimi veya geçersizse None"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
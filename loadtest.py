@@ -0,0 +1,99 @@
+"""/search ve /player için basit yük testi.
+
+Transfermarkt'a gitmeden çalışır: gecikmeli cevap veren yerel bir sahte upstream
+başlatır, API'yi aynı süreçte ASGI üzerinden çağırır ve her eşzamanlılık
+seviyesinde saniyedeki istek sayısını yazdırır. Handler'lar event loop'u
+bloklamıyorsa throughput eşzamanlılıkla birlikte artmalıdır.
+
+Ölçülen şey upstream yolu olsun diye arama indeksi ve arama önbelleği kapatılır
+(TM_SEARCH_INDEX=0, TM_TTL_SEARCH=0) ve yoldaki {n} her istekte benzersiz bir
+sayıyla değiştirilir; böylece istekler single-flight'ta da birleşmez.
+
+    python loadtest.py --levels 1,4,16,64 --requests 128 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SEARCH_PAGE = b"""<html><body><div class="box"><h2 class="content-box-headline">Futbolcu</h2>
+<table class="items"><tbody>
+<tr><td><img src="p.jpg"/><a href="/arda-guler/profil/spieler/861410" title="Arda G\xc3\xbcler">Arda G\xc3\xbcler</a></td>
+<td><img class="tiny_wappen" title="Real Madrid"/></td></tr>
+</tbody></table></div></body></html>"""
+
+def start_fake_upstream(latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(SEARCH_PAGE)))
+            self.end_headers()
+            self.wfile.write(SEARCH_PAGE)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+async def run_level(client, path, concurrency, total, first=0):
+    queue = asyncio.Queue()
+    for n in range(first, first + total):
+        queue.put_nowait(n)
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            n = queue.get_nowait()
+            resp = await client.get(path.replace("{n}", str(n)))
+            if resp.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return total / elapsed, errors
+
+async def main(args):
+    server = start_fake_upstream(args.latency)
+    os.environ["TM_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("TM_MAX_CONCURRENCY", str(max(args.levels) * 8))
+    # Sahte upstream'e karşı hız sınırı ölçümü bozmasın
+    os.environ.setdefault("TM_RATE", "0")
+    # Her istek upstream'e gitsin: indeks ve arama önbelleği cevaplamasın
+    os.environ["TM_SEARCH_INDEX"] = "0"
+    os.environ["TM_TTL_SEARCH"] = "0"
+
+    import httpx
+    import api
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with api.app.router.lifespan_context(api.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=60) as client:
+            print(f"{'concurrency':>11} {'req/s':>9} {'errors':>7}")
+            sent = 0
+            for level in args.levels:
+                total = max(args.requests, level)
+                rps, errors = await run_level(client, args.path, level, total, first=sent)
+                sent += total
+                print(f"{level:>11} {rps:>9.1f} {errors:>7}")
+            print("upstream pool:", (await client.get("/stats/pool")).json())
+    server.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default="/search?name=arda{n}",
+                        help="Test edilecek API yolu; {n} her istekte benzersiz sayıyla değiştirilir")
+    parser.add_argument("--levels", default="1,2,4,8,16,32,64", type=lambda v: [int(x) for x in v.split(",")])
+    parser.add_argument("--requests", default=128, type=int, help="Her seviyedeki toplam istek sayısı")
+    parser.add_argument("--latency", default=0.1, type=float, help="Sahte upstream gecikmesi (saniye)")
+    asyncio.run(main(parser.parse_args()))
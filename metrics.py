@@ -0,0 +1,109 @@
+"""Aşama bazlı süre ölçümü: Server-Timing başlığı, Prometheus metrikleri ve trace logları.
+
+Her HTTP isteği için bir Trace oluşturulur ve bir ContextVar'a konur; istek içinde
+başlatılan asyncio task'ları aynı Trace nesnesini görür. Upstream indirmeleri ve
+ayrıştırma adımları `record(stage, seconds)` ile hem o isteğin Trace'ine hem de
+süreç genelindeki histogramlara yazılır.
+"""
+import contextvars
+import time
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CURRENT_TRACE = contextvars.ContextVar("tm_trace", default=None)
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.total += 1
+        self.sum += value
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+
+class Metrics:
+    def __init__(self):
+        self.stages = {}
+        self.requests = {}
+        self.upstream_status = {}
+        self.upstream_bytes = 0
+
+    def observe_stage(self, stage, seconds):
+        self.stages.setdefault(stage, Histogram()).observe(seconds)
+
+    def observe_request(self, method, path, status, seconds):
+        self.requests.setdefault((method, path, str(status)), Histogram()).observe(seconds)
+
+    def upstream_response(self, status, size):
+        self.upstream_status[str(status)] = self.upstream_status.get(str(status), 0) + 1
+        self.upstream_bytes += size
+
+    def render(self, gauges=()):
+        """Prometheus metin formatı. gauges: (ad, açıklama, değer) üçlüleri"""
+        lines = []
+        _histograms(lines, "tm_stage_duration_seconds", "Upstream indirme ve ayrıştırma aşamalarının süresi",
+                    {(("stage", stage),): h for stage, h in self.stages.items()})
+        _histograms(lines, "tm_http_request_duration_seconds", "API isteklerinin toplam süresi",
+                    {(("method", m), ("path", p), ("status", s)): h for (m, p, s), h in self.requests.items()})
+        lines.append("# HELP tm_upstream_responses_total Durum koduna göre upstream cevap sayısı")
+        lines.append("# TYPE tm_upstream_responses_total counter")
+        for status, count in sorted(self.upstream_status.items()):
+            lines.append(f'tm_upstream_responses_total{{status="{_label(status)}"}} {count}')
+        lines.append("# HELP tm_upstream_bytes_total Upstream'den indirilen toplam gövde boyutu")
+        lines.append("# TYPE tm_upstream_bytes_total counter")
+        lines.append(f"tm_upstream_bytes_total {self.upstream_bytes}")
+        for name, help_text, value in gauges:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+def _label(value):
+    """Prometheus etiket değeri kaçışı: ters bölü, çift tırnak ve satır sonu"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _histograms(lines, name, help_text, series):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, h in sorted(series.items()):
+        base = ",".join(f'{k}="{_label(v)}"' for k, v in labels)
+        for bound, count in zip(BUCKETS, h.counts):
+            lines.append(f'{name}_bucket{{{base},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{base},le="+Inf"}} {h.total}')
+        lines.append(f"{name}_sum{{{base}}} {h.sum:.6f}")
+        lines.append(f"{name}_count{{{base}}} {h.total}")
+
+class Trace:
+    """Tek bir API isteği boyunca kaydedilen aşamalar"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.player_id = None
+        self.spans = []
+
+    def add(self, stage, seconds, detail=None):
+        self.spans.append((stage, seconds, detail))
+
+    def server_timing(self):
+        """Aynı adlı aşamaları toplayıp Server-Timing başlık değerini üret"""
+        totals = {}
+        for stage, seconds, _ in self.spans:
+            dur, count = totals.get(stage, (0.0, 0))
+            totals[stage] = (dur + seconds, count + 1)
+        parts = [f'{stage};dur={dur * 1000:.1f};desc="x{count}"' for stage, (dur, count) in totals.items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+    def to_log(self, **fields):
+        return dict(
+            fields,
+            event="trace",
+            player_id=self.player_id,
+            total_ms=round((time.perf_counter() - self.started) * 1000, 1),
+            stages=[{"stage": s, "ms": round(sec * 1000, 2), **({"detail": d} if d else {})}
+                    for s, sec, d in self.spans],
+        )
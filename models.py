@@ -0,0 +1,257 @@
+"""Önbellekte tutulan profil ve alt kayıtları için slot'lu, tipli modeller ve hızlı JSON.
+
+Extractor'lar dict üretmeye devam eder; cached() sonucu önbelleğe yazmadan önce
+compact() ile bir kez bu modellere çevrilir. Modeller dict gibi okunabilir
+(kayit['value'], kayit.get('value'), dict(kayit)), böylece mevcut kod değişmeden
+çalışır; ama kayıt başına dict yerine slot'lu bir nesne tutulduğu için bellek azalır.
+
+dumps() orjson kuruluysa onu kullanır (dataclass'ları doğrudan serileştirir),
+değilse standart json'a düşer.
+"""
+import datetime
+import hashlib
+import json
+from array import array
+from dataclasses import dataclass, fields
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class Record:
+    """Dataclass'lara salt okunur dict arayüzü"""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        return [f.name for f in fields(self)]
+
+    def __contains__(self, key):
+        return key in self.__dataclass_fields__
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.keys()}
+
+@dataclass(slots=True)
+class MarketValuePoint(Record):
+    date: str
+    value: str
+    club: str
+    date_iso: str
+    value_eur: int
+
+class MarketValueHistory(list):
+    """Tarihe göre sıralı piyasa değeri noktaları.
+
+    Liste olarak eskisi gibi serileştirilir; yanında sayısal noktalar için kompakt
+    diziler (gün sırası, euro) ve önceden hesaplanmış max/min/son nokta tutulur.
+    """
+    __slots__ = ("days", "euros", "positions", "max_index", "min_index", "digest")
+
+    @classmethod
+    def from_points(cls, points):
+        history = cls(sorted(points, key=lambda p: p.get("date_iso") or ""))
+        history.days = array('l')
+        history.euros = array('q')
+        # Sayısal dizilerdeki her elemanın listedeki yeri
+        history.positions = array('l')
+        for i, point in enumerate(history):
+            date_iso, euros = point.get("date_iso"), point.get("value_eur")
+            if date_iso and euros is not None:
+                history.days.append(datetime.date.fromisoformat(date_iso).toordinal())
+                history.euros.append(euros)
+                history.positions.append(i)
+        euros = history.euros
+        history.max_index = max(range(len(euros)), key=euros.__getitem__) if euros else None
+        history.min_index = min(range(len(euros)), key=euros.__getitem__) if euros else None
+        # Noktaların serileştirilen tüm alanları (kulüp, görünen değer dahil) özete girer. Özet
+        # watchlist'te saklandığından orjson'un kurulu olup olmamasına bağlı olmasın diye json kullanılır
+        body = json.dumps(history, default=_default, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        history.digest = hashlib.sha1(body.encode()).hexdigest()[:16]
+        return history
+
+    def point(self, index):
+        """Sayısal dizideki index'e karşılık gelen nokta"""
+        return None if index is None else self[self.positions[index]]
+
+    def max_point(self):
+        return self.point(self.max_index)
+
+    def min_point(self):
+        return self.point(self.min_index)
+
+    def latest_point(self):
+        return self.point(len(self.euros) - 1) if self.euros else None
+
+    def select(self, start=None, end=None):
+        """[start, end] tarih aralığındaki (ISO) sayısal noktaların index'leri"""
+        lo = datetime.date.fromisoformat(start).toordinal() if start else None
+        hi = datetime.date.fromisoformat(end).toordinal() if end else None
+        return [i for i, day in enumerate(self.days)
+                if (lo is None or day >= lo) and (hi is None or day <= hi)]
+
+    def downsample(self, indices, limit):
+        """Largest-Triangle-Three-Buckets: zirve ve dipleri koruyarak en fazla limit nokta bırak"""
+        if limit <= 0 or len(indices) <= limit:
+            return indices
+        if limit < 3:
+            return [indices[0], indices[-1]][:limit]
+        days, euros = self.days, self.euros
+        kept = [indices[0]]
+        bucket = (len(indices) - 2) / (limit - 2)
+        for b in range(limit - 2):
+            start = int(b * bucket) + 1
+            end = int((b + 1) * bucket) + 1
+            # Sonraki kovanın ortalaması üçgenin üçüncü köşesi
+            nxt = indices[end:min(int((b + 2) * bucket) + 1, len(indices) - 1)] or [indices[-1]]
+            avg_x = sum(days[i] for i in nxt) / len(nxt)
+            avg_y = sum(euros[i] for i in nxt) / len(nxt)
+            a = kept[-1]
+            kept.append(max(indices[start:end], key=lambda i: abs(
+                (days[a] - avg_x) * (euros[i] - euros[a]) - (days[a] - days[i]) * (avg_y - euros[a]))))
+        kept.append(indices[-1])
+        return kept
+
+@dataclass(slots=True)
+class Transfer(Record):
+    season: str
+    date: str
+    from_club: str
+    to_club: str
+    market_value: str
+    fee: str
+
+@dataclass(slots=True)
+class Injury(Record):
+    season: str
+    injury: str
+    days: str
+    matches_missed: str
+
+@dataclass(slots=True)
+class TeamStat(Record):
+    team: str
+    team_logo: str
+    appearances: str
+    goals: str
+    assists: str
+
+@dataclass(slots=True)
+class StatLine(Record):
+    appearances: str
+    goals: str
+    assists: str
+
+@dataclass(slots=True)
+class CompetitionStat(Record):
+    competition: str
+    appearances: str
+    goals: str
+    assists: str
+    minutes: str
+
+@dataclass(slots=True)
+class Performance(Record):
+    current_season: object
+    career_total: object
+    by_team: list
+
+@dataclass(slots=True)
+class PlayerProfile(Record):
+    url: str
+    player_id: str
+    name: str
+    full_name: str
+    jersey_number: str
+    image_url: str
+    market_value: str
+    highest_market_value: str
+    market_value_last_update: str
+    market_value_history: list
+    club: str
+    club_image_url: str
+    contract_expires: str
+    position: str
+    secondary_positions: list
+    age: str
+    birth_date: str
+    birth_place: str
+    nationality: str
+    height: str
+    foot: str
+    agent: str
+    outfitter: str
+    social_media: list
+    league_name: str
+    league_image_url: str
+    youth_clubs: list
+    success_badges: list
+    national_team: dict
+    transfer_history: list
+    performance: object
+    injuries: list
+
+def record(cls, value):
+    """Anahtarları modelin alanlarıyla birebir aynı olan dict'i modele çevir; değilse olduğu gibi bırak"""
+    if isinstance(value, dict) and value.keys() == cls.__dataclass_fields__.keys():
+        return cls(**value)
+    return value
+
+def records(cls, values):
+    if not isinstance(values, list):
+        return values
+    return [record(cls, v) for v in values]
+
+def compact_performance(value):
+    if not isinstance(value, dict):
+        return value
+    value = dict(value)
+    current = value.get("current_season")
+    value["current_season"] = records(CompetitionStat, current) if isinstance(current, list) else record(StatLine, current)
+    value["career_total"] = record(StatLine, value.get("career_total"))
+    value["by_team"] = records(TeamStat, value.get("by_team"))
+    return record(Performance, value)
+
+def compact_profile(value):
+    if not isinstance(value, dict):
+        return value
+    value = dict(value)
+    value["performance"] = compact_performance(value.get("performance"))
+    value["injuries"] = records(Injury, value.get("injuries"))
+    value["transfer_history"] = records(Transfer, value.get("transfer_history"))
+    value["market_value_history"] = MarketValueHistory.from_points(records(MarketValuePoint, value.get("market_value_history") or []))
+    return record(PlayerProfile, value)
+
+COMPACTORS = {
+    "profile": compact_profile,
+    "performance": compact_performance,
+    "injuries": lambda v: records(Injury, v),
+    "transfers": lambda v: records(Transfer, v),
+    "market_value": lambda v: MarketValueHistory.from_points(records(MarketValuePoint, v)),
+}
+
+def compact(resource, value):
+    """Önbelleğe yazılacak bölüm değerini slot'lu modellere çevir"""
+    compactor = COMPACTORS.get(resource)
+    return compactor(value) if compactor else value
+
+def _default(obj):
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} JSON'a çevrilemiyor")
+
+def dumps(obj, sort_keys=False):
+    """JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, default=_default, ensure_ascii=False, sort_keys=sort_keys,
+                      separators=(",", ":")).encode()
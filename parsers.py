@@ -0,0 +1,155 @@
+"""HTML ayrıştırıcı arka uçları ve bölüm sınırlı ayrıştırma.
+
+Extractor'lar BeautifulSoup API'si üzerinden çalışır; burada yalnızca soup'un
+nasıl kurulduğu seçilir:
+
+- "html.parser": Python'un kendi ayrıştırıcısı (en yavaş, ek bağımlılık yok)
+- "lxml": BeautifulSoup'un lxml tree builder'ı
+- "selectolax": sayfa önce lexbor ile ayrıştırılır, yalnızca ilgili bölümlerin
+  HTML'i kesilip küçük bir parça olarak BeautifulSoup'a (lxml ile) verilir
+
+Bir bölüm (section) verildiğinde belgenin sadece o sayfanın extractor'larının
+okuduğu kısımları (ör. table.items, header.data-header) ağaca alınır.
+Arka uç TM_PARSER ile, bölüm sınırlama TM_SECTION_PARSING=0 ile kapatılabilir.
+
+    python parsers.py compare fixtures/   # arka uçların çıktısını ve süresini karşılaştır
+"""
+import importlib.util
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+HAS_LXML = importlib.util.find_spec("lxml") is not None
+HAS_SELECTOLAX = importlib.util.find_spec("selectolax") is not None
+
+BACKENDS = ("html.parser", "lxml", "selectolax")
+
+PARSER = os.environ.get("TM_PARSER", "selectolax" if HAS_SELECTOLAX else "lxml" if HAS_LXML else "html.parser")
+SECTION_PARSING = os.environ.get("TM_SECTION_PARSING", "1") == "1"
+
+# Sayfa türü -> extractor'ların okuduğu elemanlar (etiket adları ve/veya class'lar)
+SECTIONS = {
+    # Profil: başlık, bilgi tablosu, mevkiler, kutular (sezon performansı, altyapı) ve max piyasa değeri.
+    # Kutu dışında kalabilen başlık/içerik çiftleri için content-box-headline ve content de alınır.
+    "profile": {"classes": ("data-header", "info-table", "detail-position", "box",
+                            "content-box-headline", "content",
+                            "tm-market-value-development__max-value")},
+    # Performans, sezon ve sakatlık sayfaları sadece items tablolarını okur
+    "items": {"classes": ("items",)},
+    # Piyasa değeri sayfası: Highcharts verisi script etiketlerinde
+    "scripts": {"tags": ("script",)},
+    # Arama: sonuç kutuları, tablo ve direkt profile yönlenme durumunda başlık
+    "search": {"classes": ("data-header", "box", "items")},
+}
+
+def available_backends():
+    return [b for b in BACKENDS
+            if b == "html.parser" or (b == "lxml" and HAS_LXML) or (b == "selectolax" and HAS_SELECTOLAX)]
+
+def _strainer(section):
+    spec = SECTIONS[section]
+    if "tags" in spec:
+        return SoupStrainer(list(spec["tags"]))
+    # class_ listesi çok değerli class'larda eşleşmiyor; tüm class dizesi üzerinde regex kullan
+    pattern = r'(?:^|\s)(?:' + '|'.join(re.escape(c) for c in spec["classes"]) + r')(?:\s|$)'
+    return SoupStrainer(class_=re.compile(pattern))
+
+def _selector(section):
+    spec = SECTIONS[section]
+    return ", ".join(list(spec.get("tags", ())) + ["." + c for c in spec.get("classes", ())])
+
+STRAINERS = {section: _strainer(section) for section in SECTIONS}
+SELECTORS = {section: _selector(section) for section in SECTIONS}
+
+def _slice_sections(content, section):
+    """lexbor ile ayrıştırıp seçilen bölümlerin HTML'ini belge sırasıyla birleştir (iç içe olanları atla)"""
+    from selectolax.lexbor import LexborHTMLParser
+    tree = LexborHTMLParser(content)
+    selected = set()
+    parts = []
+    for node in tree.css(SELECTORS[section]):
+        parent = node.parent
+        nested = False
+        while parent is not None:
+            if parent.mem_id in selected:
+                nested = True
+                break
+            parent = parent.parent
+        selected.add(node.mem_id)
+        if not nested:
+            parts.append(node.html)
+    return "".join(parts)
+
+def make_soup(content, section=None, backend=None):
+    backend = backend or PARSER
+    if section is not None and not SECTION_PARSING:
+        section = None
+    builder = "lxml" if HAS_LXML and backend != "html.parser" else "html.parser"
+    if backend == "selectolax" and HAS_SELECTOLAX and section is not None:
+        return BeautifulSoup(_slice_sections(content, section), builder)
+    if section is not None:
+        return BeautifulSoup(content, builder, parse_only=STRAINERS[section])
+    return BeautifulSoup(content, builder)
+
+def section_for_fixture(name):
+    """Fixture dosya adından sayfa türünü tahmin et"""
+    if "schnellsuche" in name:
+        return "search"
+    if "marktwertverlauf" in name:
+        return "scripts"
+    if any(k in name for k in ("leistungsdaten", "verletzungen")):
+        return "items"
+    if "profil" in name:
+        return "profile"
+    return None
+
+def _extract(api, section, soup):
+    if section == "profile":
+        return [api.parse_profile_page(soup, "-", None), api.parse_profile_current_season(soup)]
+    if section == "items":
+        return [api.parse_stats_table(soup), api.parse_career_total(soup),
+                api.parse_season_page(soup), api.parse_injury_table(soup)]
+    if section == "scripts":
+        return [api.parse_mv_page(soup)]
+    return [api.parse_search_page(soup, "-")]
+
+def compare(directory, repeat=5):
+    """Her fixture için tam html.parser çıktısını referans alıp diğer arka uçlarla karşılaştır"""
+    import time
+    import api
+
+    combos = [(b, s) for b in available_backends() for s in (False, True)]
+    totals = {combo: 0.0 for combo in combos}
+    mismatches = 0
+    for name in sorted(os.listdir(directory)):
+        section = section_for_fixture(name)
+        if not name.endswith(".html") or section is None:
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            content = f.read()
+        extract = lambda soup_fn: _extract(api, section, soup_fn(content))
+        reference = extract(lambda c: make_soup(c, None, "html.parser"))
+        for backend, limited in combos:
+            soup_fn = lambda c: make_soup(c, section if limited else None, backend)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                output = extract(soup_fn)
+            totals[(backend, limited)] += (time.perf_counter() - start) / repeat
+            if output != reference:
+                mismatches += 1
+                print(f"MISMATCH {name}: backend={backend} sections={limited}")
+
+    baseline = totals[("html.parser", False)] or 1e-9
+    print(f"{'backend':<12} {'sections':<9} {'parse+extract ms':>17} {'speedup':>8}")
+    for (backend, limited), total in totals.items():
+        print(f"{backend:<12} {str(limited):<9} {total * 1000:>17.2f} {baseline / total if total else 0:>7.1f}x")
+    return mismatches
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3 or sys.argv[1] != "compare":
+        print(__doc__)
+        sys.exit(2)
+    sys.exit(1 if compare(sys.argv[2]) else 0)
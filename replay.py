@@ -0,0 +1,178 @@
+"""Transfermarkt cevaplarını diske kaydet ve çevrimdışı olarak tekrar sun.
+
+record: API'nin kendi indirme kodunu gerçek siteye karşı çalıştırıp geçen her
+cevabı (profil, leistungsdatendetails, leistungsdaten, verletzungen, CEAPI) ve
+ayrıca marktwertverlauf yedek sayfasını klasöre yazar. Dosya adları
+parsers.section_for_fixture ile uyumludur, yani klasör `parsers.py compare` ile
+de kullanılabilir.
+
+serve: kaydedilen cevapları gecikme ekleyerek sunan yerel HTTP sunucusu.
+Kaydı olmayan oyuncu ID'leri ve slug'lar kayıtlı oyuncunun sayfalarına düşer,
+böylece benchmark binlerce farklı oyuncu ID'si ile çalışabilir. 200 cevaplarına
+gövde özetinden bir ETag eklenir ve If-None-Match eşleşirse 304 dönülür.
+
+    python replay.py record fixtures/ https://www.transfermarkt.com.tr/arda-guler/profil/spieler/861410 --search "arda güler"
+    python replay.py serve fixtures/ --port 8765 --latency 0.2
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INDEX_FILE = "index.json"
+PLAYER_PAGES = ("profil", "leistungsdatendetails", "leistungsdatenverein", "leistungsdaten",
+                "verletzungen", "marktwertverlauf")
+
+def template(path):
+    """Oyuncuya özgü yolu slug ve ID'den bağımsız bir şablona çevir"""
+    path = path.split('?')[0]
+    m = re.match(r'^/[^/]+/(' + '|'.join(PLAYER_PAGES) + r')/spieler/\d+(.*)$', path)
+    if m:
+        return f"/-/{m.group(1)}/spieler/{{id}}{m.group(2)}"
+    return re.sub(r'^(/ceapi/.+/)\d+$', r'\1{id}', path)
+
+def fixture_name(path, content_type):
+    """/arda-guler/profil/spieler/861410 -> profil-spieler-861410.html"""
+    parts = [p for p in urllib.parse.urlsplit(path).path.split('/') if p]
+    if parts and parts[0] != "ceapi" and len(parts) > 1:
+        parts = parts[1:]
+    name = re.sub(r'[^A-Za-z0-9_.-]+', '-', '-'.join(parts)) or "root"
+    query = urllib.parse.urlsplit(path).query
+    if query:
+        name += "-" + re.sub(r'[^A-Za-z0-9]+', '-', query)
+    return name + (".json" if "json" in content_type else ".html")
+
+class FixtureStore:
+    def __init__(self, directory):
+        self.directory = directory
+        self.index = {}
+        path = os.path.join(directory, INDEX_FILE)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.index = json.load(f)
+        # şablon -> ilk kaydedilen yol (bilinmeyen oyuncu ID'leri için)
+        self.templates = {}
+        for recorded in self.index:
+            self.templates.setdefault(template(recorded), recorded)
+
+    def save(self, path, status, content_type, body):
+        os.makedirs(self.directory, exist_ok=True)
+        name = fixture_name(path, content_type)
+        with open(os.path.join(self.directory, name), 'wb') as f:
+            f.write(body)
+        self.index[path] = {"file": name, "status": status, "content_type": content_type}
+        self.templates.setdefault(template(path), path)
+
+    def save_redirect(self, path, location):
+        self.index[path] = {"status": 302, "location": location}
+        self.templates.setdefault(template(path), path)
+
+    def flush(self):
+        with open(os.path.join(self.directory, INDEX_FILE), 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+    def lookup(self, path):
+        """Tam yol, sorgusuz yol, ardından şablon eşleşmesi; bulunamazsa None"""
+        entry = self.index.get(path) or self.index.get(path.split('?')[0])
+        if entry is None and template(path) in self.templates:
+            entry = self.index[self.templates[template(path)]]
+        if entry is None:
+            return None
+        if "location" in entry:
+            return entry["status"], "text/plain", b"", {"Location": entry["location"]}
+        with open(os.path.join(self.directory, entry["file"]), 'rb') as f:
+            return entry["status"], entry["content_type"], f.read(), {}
+
+async def record(directory, urls, searches):
+    import api
+
+    store = FixtureStore(directory)
+    upstream_get = api.UPSTREAM.get
+
+    async def recording_get(url, **kwargs):
+        response = await upstream_get(url, **kwargs)
+        path = response.url.raw_path.decode()
+        # Yönlendirmeler (ör. tek sonuçlu arama -> profil) aynı şekilde tekrar oynatılsın
+        for previous in response.history:
+            store.save_redirect(previous.url.raw_path.decode(), path)
+        store.save(path, response.status_code, response.headers.get("Content-Type", "text/html"), response.content)
+        print(f"{response.status_code} {path}")
+        return response
+
+    api.UPSTREAM.get = recording_get
+    try:
+        for name in searches:
+            await api.search_players(api.Fetcher(), name)
+        for url in urls:
+            if url.isdigit():
+                url = api.profile_url_for(url)
+            await api.scrape_player_profile_once(url, api.ALL_SECTIONS)
+            # CEAPI çalıştığında yedek sayfalar hiç istenmez; parser ölçümü için onları da kaydet
+            for extra in (url.replace('/profil/', '/marktwertverlauf/'), api.current_season_url(url)):
+                await recording_get(extra)
+    finally:
+        await api.UPSTREAM.close()
+        store.flush()
+    print(f"{len(store.index)} cevap kaydedildi: {directory}")
+
+def start_replay_server(directory, latency=0.0, port=0):
+    """Kayıtları arka plan thread'inde sun; ThreadingHTTPServer döner (server_port ile port okunur)"""
+    store = FixtureStore(directory)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            found = store.lookup(self.path)
+            status, content_type, body, headers = found if found else (404, "text/plain", b"not recorded", {})
+            if status == 200:
+                etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+                headers = dict(headers, ETag=etag)
+                if self.headers.get("If-None-Match") == etag:
+                    status, body = 304, b""
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    rec = commands.add_parser("record", help="Gerçek siteden cevapları kaydet")
+    rec.add_argument("directory")
+    rec.add_argument("urls", nargs="*", help="Profil URL'leri veya oyuncu ID'leri")
+    rec.add_argument("--search", action="append", default=[], help="Kaydedilecek arama sorgusu")
+    srv = commands.add_parser("serve", help="Kayıtları yerel HTTP sunucusu olarak sun")
+    srv.add_argument("directory")
+    srv.add_argument("--port", default=8765, type=int)
+    srv.add_argument("--latency", default=0.0, type=float, help="Her cevaba eklenen gecikme (saniye)")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        asyncio.run(record(args.directory, args.urls, args.search))
+    else:
+        server = start_replay_server(args.directory, args.latency, args.port)
+        print(f"http://127.0.0.1:{server.server_port} adresinde sunuluyor (TM_BASE_URL olarak verin)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,331 @@
+"""Sayfa extractor'larının bildirimsel şemaları: seçiciler, etiket haritaları ve dönüştürücüler.
+
+Extractor'lar soup'u elle dolaşmak yerine burada tanımlanan şemaları çalıştırır.
+Şemalar modül yüklenirken bir kez derlenir:
+
+- LabelMap: etiket metni ("Doğum tarihi:", "Date of birth:") -> (alan, dönüştürücü).
+  Kurallar tanım sırasıyla alt dize olarak denenir (ilk eşleşen kazanır); sonuç
+  etiket başına saklanır, yani bir etiket için kurallar süreç ömründe bir kez taranır.
+  Eşleşmeyen satırların değer hücresi hiç okunmaz.
+- Table: tablo seçicisi + en az hücre sayısı. Her satırın hücreleri bir kez bulunur,
+  metinleri (get_text) ilk istendiğinde bir kez çıkarılır; satır dönüştürücüleri bu
+  hazır listeleri okur.
+- Selectors: ad -> (etiket, class) seçicileri. Ağaç bir kez dolaşılıp class (ya da
+  class'sız seçiciler için etiket adı) -> etiketler dizini kurulur; her seçici sonra
+  find/find_all'ın tekrar tekrar ağacı taraması yerine bu dizinden okunur.
+- Hücre metinleri derlenmiş regex'lerle tek geçişte sınıflandırılır.
+
+Çıktılar eski elle yazılmış extractor'larla birebir aynıdır (bench.py extract karşılaştırır).
+"""
+import re
+
+from bs4.element import Tag
+
+_MISSING = object()
+
+def has_class(tag, class_):
+    return class_ in (tag.get('class') or ())
+
+def next_sibling(tag, name, class_):
+    """find_next_sibling(name, class_=class_) eşdeğeri, filtre nesnesi kurmadan"""
+    for sibling in tag.next_siblings:
+        if isinstance(sibling, Tag) and sibling.name == name and has_class(sibling, class_):
+            return sibling
+    return None
+
+def descendants(tag, name, class_=None):
+    """tag.find_all(name, class_=class_) eşdeğeri (belge sırasıyla), filtre nesnesi kurmadan"""
+    return [node for node in tag.descendants
+            if isinstance(node, Tag) and node.name == name and (class_ is None or has_class(node, class_))]
+
+def descendant(tag, name, class_=None):
+    """tag.find(name, class_=class_) eşdeğeri"""
+    for node in tag.descendants:
+        if isinstance(node, Tag) and node.name == name and (class_ is None or has_class(node, class_)):
+            return node
+    return None
+
+class Selectors:
+    """Ad -> (etiket adı, class ya da None) seçicileri; index(root) tek geçişte dizin kurar"""
+
+    def __init__(self, **selectors):
+        self.selectors = selectors
+        self.classes = {cls for _, cls in selectors.values() if cls}
+        self.names = {name for name, cls in selectors.values() if not cls}
+
+    def index(self, root):
+        return SelectorIndex(self, root)
+
+class SelectorIndex:
+    def __init__(self, selectors, root):
+        self.selectors = selectors.selectors
+        by_class = {cls: [] for cls in selectors.classes}
+        by_name = {name: [] for name in selectors.names}
+        for node in root.descendants:
+            if not isinstance(node, Tag):
+                continue
+            for cls in node.get('class') or ():
+                tags = by_class.get(cls)
+                # Aynı class'ı iki kez taşıyan etiket bir kez eklenir
+                if tags is not None and (not tags or tags[-1] is not node):
+                    tags.append(node)
+            tags = by_name.get(node.name)
+            if tags is not None:
+                tags.append(node)
+        self.by_class = by_class
+        self.by_name = by_name
+
+    def all(self, key, within=None):
+        """Seçiciye uyan etiketler (belge sırasıyla); within verilirse sadece onun içindekiler"""
+        name, cls = self.selectors[key]
+        if cls:
+            tags = [t for t in self.by_class[cls] if t.name == name]
+        else:
+            tags = self.by_name[name]
+        if within is not None:
+            tags = [t for t in tags if any(parent is within for parent in t.parents)]
+        return tags
+
+    def first(self, key, within=None):
+        tags = self.all(key, within)
+        return tags[0] if tags else None
+
+class LabelMap:
+    """Etiket -> alan kuralları. Kural: (alan, etiket alt dizeleri, dönüştürücü).
+
+    alan bir demetse dönüştürücü aynı uzunlukta bir demet döndürür; None olan değerler
+    ve None dönen dönüştürücüler alanı değiştirmez. Alanın mevcut değeri listeyse
+    dönüştürücünün sonucu sona eklenir.
+    """
+
+    def __init__(self, *rules, max_cached=4096):
+        self.rules = tuple((field, tuple(label.lower() for label in labels), convert)
+                           for field, labels, convert in rules)
+        self.max_cached = max_cached
+        self.cache = {}
+
+    def match(self, label):
+        rule = self.cache.get(label, _MISSING)
+        if rule is _MISSING:
+            rule = next((r for r in self.rules if any(l in label for l in r[1])), None)
+            if len(self.cache) < self.max_cached:
+                self.cache[label] = rule
+        return rule
+
+    def apply(self, data, rule, *args):
+        field, _, convert = rule
+        value = convert(*args)
+        if value is None:
+            return
+        if isinstance(field, tuple):
+            data.update((f, v) for f, v in zip(field, value) if v is not None)
+        elif isinstance(data.get(field), list):
+            data[field].extend(value)
+        else:
+            data[field] = value
+
+class Row:
+    __slots__ = ("cells", "_texts")
+
+    def __init__(self, cells):
+        self.cells = cells
+        self._texts = None
+
+    @property
+    def texts(self):
+        if self._texts is None:
+            self._texts = [cell.get_text(strip=True) for cell in self.cells]
+        return self._texts
+
+class Table:
+    """Seçiciye uyan tabloların satırlarını dönüştürücüden geçirir.
+
+    convert(row) bir kayıt ya da (satır atlanacaksa) None döndürür. first=True ise
+    sadece ilk tablo, first_nonempty=True ise kayıt çıkan ilk tablo okunur.
+    """
+
+    def __init__(self, convert, name="table", class_="items", part="tbody", min_cells=0,
+                 first=False, first_nonempty=False):
+        self.convert = convert
+        self.name = name
+        self.class_ = class_
+        self.part = part
+        self.min_cells = min_cells
+        self.first = first
+        self.first_nonempty = first_nonempty
+
+    def tables(self, soup):
+        if self.first:
+            table = descendant(soup, self.name, self.class_)
+            return [table] if table else []
+        return descendants(soup, self.name, self.class_)
+
+    def rows(self, container):
+        """container (tablo veya doğrudan tbody) içindeki yeterli hücreli satırlar"""
+        body = container if container.name == self.part else descendant(container, self.part)
+        if not body:
+            return
+        min_cells = self.min_cells
+        for tr in descendants(body, 'tr'):
+            cells = descendants(tr, 'td')
+            if len(cells) >= min_cells:
+                yield Row(cells)
+
+    def extract_rows(self, container):
+        convert = self.convert
+        return [record for record in map(convert, self.rows(container)) if record is not None]
+
+    def extract(self, soup):
+        extracted = []
+        for table in self.tables(soup):
+            extracted.extend(self.extract_rows(table))
+            if extracted and self.first_nonempty:
+                break
+        return extracted
+
+# Dönüştürücüler
+
+def text_value(text, tag):
+    return text
+
+def birth_date_value(text, tag):
+    """'25.02.2005 (20)' -> ('25.02.2005', '20')"""
+    age = AGE.search(text)
+    return AGE_SUFFIX.sub('', text).strip(), age.group(1) if age else None
+
+def height_value(text, tag):
+    return text.replace('\u00a0', ' ').strip()
+
+def social_links(text, tag):
+    return [{'platform': link.get('title', '-'), 'url': link.get('href', '-')} for link in descendants(tag, 'a')]
+
+def first_link_text(text, tag):
+    link = descendant(tag, 'a')
+    return link.get_text(strip=True) if link else None
+
+def caps_goals(text, tag):
+    links = descendants(tag, 'a')
+    if len(links) < 2:
+        return None
+    return links[0].get_text(strip=True), links[1].get_text(strip=True)
+
+AGE = re.compile(r'\((\d+)\)')
+AGE_SUFFIX = re.compile(r'\s*\(\d+\)\s*')
+SEASON = re.compile(r'\d{2}/\d{2}')
+YEAR = re.compile(r'\d{4}')
+NON_DIGIT = re.compile(r'[^\d]')
+
+# Profil sayfasında parse_profile_page'in okuduğu elemanlar
+PROFILE = Selectors(
+    header=("header", "data-header"),
+    headline=("h1", "data-header__headline-wrapper"),
+    shirt_number=("span", "data-header__shirt-number"),
+    image=("img", "data-header__profile-image"),
+    market_value_box=("div", "data-header__box--small"),
+    club_box=("div", "data-header__box--big"),
+    club=("span", "data-header__club"),
+    league=("span", "data-header__league"),
+    badges=("a", "data-header__success-data"),
+    header_labels=("li", "data-header__label"),
+    info_table=("div", "info-table"),
+    info_labels=("span", "info-table__content--regular"),
+    positions_box=("div", "detail-position"),
+    positions=("dd", "detail-position__position"),
+    headlines=("h2", None),
+    max_value=("div", "tm-market-value-development__max-value"),
+)
+YOUTH_HEADLINE = re.compile(r'Altyapı kariyeri|Youth clubs', re.IGNORECASE)
+WHITESPACE = re.compile(r'\s+')
+
+# Profil bilgi tablosu (span.info-table__content--regular etiketi -> yanındaki --bold değeri).
+# Etiketler ':' atılmış ve küçük harfe çevrilmiş olarak eşleştirilir.
+PROFILE_INFO = LabelMap(
+    ("full_name", ("tam adı", "doğum adı", "anavatandaki isim", "full name", "name in home country"), text_value),
+    (("birth_date", "age"), ("doğum tarihi", "date of birth"), birth_date_value),
+    ("birth_place", ("doğum yeri", "place of birth"), text_value),
+    ("height", ("boy",), height_value),
+    ("position", ("mevki",), text_value),
+    ("foot", ("ayak",), text_value),
+    ("nationality", ("uyruk",), text_value),
+    ("agent", ("temsilci", "agent"), text_value),
+    ("outfitter", ("donatıcı", "outfitter"), text_value),
+    ("contract_expires", ("sözleşme sonu", "contract expires"), text_value),
+    ("social_media", ("sosyal medya",), social_links),
+)
+
+# Profil başlığındaki milli takım satırları (li.data-header__label, küçük harfli metin)
+NATIONAL_TEAM = LabelMap(
+    ("name", ("milli oyuncu", "national team"), first_link_text),
+    (("matches", "goals"), ("milli maç/gol", "caps/goals"), caps_goals),
+)
+
+def team_stat(row):
+    """leistungsdatendetails/verein tablosu: logo | takım | ... sayısal (zentriert) hücreler"""
+    cells, texts = row.cells, row.texts
+    img = descendant(cells[0], 'img')
+    team_logo = img.get('src', '').replace('tiny', 'header') if img else ""
+    team_name = texts[1]
+    link = descendant(cells[1], 'a')
+    if link:
+        team_name = link.get_text(strip=True)
+    if not team_name and img:
+        team_name = img.get('alt', '')
+    if not team_name:
+        return None
+    # İlk 3 sayısal (veya '-') zentriert hücre: maç, gol, asist
+    numeric = [text.replace('-', '0') for cell, text in zip(cells, texts)
+               if (text == '-' or text.isdigit()) and 'zentriert' in (cell.get('class') or ())]
+    if len(numeric) < 3:
+        return None
+    return {"team": team_name, "team_logo": team_logo,
+            "appearances": numeric[0], "goals": numeric[1], "assists": numeric[2]}
+
+def competition_stat(row):
+    """Turnuva satırı: 0 logo, 1 ad, 2 maç, 3 gol, 4 asist ... son hücre dakika (toplam satırı hariç)"""
+    cells, texts = row.cells, row.texts
+    comp = texts[1]
+    if not comp:
+        link = descendant(cells[1], 'a')
+        if link:
+            comp = link.get_text(strip=True)
+    if not comp or comp.lower() in ('toplam', 'total'):
+        return None
+    apps = texts[2]
+    if apps == "-" or apps == "":
+        return None
+    return {"competition": comp, "appearances": apps, "goals": texts[3], "assists": texts[4],
+            "minutes": texts[-1].replace("'", "")}
+
+def injury(row):
+    """Sakatlık satırı: sezon (24/25), 'gün' içeren süre, ilk uzun metin (yıl içermeyen) ve
+    sondaki sayısal hücre (kaçırılan maç)"""
+    season = days = name = ""
+    texts = row.texts
+    for text in texts:
+        if SEASON.match(text):
+            season = text
+        elif 'gün' in text.lower():
+            days = text
+        elif not name and len(text) > 5 and not YEAR.search(text):
+            name = text
+    if not name:
+        return None
+    missed = next((text for text in reversed(texts) if text.isdigit()), "")
+    return {"season": season or "-", "injury": name, "days": days or "-", "matches_missed": missed or "-"}
+
+TEAM_STATS = Table(team_stat, min_cells=5, first_nonempty=True)
+COMPETITION_STATS = Table(competition_stat, min_cells=6)
+INJURIES = Table(injury, min_cells=4, first=True)
+
+def career_total(soup):
+    """leistungsdatendetails tfoot satırı: 4 maç, 5 gol, 6 asist"""
+    table = descendant(soup, 'table', 'items')
+    foot = descendant(table, 'tfoot') if table else None
+    if not foot:
+        return None
+    cells = descendants(foot, 'td')
+    if len(cells) < 7:
+        return None
+    return {"appearances": NON_DIGIT.sub('', cells[4].get_text(strip=True)),
+            "goals": NON_DIGIT.sub('', cells[5].get_text(strip=True)),
+            "assists": NON_DIGIT.sub('', cells[6].get_text(strip=True))}
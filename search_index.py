@@ -0,0 +1,241 @@
+"""Daha önce görülen oyuncular için bellek içi isim arama indeksi.
+
+Her arama sonucu ve kazınan her profil buraya eklenir. Sorgular eklentideki
+normalizeText ile aynı şekilde normalize edilir (Türkçe küçük harf, NFD ile
+aksan silme, noktalama silme); ayrıca ı -> i katlanır ki "kirim" "Kırım"ı bulsun.
+
+- Önek araması: sorgudaki her kelime isim veya kulüp kelimelerinden birinin başı olmalı;
+  skor sorgunun ismi ne kadar kapsadığıdır, sadece kulüple eşleşen kelimeler skora katılmaz
+- Trigram araması: yazım hatalı sorgular için isim trigramları üzerinde Dice benzerliği
+- ID araması: sadece rakamdan oluşan sorgu doğrudan player_id ile eşleşir
+
+Oyuncular ve upstream'den cevaplanmış sorgular LRU sırasıyla tutulur; sınır aşılınca
+en uzun süredir kullanılmayanlar atılır. Cevaplanmış sorgular ayrıca query_ttl
+(arama önbelleğinin TTL'i) sonunda düşer, böylece o sorgu yeniden upstream'e gider.
+
+rank_results ise upstream'den (ve yerel indeksten) gelen birleşik sonuçları aynı
+normalizasyonla sorguya göre puanlar: isim kelimesi önek kapsaması, isim trigram
+benzerliği ve isimde geçmeyen kelimelerin kulüp adıyla eşleşmesi.
+"""
+import bisect
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+
+_PUNCT = re.compile(r"[^\w\s]")
+_TURKISH_UPPER = str.maketrans({"I": "ı", "İ": "i"})
+
+def normalize_text(text):
+    text = (text or "").translate(_TURKISH_UPPER).lower()
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _PUNCT.sub("", text.replace("ı", "i"))
+    return " ".join(text.split())
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SearchIndex:
+    def __init__(self, max_entries=50000, max_queries=10000, query_ttl=3600):
+        self.max_entries = max_entries
+        self.max_queries = max_queries
+        self.query_ttl = query_ttl
+        # url -> arama sonucu sözlüğü (name, url, image_url, club), LRU sırasıyla
+        self.entries = OrderedDict()
+        self.by_id = {}
+        # kelime -> url kümesi; önek araması için kelimeler ayrıca sıralı listede tutulur
+        self.tokens = {}
+        self.sorted_tokens = []
+        self.grams = {}
+        # daha önce upstream'den cevaplanan normalize sorgu -> (geçerlilik sonu, sonuç url'leri), LRU sırasıyla
+        self.queries = OrderedDict()
+        self.counters = {"lookups": 0, "hits": 0, "evictions": 0, "expired_queries": 0}
+
+    def add(self, result, player_id=None):
+        """Bir arama sonucunu ya da profil özetini ekle/güncelle"""
+        url = result.get("url")
+        name = result.get("name")
+        if not url or not name or name == "-":
+            return
+        old = self.entries.get(url)
+        # "Direkt Sonuç" arama sayfasının yer tutucusu, gerçek kulüp bilgisini ezmesin
+        entry = dict(old or {}, **{k: v for k, v in result.items() if v not in (None, "", "-", "Direkt Sonuç")})
+        entry.setdefault("club", "-")
+        entry.setdefault("image_url", "")
+        if old:
+            self._unindex(url, old)
+        self.entries[url] = entry
+        self.entries.move_to_end(url)
+        player_id = player_id or _player_id(url)
+        if player_id:
+            entry["_id"] = str(player_id)
+            self.by_id[entry["_id"]] = url
+        entry["_name"] = normalize_text(entry["name"])
+        for token in set(entry["_name"].split()) | set(normalize_text(entry["club"]).split()):
+            urls = self.tokens.get(token)
+            if urls is None:
+                urls = self.tokens[token] = set()
+                bisect.insort(self.sorted_tokens, token)
+            urls.add(url)
+        for gram in trigrams(entry["_name"]):
+            self.grams.setdefault(gram, set()).add(url)
+        while len(self.entries) > self.max_entries:
+            self._evict()
+
+    def add_results(self, query, results):
+        for result in results:
+            self.add(result)
+        key = normalize_text(query)
+        if key and results and self.query_ttl > 0:
+            self.queries[key] = (time.time() + self.query_ttl,
+                                 [r["url"] for r in results if r.get("url") in self.entries])
+            self.queries.move_to_end(key)
+            while len(self.queries) > self.max_queries:
+                self.queries.popitem(last=False)
+
+    def lookup(self, query, limit=20):
+        """[(skor, sonuç)] listesini yüksek skordan düşüğe döner"""
+        self.counters["lookups"] += 1
+        q = normalize_text(query)
+        if not q:
+            return []
+        scored = {}
+        if q.isdigit() and q in self.by_id:
+            scored[self.by_id[q]] = 1.0
+        for url in self._answered(q):
+            scored[url] = max(scored.get(url, 0.0), 1.0)
+        for url, score in self._prefix(q).items():
+            scored[url] = max(scored.get(url, 0.0), score)
+        if not scored:
+            scored = self._fuzzy(q)
+        ranked = sorted(scored.items(), key=lambda kv: (-kv[1], self.entries[kv[0]]["name"]))[:limit]
+        if ranked:
+            self.counters["hits"] += 1
+        for url, _ in ranked:
+            self.entries.move_to_end(url)
+        return [(round(score, 4), self.public(url)) for url, score in ranked]
+
+    def public(self, url):
+        return {k: v for k, v in self.entries[url].items() if not k.startswith("_")}
+
+    def stats(self):
+        return dict(self.counters, entries=len(self.entries), tokens=len(self.tokens),
+                    trigrams=len(self.grams), queries=len(self.queries))
+
+    def _answered(self, q):
+        """Sorgu süresi dolmadan upstream'den cevaplandıysa hâlâ indeksteki sonuç url'leri"""
+        answered = self.queries.get(q)
+        if answered is None:
+            return ()
+        if answered[0] <= time.time():
+            del self.queries[q]
+            self.counters["expired_queries"] += 1
+            return ()
+        self.queries.move_to_end(q)
+        return [url for url in answered[1] if url in self.entries]
+
+    def _evict(self):
+        url, entry = self.entries.popitem(last=False)
+        self._unindex(url, entry)
+        if self.by_id.get(entry.get("_id")) == url:
+            del self.by_id[entry["_id"]]
+        self.counters["evictions"] += 1
+
+    def _prefix(self, q):
+        """Her sorgu kelimesi bir isim ya da kulüp kelimesinin öneki olmalı. Skor, sorgu
+        kelimelerinin ismin harflerinden ne kadarını kapsadığıyla artar; isimde karşılığı
+        olmayan (sadece kulüple eşleşen) kelime varsa skor 0.5'in altında kalır."""
+        words = q.split()
+        matched = None
+        for word in words:
+            urls = set()
+            i = bisect.bisect_left(self.sorted_tokens, word)
+            while i < len(self.sorted_tokens) and self.sorted_tokens[i].startswith(word):
+                urls |= self.tokens[self.sorted_tokens[i]]
+                i += 1
+            matched = urls if matched is None else matched & urls
+            if not matched:
+                return {}
+        scores = {}
+        for url in matched:
+            name = self.entries[url]["_name"]
+            if name == q:
+                scores[url] = 1.0
+                continue
+            remaining = name.split()
+            size = sum(map(len, remaining)) or 1
+            covered, club_only = 0, False
+            # Uzun kelimeler önce: her isim kelimesi en fazla bir sorgu kelimesiyle kapsanır
+            for word in sorted(words, key=len, reverse=True):
+                token = next((t for t in remaining if t.startswith(word)), None)
+                if token is None:
+                    club_only = True
+                    continue
+                remaining.remove(token)
+                covered += len(word)
+            scores[url] = 0.5 * covered / size + (0.0 if club_only else 0.5)
+        return scores
+
+    def _fuzzy(self, q):
+        grams = trigrams(q)
+        overlap = {}
+        for gram in grams:
+            for url in self.grams.get(gram, ()):
+                overlap[url] = overlap.get(url, 0) + 1
+        scores = {}
+        for url, shared in overlap.items():
+            other = len(trigrams(self.entries[url]["_name"]))
+            scores[url] = 2 * shared / (len(grams) + other)
+        return scores
+
+    def _unindex(self, url, entry):
+        for token in set(entry["_name"].split()) | set(normalize_text(entry["club"]).split()):
+            urls = self.tokens.get(token)
+            if urls is None:
+                continue
+            urls.discard(url)
+            if not urls:
+                del self.tokens[token]
+                del self.sorted_tokens[bisect.bisect_left(self.sorted_tokens, token)]
+        for gram in trigrams(entry["_name"]):
+            urls = self.grams.get(gram)
+            if urls is not None:
+                urls.discard(url)
+                if not urls:
+                    del self.grams[gram]
+
+def relevance(query, result):
+    """Sonucun sorguya uygunluğu (0-1)"""
+    q = normalize_text(query)
+    name = normalize_text(result.get("name"))
+    if not q or not name:
+        return 0.0
+    if name == q:
+        return 1.0
+    name_tokens = name.split()
+    club_tokens = normalize_text(result.get("club")).split()
+    in_name = [t for t in q.split() if any(n.startswith(t) for n in name_tokens)]
+    rest = [t for t in q.split() if t not in in_name]
+    in_club = [t for t in rest if any(c.startswith(t) for c in club_tokens)]
+    total = len(q.split())
+    q_grams, name_grams = trigrams(q), trigrams(name)
+    dice = 2 * len(q_grams & name_grams) / (len(q_grams) + len(name_grams))
+    return round(min(0.99, 0.6 * len(in_name) / total + 0.3 * dice + 0.25 * len(in_club) / total), 4)
+
+def rank_results(query, results, limit=20, min_score=0.0):
+    """Sonuçları URL'ye göre tekilleştirip uygunluğa göre sırala; score alanı eklenmiş dict'ler.
+    Eşit skorlarda gelen sıra korunur. min_score altındakiler, hepsi altında kalmıyorsa atılır."""
+    seen = {}
+    for result in results:
+        url = result.get("url")
+        if url and url not in seen:
+            seen[url] = result
+    scored = sorted(((relevance(query, r), i, r) for i, r in enumerate(seen.values())), key=lambda x: (-x[0], x[1]))
+    kept = [x for x in scored if x[0] >= min_score] or scored
+    return [dict(r, score=score) for score, _, r in kept[:limit]]
+
+def _player_id(url):
+    match = re.search(r"/spieler/(\d+)", url)
+    return match.group(1) if match else None
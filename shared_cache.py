@@ -0,0 +1,204 @@
+"""Aynı makinedeki tüm uvicorn worker'larının ortak kullandığı önbellek katmanı (SQLite, WAL).
+
+TieredCache'in bellek LRU'su her süreçte ayrı kalır; onun arkasında bu katman
+durur. Bir worker'ın kazıdığı bölüm buraya yazılır, diğer worker'lar bellekte
+bulamadıklarında buradan okur. Her kayıt tek satırdır (INSERT OR REPLACE), yani
+okuyucular yarım yazılmış kayıt görmez. Toplam boyut max_bytes'ı aşınca süresi
+en erken dolan kayıtlardan başlanarak silinir.
+
+Ayrıca:
+- leases: süreçler arası single-flight. Bir anahtarı ilk alan süreç işi yapar,
+  diğerleri kira bırakılana (ya da süresi dolana) kadar bekler ve sonra sonucu
+  ortak önbellekten okur.
+- invalidations: bir worker'da silinen oyuncu bölümlerinin diğer worker'ların
+  bellek katmanından da düşürülmesi için sıra numaralı kayıt.
+
+Event loop'u bloklamamak için yazmalar (kayıt, silme, kira) tek bir yazıcı thread'inde
+kendi bağlantısıyla yapılır; kayıt ve silme beklenmez. Okumalar WAL'da yazıcıyı
+beklemez, kilitli bir durumda da en fazla busy_timeout kadar bekleyip ıska sayılır.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from models import dumps
+from sqlite_writer import SQLiteWriter
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS entries (
+        resource TEXT NOT NULL,
+        key TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        value BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        PRIMARY KEY (resource, key)
+    )""",
+    "CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires_at)",
+    """CREATE TABLE IF NOT EXISTS leases (
+        name TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS invalidations (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        player_id TEXT NOT NULL,
+        at REAL NOT NULL
+    )""",
+)
+
+class SharedCache:
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, evict_every=50, busy_timeout=0.05, write_timeout=10):
+        self.path = path
+        self.max_bytes = max_bytes
+        # Boyut kontrolü (SUM) her yazmada değil, bu kadar yazmada bir yapılır
+        self.evict_every = evict_every
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        # Event loop'tan kullanılan okuma bağlantısı: kilitte kısa bekler
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=write_timeout)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        self.conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+        self.lock = threading.Lock()
+        self.writer = SQLiteWriter(path, "tm-shared-cache", timeout=write_timeout)
+        self.write_conn = self.writer.conn
+        self.writes = 0
+        # Silinmesi yazıcı kuyruğunda bekleyen (resource, key)'ler; bu süreç onları eski değerle okumasın
+        self.deleting = set()
+        self.counters = {"hits": 0, "misses": 0, "busy": 0, "writes": 0, "evictions": 0,
+                         "leases_acquired": 0, "leases_renewed": 0}
+
+    def run(self, fn, *args):
+        """fn(*args)'ı yazıcı thread'inde çalıştır (await edilebilir)"""
+        return self.writer.run(fn, *args)
+
+    def submit(self, fn, *args):
+        """fn(*args)'ı yazıcı thread'inde beklemeden çalıştır; hata loglanır"""
+        self.writer.submit(fn, *args)
+
+    def _read(self, query, params):
+        """Okuma; kilit busy_timeout içinde açılmazsa None (ıska sayılır)"""
+        try:
+            with self.lock:
+                return self.conn.execute(query, params).fetchall()
+        except sqlite3.OperationalError:
+            self.counters["busy"] += 1
+            return None
+
+    def get(self, resource, key):
+        """(expires_at, JSON değeri) ya da None"""
+        if (resource, str(key)) in self.deleting:
+            self.counters["misses"] += 1
+            return None
+        rows = self._read("SELECT expires_at, value FROM entries WHERE resource = ? AND key = ?",
+                          (resource, str(key)))
+        if not rows:
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        return rows[0][0], json.loads(rows[0][1])
+
+    def set(self, resource, key, expires_at, value):
+        """Kaydı yazıcı thread'ine bırak (beklenmez)"""
+        self.submit(self._set, resource, str(key), expires_at, dumps(value))
+
+    def _set(self, resource, key, expires_at, blob):
+        self.write_conn.execute(
+            "INSERT OR REPLACE INTO entries (resource, key, expires_at, value, size) VALUES (?, ?, ?, ?, ?)",
+            (resource, key, expires_at, blob, len(blob)))
+        self.writes += 1
+        self.counters["writes"] += 1
+        if self.writes % self.evict_every == 0:
+            self._evict()
+
+    def _evict(self):
+        total = self.write_conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Süresi en erken dolanlardan başlayarak %90'ın altına inene kadar sil
+        excess = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for resource, key, size in self.write_conn.execute("SELECT resource, key, size FROM entries ORDER BY expires_at"):
+            victims.append((resource, key))
+            freed += size
+            if freed >= excess:
+                break
+        self.write_conn.executemany("DELETE FROM entries WHERE resource = ? AND key = ?", victims)
+        self.counters["evictions"] += len(victims)
+
+    def delete_player(self, player_id, resources):
+        """Oyuncunun bölümlerini sil (beklenmez); silinecek kayıt sayısı"""
+        keys = [(r, str(player_id)) for r in resources]
+        rows = self._read(f"SELECT COUNT(*) FROM entries WHERE key = ? AND resource IN ({','.join('?' * len(keys))})",
+                          (str(player_id), *resources))
+        self.deleting.update(keys)
+        self.submit(self._delete_player, keys)
+        return rows[0][0] if rows else 0
+
+    def _delete_player(self, keys):
+        try:
+            self.write_conn.executemany("DELETE FROM entries WHERE resource = ? AND key = ?", keys)
+            now = time.time()
+            self.write_conn.execute("INSERT INTO invalidations (player_id, at) VALUES (?, ?)", (keys[0][1], now))
+            self.write_conn.execute("DELETE FROM invalidations WHERE at < ?", (now - 3600,))
+        finally:
+            self.deleting.difference_update(keys)
+
+    def invalidations_since(self, seq):
+        """seq'den sonraki (seq, player_id) kayıtları"""
+        return self._read("SELECT seq, player_id FROM invalidations WHERE seq > ? ORDER BY seq", (seq,)) or []
+
+    def last_invalidation(self):
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM invalidations").fetchone()[0]
+
+    def clear(self):
+        self.submit(self.write_conn.execute, "DELETE FROM entries")
+
+    # Süreçler arası single-flight kiraları. acquire/renew/release yazıcı thread'inde çalışır:
+    # event loop'tan run() ile beklenir ya da submit() ile bırakılır.
+    def acquire(self, name, ttl):
+        """Kirayı bu süreç adına al; başka bir süreçte süresi dolmamış kira varsa False"""
+        now = time.time()
+        cursor = self.write_conn.execute(
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at < ?",
+            (name, self.owner, now + ttl, now))
+        if cursor.rowcount:
+            self.counters["leases_acquired"] += 1
+            return True
+        return False
+
+    def renew(self, name, ttl):
+        """Bu sürecin tuttuğu kiranın süresini uzat; kira artık bizde değilse False"""
+        cursor = self.write_conn.execute("UPDATE leases SET expires_at = ? WHERE name = ? AND owner = ?",
+                                         (time.time() + ttl, name, self.owner))
+        if cursor.rowcount:
+            self.counters["leases_renewed"] += 1
+            return True
+        return False
+
+    def held_elsewhere(self, name):
+        rows = self._read("SELECT owner, expires_at FROM leases WHERE name = ?", (name,))
+        return bool(rows) and rows[0][0] != self.owner and rows[0][1] > time.time()
+
+    def release(self, name):
+        self.write_conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, self.owner))
+
+    def stats(self):
+        with self.lock:
+            entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            leases = self.conn.execute("SELECT COUNT(*) FROM leases WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+        return dict(self.counters, path=self.path, entries=entries, bytes=size, max_bytes=self.max_bytes,
+                    active_leases=leases, write_errors=self.writer.counters["errors"])
+
+    def close(self):
+        self.writer.close()
+        with self.lock:
+            self.conn.close()
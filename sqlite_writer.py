@@ -0,0 +1,46 @@
+"""SQLite yazmalarını event loop dışında, tek bir thread'de sırayla çalıştıran yardımcı.
+
+Depolar (store, crawl, watchlist, shared_cache) okumalarını kendi bağlantılarıyla
+yapar; commit eden yazmalar ise buradaki ayrı bağlantı üzerinden yazıcı thread'inde
+çalışır. Tek thread olduğundan yazmalar verildiği sırayla uygulanır ve bağlantı için
+kilit gerekmez. WAL modunda okumalar yazıcıyı beklemez.
+
+    writer.submit(fn, *args)      # beklenmez, hata loglanır
+    await writer.run(fn, *args)   # sonucu event loop'tan beklenir
+"""
+import asyncio
+import functools
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+class SQLiteWriter:
+    def __init__(self, path, name, timeout=10):
+        self.name = name
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        # Sadece yazıcı thread'inden kullanılır
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=timeout)
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.counters = {"writes": 0, "errors": 0}
+
+    def run(self, fn, *args):
+        """fn(*args)'ı yazıcı thread'inde çalıştır; dönen future event loop'tan await edilir"""
+        return asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(self._count, fn, *args))
+
+    def submit(self, fn, *args):
+        """fn(*args)'ı yazıcı thread'inde beklemeden çalıştır; hata olursa loglanır"""
+        self.executor.submit(self._logged, fn, *args)
+
+    def _count(self, fn, *args):
+        self.counters["writes"] += 1
+        return fn(*args)
+
+    def _logged(self, fn, *args):
+        try:
+            self._count(fn, *args)
+        except sqlite3.Error as e:
+            self.counters["errors"] += 1
+            print(f"{self.name} write error: {e}")
+
+    def close(self):
+        self.executor.submit(self.conn.close)
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,97 @@
+"""Oyuncu bölümleri için kalıcı SQLite deposu (WAL modunda).
+
+Her satır bir oyuncunun bir bölümüdür (profile, performance, injuries,
+market_value, transfers): JSON verisi, indirilme zamanı, indirildiği andaki
+değişim sinyali ve en son güncel olduğunun doğrulandığı zaman ile saklanır. Süreç
+yeniden başladığında önbellek buradan ısınır (TTL doğrulama zamanından sayılır);
+ağır bölümler ise sinyal (piyasa değeri güncelleme tarihi + CEAPI grafiği)
+değişmediği sürece, indirilme zamanından itibaren en fazla belirli bir yaşa kadar
+yeniden indirilmeden kullanılmaya devam eder.
+
+Okumalar event loop'tan doğrudan yapılır (WAL'da yazmayı beklemez); yazmalar
+SQLiteWriter'ın thread'inde sırayla çalışır, put/touch beklenmez.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+from models import dumps
+from sqlite_writer import SQLiteWriter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    player_id TEXT NOT NULL,
+    section TEXT NOT NULL,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    signal TEXT,
+    checked_at REAL,
+    PRIMARY KEY (player_id, section)
+)
+"""
+
+class PlayerStore:
+    def __init__(self, path):
+        self.path = path
+        # Okuma bağlantısı; aynı bağlantı parse thread'lerinden de kullanılabilsin diye kilitle sıralanır
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(sections)")}
+        if "checked_at" not in columns:
+            # Eski depolar: doğrulama zamanı yoksa indirilme zamanı kullanılır
+            self.conn.execute("ALTER TABLE sections ADD COLUMN checked_at REAL")
+        self.lock = threading.Lock()
+        self.writer = SQLiteWriter(path, "tm-store")
+        self.counters = {"reads": 0, "hits": 0, "writes": 0, "unchanged": 0}
+
+    def get(self, player_id, section):
+        """(veri, fetched_at, signal, checked_at) ya da None"""
+        self.counters["reads"] += 1
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data, fetched_at, signal, COALESCE(checked_at, fetched_at) FROM sections "
+                "WHERE player_id = ? AND section = ?",
+                (str(player_id), section)).fetchone()
+        if row is None:
+            return None
+        self.counters["hits"] += 1
+        return json.loads(row[0]), row[1], row[2], row[3]
+
+    def put(self, player_id, section, data, signal=None):
+        """Bölümü yaz (beklenmez)"""
+        self.counters["writes"] += 1
+        now = time.time()
+        self.writer.submit(
+            self.writer.conn.execute,
+            "INSERT OR REPLACE INTO sections (player_id, section, data, fetched_at, signal, checked_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (str(player_id), section, dumps(data).decode(), now, signal, now))
+
+    def touch(self, player_id, section):
+        """Sinyal değişmediği için yeniden indirilmeyen bölümün doğrulama zamanını tazele.
+        fetched_at değişmez: en fazla yaş sınırı ilk indirilmeden itibaren sayılır."""
+        self.counters["unchanged"] += 1
+        self.writer.submit(self.writer.conn.execute,
+                           "UPDATE sections SET checked_at = ? WHERE player_id = ? AND section = ?",
+                           (time.time(), str(player_id), section))
+
+    async def delete_player(self, player_id):
+        """Oyuncunun bölümlerini sil; kuyruktaki yazmalardan sonra çalışır. Silinen satır sayısı"""
+        cursor = await self.writer.run(self.writer.conn.execute, "DELETE FROM sections WHERE player_id = ?",
+                                       (str(player_id),))
+        return cursor.rowcount
+
+    def stats(self):
+        with self.lock:
+            players, rows = self.conn.execute(
+                "SELECT COUNT(DISTINCT player_id), COUNT(*) FROM sections").fetchone()
+        return dict(self.counters, path=self.path, players=players, sections=rows,
+                    write_errors=self.writer.counters["errors"])
+
+    def close(self):
+        self.writer.close()
+        with self.lock:
+            self.conn.close()
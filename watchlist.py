@@ -0,0 +1,417 @@
+"""Piyasa değeri izleme listesi: sadece CEAPI grafiğini yoklayan hafif poller.
+
+İzlenen her oyuncu için tam profil (7 sayfa) yerine tek bir istek atılır:
+/ceapi/marketValueDevelopment/graph/{id}. Gelen seri saklanan seriyle
+karşılaştırılır; değiştiyse olay (market_value_changed) yazılır. Karşılaştırma her
+zaman seri özetiyle yapılır: koşullu istekte 304 gelse bile saklanan gövde ayrıştırılır,
+çünkü doğrulayıcılar /player ile ortaktır ve seri arada orada güncellenmiş olabilir.
+
+Zamanlama SQLite'ta (WAL) tutulur: her oyuncunun bir sonraki yoklama zamanı
+(next_at) vardır, süresi gelenler tek UPDATE ... RETURNING ile alınır (aynı
+veritabanını kullanan birden fazla worker aynı oyuncuyu yoklamaz). Bir sonraki
+zaman interval * (1 ± jitter) ile seçilir, böylece aynı anda eklenen binlerce
+oyuncu zamanla dağılır ve istekler hız sınırının altında düzgün akar. Verim
+RateGovernor'un izin verdiği hızla (TM_RATE) sınırlıdır.
+
+Olaylar sıra numarasıyla (seq) saklanır ve üç yoldan okunur: uzun yoklama
+(since=seq), SSE akışı (Last-Event-ID ile kaldığı yerden) ve webhook. Webhook
+gönderimi tek bir süreçte (kira) yapılır; imleç teslim edilen son seq'te durur,
+hata olursa aynı olaylar geri çekilerek yeniden gönderilir.
+
+WatchStore'a yazan metotlar async'tir ve SQLiteWriter thread'inde sırayla çalışır;
+okumalar event loop'tan doğrudan yapılır (WAL'da yazmayı beklemez).
+"""
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+import httpx
+
+from models import MarketValueHistory, dumps
+from sqlite_writer import SQLiteWriter
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS watches (
+        player_id TEXT PRIMARY KEY,
+        interval REAL NOT NULL,
+        next_at REAL NOT NULL,
+        checked_at REAL,
+        changed_at REAL,
+        digest TEXT,
+        series TEXT,
+        failures INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        added_at REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS watches_next ON watches (next_at)",
+    """CREATE TABLE IF NOT EXISTS events (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        player_id TEXT NOT NULL,
+        at REAL NOT NULL,
+        payload TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS cursors (
+        name TEXT PRIMARY KEY,
+        seq INTEGER NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS leases (
+        name TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )""",
+)
+
+def series_key(point):
+    return point.get("date_iso") or point.get("date")
+
+def brief(point):
+    if point is None:
+        return None
+    return {"date": point.get("date"), "date_iso": point.get("date_iso"), "value": point.get("value"),
+            "value_eur": point.get("value_eur"), "club": point.get("club")}
+
+def diff_series(old, new):
+    """İki piyasa değeri serisinin farkı (tarihe göre): eklenen, değişen ve silinen noktalar"""
+    before = {series_key(p): p for p in old}
+    after = {series_key(p): p for p in new}
+    added = [brief(p) for k, p in after.items() if k not in before]
+    removed = [brief(p) for k, p in before.items() if k not in after]
+    changed = [{"date_iso": k, "date": p.get("date"), "from": before[k].get("value"), "to": p.get("value"),
+                "from_eur": before[k].get("value_eur"), "to_eur": p.get("value_eur")}
+               for k, p in after.items()
+               if k in before and (p.get("value_eur"), p.get("value")) != (before[k].get("value_eur"), before[k].get("value"))]
+    return {"added": added, "changed": changed, "removed": removed}
+
+class WatchStore:
+    def __init__(self, path):
+        self.path = path
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        self.lock = threading.Lock()
+        # Yazmalar ayrı bağlantıyla yazıcı thread'inde
+        self.writer = SQLiteWriter(path, "tm-watchlist")
+
+    def execute(self, query, params=()):
+        """Tek yazma sorgusunu yazıcı thread'inde çalıştır (await edilir); cursor döner"""
+        return self.writer.run(self.writer.conn.execute, query, params)
+
+    async def add(self, player_ids, interval, max_total=None):
+        """Oyuncuları izlemeye al (varsa aralığı güncellenir); yeni eklenen sayı.
+        max_total verilirse toplam izlenen oyuncu sayısı bunu aşacaksa hiçbiri eklenmez (ValueError)."""
+        ids = list(dict.fromkeys(str(pid) for pid in player_ids))
+        return await self.writer.run(self._add, ids, interval, max_total)
+
+    def _add(self, ids, interval, max_total):
+        now = time.time()
+        conn = self.writer.conn
+        # Sayım ve ekleme tek yazma işleminde: aynı veritabanını kullanan worker'lar sınırı birlikte aşamaz
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.execute("SELECT COUNT(*) FROM watches").fetchone()[0]
+            existing = conn.execute("SELECT COUNT(*) FROM watches WHERE player_id IN "
+                                    "(SELECT value FROM json_each(?))", (json.dumps(ids),)).fetchone()[0]
+            added = len(ids) - existing
+            if max_total is not None and added and before + added > max_total:
+                raise ValueError(f"En fazla {max_total} oyuncu izlenebilir ({before} izleniyor, {added} yeni)")
+            conn.executemany(
+                "INSERT INTO watches (player_id, interval, next_at, added_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (player_id) DO UPDATE SET interval = excluded.interval",
+                [(pid, interval, now, now) for pid in ids])
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return added
+
+    async def remove(self, player_id):
+        return (await self.execute("DELETE FROM watches WHERE player_id = ?", (str(player_id),))).rowcount
+
+    async def claim(self, now, limit, lease):
+        """Süresi gelen en fazla limit oyuncuyu al; next_at lease kadar ileri atılır ki
+        yoklama bitmeden (veya süreç ölürse) tekrar alınmasın.
+        (player_id, interval, digest, series, failures) listesi"""
+        rows = await self.writer.run(self._claim, now, limit, lease)
+        return [(pid, interval, digest, json.loads(series) if series else None, failures)
+                for pid, interval, digest, series, failures in rows]
+
+    def _claim(self, now, limit, lease):
+        # RETURNING satırları da yazıcı thread'inde okunur: ifade ancak sonuna kadar okununca tamamlanır
+        return self.writer.conn.execute(
+            "UPDATE watches SET next_at = ? WHERE player_id IN ("
+            "SELECT player_id FROM watches WHERE next_at <= ? ORDER BY next_at LIMIT ?) "
+            "RETURNING player_id, interval, digest, series, failures", (now + lease, now, limit)).fetchall()
+
+    def next_due(self):
+        with self.lock:
+            return self.conn.execute("SELECT MIN(next_at) FROM watches").fetchone()[0]
+
+    async def checked(self, player_id, next_at, digest=None, series=None):
+        """Başarılı yoklama; seri verilirse (değişti) saklanan seri güncellenir"""
+        now = time.time()
+        if series is None:
+            await self.execute("UPDATE watches SET next_at = ?, checked_at = ?, failures = 0, error = NULL "
+                               "WHERE player_id = ?", (next_at, now, player_id))
+        else:
+            await self.execute(
+                "UPDATE watches SET next_at = ?, checked_at = ?, failures = 0, error = NULL, digest = ?, series = ?, "
+                "changed_at = CASE WHEN digest IS NULL THEN changed_at ELSE ? END WHERE player_id = ?",
+                (next_at, now, digest, dumps(series).decode(), now, player_id))
+
+    async def failed(self, player_id, next_at, error):
+        await self.execute("UPDATE watches SET next_at = ?, failures = failures + 1, error = ? WHERE player_id = ?",
+                           (next_at, str(error)[:500], player_id))
+
+    async def add_event(self, player_id, payload):
+        now = time.time()
+        cursor = await self.execute("INSERT INTO events (player_id, at, payload) VALUES (?, ?, ?)",
+                                    (player_id, now, dumps(payload).decode()))
+        return dict(payload, seq=cursor.lastrowid, at=now)
+
+    def events_since(self, seq, limit=100, player_id=None):
+        query = "SELECT seq, at, payload FROM events WHERE seq > ?"
+        params = [seq]
+        if player_id is not None:
+            query += " AND player_id = ?"
+            params.append(str(player_id))
+        with self.lock:
+            rows = self.conn.execute(query + " ORDER BY seq LIMIT ?", (*params, limit)).fetchall()
+        return [dict(json.loads(payload), seq=seq, at=at) for seq, at, payload in rows]
+
+    def last_seq(self):
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+
+    async def prune_events(self, max_age):
+        await self.execute("DELETE FROM events WHERE at < ?", (time.time() - max_age,))
+
+    def cursor(self, name):
+        with self.lock:
+            row = self.conn.execute("SELECT seq FROM cursors WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    async def set_cursor(self, name, seq):
+        await self.execute("INSERT OR REPLACE INTO cursors (name, seq) VALUES (?, ?)", (name, seq))
+
+    async def acquire(self, name, ttl):
+        """Kirayı bu süreç adına al/uzat; başka süreçte süresi dolmamış kira varsa False"""
+        now = time.time()
+        cursor = await self.execute(
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at < ? OR leases.owner = excluded.owner",
+            (name, self.owner, now + ttl, now))
+        return cursor.rowcount > 0
+
+    async def release(self, name):
+        await self.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, self.owner))
+
+    def watches(self, limit=100, offset=0):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT player_id, interval, next_at, checked_at, changed_at, digest, series, failures, error, added_at "
+                "FROM watches ORDER BY added_at, player_id LIMIT ? OFFSET ?", (limit, offset)).fetchall()
+        result = []
+        for pid, interval, next_at, checked_at, changed_at, digest, series, failures, error, added_at in rows:
+            points = json.loads(series) if series else []
+            result.append({"player_id": pid, "interval": interval, "next_at": next_at, "checked_at": checked_at,
+                           "changed_at": changed_at, "points": len(points), "latest": brief(points[-1]) if points else None,
+                           "failures": failures, "error": error, "added_at": added_at})
+        return result
+
+    def stats(self):
+        now = time.time()
+        with self.lock:
+            total, due, failing = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(next_at <= ?), 0), COALESCE(SUM(failures > 0), 0) FROM watches",
+                (now,)).fetchone()
+            checked = self.conn.execute("SELECT COUNT(*) FROM watches WHERE checked_at > ?", (now - 60,)).fetchone()[0]
+            events = self.conn.execute("SELECT COUNT(*), COALESCE(MAX(seq), 0) FROM events").fetchone()
+        return {"path": self.path, "players": total, "due": due, "failing": failing,
+                "checked_last_minute": checked, "events": events[0], "last_seq": events[1]}
+
+    def close(self):
+        self.writer.close()
+        with self.lock:
+            self.conn.close()
+
+class Watcher:
+    """Süresi gelen oyuncuları yoklar. Grafik indirme API'den verilir:
+
+    fetch_series(player_id) -> nokta listesi
+    on_change(player_id, points) -> seri değişince (ör. önbelleği güncellemek için)
+    is_paused() -> True iken yeni yoklama başlatılmaz (ör. devre kesici açık)
+    """
+
+    def __init__(self, store, fetch_series, on_change=None, is_paused=lambda: False,
+                 concurrency=16, jitter=0.1, retry_delay=60.0, lease=300.0, event_ttl=7 * 86400):
+        self.store = store
+        self.fetch_series = fetch_series
+        self.on_change = on_change
+        self.is_paused = is_paused
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.retry_delay = retry_delay
+        self.lease = lease
+        self.event_ttl = event_ttl
+        # Yeni olay veya yeni oyuncu eklenince bekleyenleri uyandırır
+        self.events = asyncio.Condition()
+        self.wakeup = asyncio.Event()
+        self.counters = {"polls": 0, "unchanged": 0, "changes": 0, "baselines": 0, "errors": 0}
+
+    def schedule(self, interval):
+        return time.time() + interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def poll(self, player_id, interval, digest, series, failures):
+        self.counters["polls"] += 1
+        try:
+            points = await self.fetch_series(player_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.counters["errors"] += 1
+            # Art arda hatalarda geri çekil, ama normal aralıktan seyrek yoklama
+            delay = min(self.retry_delay * 2 ** failures, interval)
+            await self.store.failed(player_id, time.time() + delay * random.uniform(0.5, 1.0), str(e) or type(e).__name__)
+            return
+        points = [dict(p) for p in points or []]
+        history = MarketValueHistory.from_points(points)
+        # Saklı özet eski biçimde olabilir: saklı seriden yeniden hesaplanan özet de aynıysa değişmemiştir
+        if history.digest == digest or (series and MarketValueHistory.from_points(series).digest == history.digest):
+            self.counters["unchanged"] += 1
+            await self.store.checked(player_id, self.schedule(interval))
+            return
+        points = list(history)
+        await self.store.checked(player_id, self.schedule(interval), history.digest, points)
+        if self.on_change is not None:
+            self.on_change(player_id, points)
+        if digest is None:
+            # İlk yoklama: karşılaştırılacak seri yok, sadece temel alınır
+            self.counters["baselines"] += 1
+            return
+        self.counters["changes"] += 1
+        previous = series[-1] if series else None
+        current = history.latest_point()
+        delta = None
+        if previous and current and previous.get("value_eur") is not None and current.get("value_eur") is not None:
+            delta = current["value_eur"] - previous["value_eur"]
+        await self.publish(player_id, dict(diff_series(series or [], points), type="market_value_changed",
+                                           player_id=player_id, previous=brief(previous),
+                                           current=brief(current), delta_eur=delta))
+
+    async def publish(self, player_id, payload):
+        event = await self.store.add_event(player_id, payload)
+        async with self.events:
+            self.events.notify_all()
+        return event
+
+    async def wait_events(self, since, timeout, limit=100, player_id=None):
+        """since'ten sonraki olaylar; yoksa en fazla timeout saniye yenisini bekle (uzun yoklama).
+        Başka worker'ların yazdığı olaylar da görülsün diye saniyede bir veritabanına bakılır."""
+        deadline = time.monotonic() + timeout
+        while True:
+            events = self.store.events_since(since, limit, player_id)
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                return events
+            async with self.events:
+                try:
+                    await asyncio.wait_for(self.events.wait(), min(remaining, 1.0))
+                except asyncio.TimeoutError:
+                    pass
+
+    async def run(self):
+        """Süresi gelen oyuncuları en fazla concurrency eşzamanlı yoklamayla sonsuza kadar işle"""
+        pending = set()
+        pruned = 0.0
+        try:
+            while True:
+                if time.monotonic() - pruned > 600:
+                    await self.store.prune_events(self.event_ttl)
+                    pruned = time.monotonic()
+                if self.is_paused():
+                    await asyncio.sleep(1)
+                    continue
+                free = self.concurrency - len(pending)
+                if free > 0:
+                    for row in await self.store.claim(time.time(), free, self.lease):
+                        pending.add(asyncio.ensure_future(self.poll(*row)))
+                if pending:
+                    # Biri bitince boşalan yere yenisi alınır
+                    done, pending = await asyncio.wait(pending, timeout=1.0, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if not task.cancelled() and task.exception() is not None:
+                            print(f"Watchlist poll error: {task.exception()}")
+                    continue
+                next_at = self.store.next_due()
+                delay = 1.0 if next_at is None else min(max(next_at - time.time(), 0.01), 1.0)
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self):
+        return dict(self.store.stats(), **self.counters, concurrency=self.concurrency, jitter=self.jitter)
+
+class WebhookSender:
+    """Olayları sırayla webhook'a POST eder ({"events": [...]}). 2xx gelince imleç ilerler;
+    hata olursa aynı olaylar artan beklemeyle yeniden denenir (en az bir kez teslim, alıcı
+    seq ile tekrarları ayıklayabilir). Birden fazla worker varsa sadece kirayı tutan gönderir."""
+
+    def __init__(self, watcher, url, batch_size=100, timeout=10.0, max_backoff=300.0):
+        self.watcher = watcher
+        self.store = watcher.store
+        self.url = url
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.name = f"webhook:{url}"
+        self.counters = {"delivered": 0, "batches": 0, "failures": 0}
+        self.last_error = None
+
+    async def run(self):
+        # İlk açılışta geçmiş olaylar gönderilmez, sadece bundan sonrakiler
+        if self.store.cursor(self.name) is None:
+            await self.store.set_cursor(self.name, self.store.last_seq())
+        backoff = 1.0
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            try:
+                while True:
+                    if not await self.store.acquire(self.name, 30):
+                        await asyncio.sleep(5)
+                        continue
+                    events = await self.watcher.wait_events(self.store.cursor(self.name), 10, self.batch_size)
+                    if not events:
+                        continue
+                    try:
+                        response = await client.post(self.url, content=dumps({"events": events}),
+                                                     headers={"Content-Type": "application/json"})
+                        response.raise_for_status()
+                    except httpx.HTTPError as e:
+                        self.counters["failures"] += 1
+                        self.last_error = str(e) or type(e).__name__
+                        await asyncio.sleep(backoff)
+                        backoff = min(backoff * 2, self.max_backoff)
+                        continue
+                    backoff = 1.0
+                    await self.store.set_cursor(self.name, events[-1]["seq"])
+                    self.counters["delivered"] += len(events)
+                    self.counters["batches"] += 1
+            finally:
+                await self.store.release(self.name)
+
+    def stats(self):
+        return dict(self.counters, url=self.url, cursor=self.store.cursor(self.name), last_error=self.last_error)